@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the robust fitting of many point groups, no SA (license) needed.
+
+Two speedups of robust_fit_many() are measured on simulated sphere scans with outliers:
+- the RANSAC scoring: all hypotheses scored in vectorized blocks, against scoring them one by one in a Python loop
+- the threads: the groups fitted with max_workers threads, against one thread. The fits spend their time in NumPy
+  operations that release the GIL, so the threads scale with the CPU cores (no speedup on a single core machine).
+
+    python benchmarks/bench_robust.py                        # 32 groups of 2000 points
+    python benchmarks/bench_robust.py --groups 64 --points 5000 --workers 8
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+BENCH_PATH = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(os.path.dirname(BENCH_PATH), "lib"))
+import SAPyLib as sa  # noqa: E402
+from SAPyLib.fitting import deviations_to_geometries, deviations_to_geometry, fit_geometries  # noqa: E402
+from SAPyLib.robust import _SAMPLE_SIZE, _SCORE_BLOCK  # noqa: E402
+
+
+def sphere_groups(groups: int, points: int, outliers: float = 0.1, seed: int = 0) -> list[np.ndarray]:
+    """Simulated sphere scans, a fraction of the points is an outlier."""
+    rng = np.random.default_rng(seed)
+    arrays = []
+    for _ in range(groups):
+        direction = rng.normal(size=(points, 3))
+        direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+        xyz = rng.uniform(-100.0, 100.0, 3) + 25.0 * direction + rng.normal(0.0, 0.01, (points, 3))
+        xyz[: int(outliers * points)] += rng.uniform(0.5, 5.0, (int(outliers * points), 1)) * direction[: int(outliers * points)]
+        arrays.append(xyz)
+    return arrays
+
+
+def _hypotheses(geomType: str, xyz: np.ndarray, iterations: int = 200, seed=None) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    minimum = _SAMPLE_SIZE[geomType]
+    with np.errstate(all="ignore"):
+        return fit_geometries(geomType, [xyz[rng.choice(len(xyz), minimum, replace=False)] for _ in range(iterations)])
+
+
+def score_sequentially(geomType: str, xyz: np.ndarray, hypotheses: list[dict], threshold: float) -> np.ndarray:
+    """The RANSAC scores (points within the threshold) of the hypotheses, one by one in a Python loop."""
+    return np.array([np.count_nonzero(np.abs(deviations_to_geometry(geomType, xyz, fit)) <= threshold) for fit in hypotheses])
+
+
+def score_vectorized(geomType: str, xyz: np.ndarray, hypotheses: list[dict], threshold: float) -> np.ndarray:
+    """The RANSAC scores of the hypotheses in blocks, like robust_fit()."""
+    block = max(1, _SCORE_BLOCK // len(xyz))
+    return np.concatenate(
+        [
+            np.count_nonzero(np.abs(deviations_to_geometries(geomType, xyz, hypotheses[start : start + block])) <= threshold, axis=1)
+            for start in range(0, len(hypotheses), block)
+        ]
+    )
+
+
+def _time(func, repeat: int) -> float:
+    """The fastest of 'repeat' runs, in seconds."""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(groups: int, points: int, workers: int, repeat: int = 3) -> dict:
+    """Time the sequential and vectorized scoring and the single and multi threaded fits, in seconds."""
+    arrays = sphere_groups(groups, points)
+    hypotheses = [_hypotheses("Sphere", xyz, seed=1) for xyz in arrays]
+    threshold = 0.1
+    return {
+        "sequential scoring": _time(lambda: [score_sequentially("Sphere", xyz, h, threshold) for xyz, h in zip(arrays, hypotheses)], repeat),
+        "vectorized scoring": _time(lambda: [score_vectorized("Sphere", xyz, h, threshold) for xyz, h in zip(arrays, hypotheses)], repeat),
+        "1 thread": _time(lambda: sa.robust_fit_many("Sphere", arrays, threshold, max_workers=1, seed=1), repeat),
+        f"{workers} threads": _time(lambda: sa.robust_fit_many("Sphere", arrays, threshold, max_workers=workers, seed=1), repeat),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", type=int, default=32, help="number of point groups")
+    parser.add_argument("--points", type=int, default=2000, help="points per group")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="threads of the parallel run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the fastest one is kept")
+    args = parser.parse_args()
+
+    times = run(args.groups, args.points, args.workers, args.repeat)
+    single, parallel = times["1 thread"], times[f"{args.workers} threads"]
+    print(f"robust_fit_many: {args.groups} sphere groups of {args.points} points, {os.cpu_count()} CPU cores")
+    for name, seconds in times.items():
+        print(f"{name:<20} {seconds * 1000.0:>10.1f} ms")
+    print(f"RANSAC scoring speedup (vectorized vs sequential): {times['sequential scoring'] / times['vectorized scoring']:.2f}x")
+    print(f"thread speedup ({args.workers} threads vs 1): {single / parallel:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of the SAPyLib wrappers against the stub SDK, no SA (license) needed.
+
+For every case the calls per second (including the simulated SA latency) and the Python side overhead per call
+(wall time minus the simulated SA time) are reported. To be comparable between machines, the overhead is stored and
+compared relative to a reference measured in the same run: the time of one bare SDK step (SetStep, an argument,
+ExecuteStep, GetMPStepResult) on the stub. A run fails (exit code 1) when a case needs more SDK steps per call than
+its baseline, or when its relative overhead grew by more than the allowed margin.
+
+The marshalling cases convert between numpy/Python and .NET arrays. Without a .NET runtime they measure the
+fallback path of a stub session; with --dotnet (pythonnet installed) the stub returns real .NET arrays, so the wrapper
+cases and the marshalling cases run the .NET conversions. These results have their own baselines ('case [.NET]').
+
+    python benchmarks/bench_wrappers.py                     # run and compare against baselines.json
+    python benchmarks/bench_wrappers.py --update-baselines  # store the current results as the new baselines
+    python benchmarks/bench_wrappers.py --latency 0.0005    # simulate 0.5 ms per SA step
+    python benchmarks/bench_wrappers.py --dotnet            # marshal through .NET (requires pythonnet)
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BENCH_PATH = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(BENCH_PATH, "baselines.json")
+
+sys.path.append(os.path.join(os.path.dirname(BENCH_PATH), "lib"))
+import SAPyLib as sa  # noqa: E402
+from stub_sdk import FakeNrkSdk, FakeTools  # noqa: E402
+
+
+GROUP_SIZE = 1000
+REFERENCE_CALLS = 20000
+
+
+def _cases(sdk: FakeNrkSdk) -> dict:
+    """The benchmarked wrappers: name -> (callable, number of calls)."""
+    xyz = np.random.default_rng(0).random((GROUP_SIZE, 3)) * 1000.0
+    names = [f"P{i}" for i in range(GROUP_SIZE)]
+    objects = [("Col", name, "Point Group") for name in names]
+    xyz_net = sa.numpy_to_csharp_array(xyz)
+    return {
+        "construct_a_point_in_working_coordinates": (
+            lambda: sa.construct_a_point_in_working_coordinates("Col", "Grp", "P1", 1.0, 2.0, 3.0),
+            2000,
+        ),
+        "construct_points[1000]": (lambda: sa.construct_points("Col", "Grp", names, xyz), 5),
+        "get_point_coordinate": (lambda: sa.get_point_coordinate("Col", "Grp", "P1"), 2000),
+        "get_group_coordinates[1000]": (lambda: sa.get_group_coordinates("Col", "Grp"), 5),
+        "make_a_point_name_ref_list_from_a_group[1000]": (lambda: sa.make_a_point_name_ref_list_from_a_group("Col", "Grp"), 50),
+        "make_a_point_set_from_a_group[1000]": (lambda: sa.make_a_point_set_from_a_group("Col", "Grp"), 50),
+        "best_fit_transformation_group_to_group": (
+            lambda: sa.best_fit_transformation_group_to_group("Col", "Nom", "Col", "Act", False, 0.0, 0.0, False),
+            1000,
+        ),
+        "get_relationship_associated_data": (lambda: sa.get_relationship_associated_data("Col", "Rel"), 20),
+        "delete_object_list[1000]": (lambda: sa.delete_object_list(objects), 50),
+        "marshal numpy_to_csharp_array[1000x3]": (lambda: sa.numpy_to_csharp_array(xyz), 20000),
+        "marshal csharp_array_to_numpy[1000x3]": (lambda: sa.csharp_array_to_numpy(xyz_net), 20000),
+        "marshal csharp_array_to_python_2D_list[4x4]": (lambda: sa.csharp_array_to_python_2D_list(sdk.transform), 20000),
+        "marshal csharp_list_from_iterable[1000]": (lambda: sa.csharp_list_from_iterable(names), 5000),
+        "marshal ref_list_columns[1000]": (lambda: sa.ref_list_columns(sdk.group), 200),
+    }
+
+
+def _use_dotnet(sdk: FakeNrkSdk) -> None:
+    """Let the stub return .NET arrays, like the real SDK."""
+    sa._load_clr()
+    sdk.group = sa.Array[sa.String]([*sdk.group])
+    sdk.empty = sa.Array[sa.String]([])
+    sdk.transform = sa.numpy_to_csharp_array(sdk.transform)
+
+
+def _time_reference(sdk: FakeNrkSdk) -> float:
+    """The time (us) of one bare SDK step on the stub, the unit of the relative overheads."""
+    start = time.perf_counter()
+    for _ in range(REFERENCE_CALLS):
+        sdk.SetStep("Reference")
+        sdk.SetPointNameArg("Point Name", "Col", "Grp", "P1")
+        sdk.ExecuteStep()
+        sdk.GetMPStepResult(0)
+    return (time.perf_counter() - start) / REFERENCE_CALLS * 1e6
+
+
+def run(latency: float, repeat: int, dotnet: bool = False) -> tuple:
+    """Run all cases 'repeat' times, the run with the median relative overhead is kept per case. Returns the
+    reference (us) and the results.
+
+    The reference is timed right before every run of a case, so both see the same machine load and clock speed.
+    """
+    sdk = FakeNrkSdk(group_size=GROUP_SIZE)
+    sa.use_session(sa.Session(sdk=sdk, tools=FakeTools()))
+    if dotnet:
+        _use_dotnet(sdk)
+    suffix = " [.NET]" if dotnet else ""
+    references = []
+    results = {}
+    for name, (func, calls) in _cases(sdk).items():
+        runs = []
+        for _ in range(repeat):
+            sdk.latency = 0.0
+            reference = _time_reference(sdk)
+            references.append(reference)
+            sdk.latency = latency
+            sdk.reset()
+            start = time.perf_counter()
+            for _ in range(calls):
+                func()
+            elapsed = time.perf_counter() - start
+            overhead = (elapsed - sdk.simulated) / calls * 1e6
+            result = {
+                "calls_per_sec": calls / elapsed,
+                "overhead_us": overhead,
+                "relative": overhead / reference,
+                "steps_per_call": sdk.steps / calls,
+            }
+            runs.append(result)
+        runs.sort(key=lambda r: r["relative"])
+        results[name + suffix] = runs[len(runs) // 2]
+    return min(references), results
+
+
+def compare(results: dict, baselines: dict, margin: float) -> list:
+    """Get the (name, reason) of the cases that need more SDK steps, or whose relative overhead grew by more than
+    'margin' (fraction)."""
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        if result["steps_per_call"] > baseline["steps_per_call"]:
+            regressions.append((name, f"{result['steps_per_call']:.1f} SDK steps per call > baseline {baseline['steps_per_call']:.1f}"))
+        elif result["relative"] > baseline["relative"] * (1.0 + margin):
+            regressions.append((name, f"relative overhead {result['relative']:.2f} > baseline {baseline['relative']:.2f}"))
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated SA time per step in seconds")
+    parser.add_argument("--repeat", type=int, default=7, help="runs per case, the median one is kept")
+    parser.add_argument("--margin", type=float, default=0.5, help="allowed overhead increase, as a fraction")
+    parser.add_argument("--baselines", default=BASELINE_FILE, help="the baselines JSON file")
+    parser.add_argument("--update-baselines", action="store_true", help="store the results as the new baselines")
+    parser.add_argument("--dotnet", action="store_true", help="marshal through .NET arrays (requires pythonnet)")
+    args = parser.parse_args()
+
+    reference, results = run(args.latency, args.repeat, args.dotnet)
+    baselines = {}
+    if os.path.isfile(args.baselines):
+        with open(args.baselines) as f:
+            baselines = json.load(f)
+
+    print(f"Reference: {reference:.3f}us per bare SDK step")
+    print(f"{'wrapper':<50} {'calls/s':>12} {'overhead/call':>15} {'relative':>10} {'baseline':>10} {'steps/call':>11}")
+    for name, result in results.items():
+        baseline = baselines.get(name, {}).get("relative")
+        baseline_text = f"{baseline:>10.2f}" if baseline is not None else f"{'-':>10}"
+        print(
+            f"{name:<50} {result['calls_per_sec']:>12.1f} {result['overhead_us']:>13.2f}us {result['relative']:>10.2f}"
+            f" {baseline_text} {result['steps_per_call']:>11.1f}"
+        )
+
+    if args.update_baselines:
+        # only the machine independent numbers are stored, other cases (e.g. the .NET ones) are kept
+        baselines.update({name: {"relative": r["relative"], "steps_per_call": r["steps_per_call"]} for name, r in results.items()})
+        with open(args.baselines, "w") as f:
+            json.dump(baselines, f, indent=4, sort_keys=True)
+        print(f"Baselines written to: {args.baselines}")
+        return 0
+
+    regressions = compare(results, baselines, args.margin)
+    for name, reason in regressions:
+        print(f"REGRESSION: {name}: {reason}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+A stub SA SDK (NrkSdk) and SA Python Tools object for running the SAPyLib wrappers without SA.
+
+Every executed step sleeps for 'latency' seconds to simulate the SA round trip. The time slept is counted, so the
+Python side overhead of a wrapper can be separated from the simulated SA time.
+
+FakeJobSdk additionally keeps the points of a job, for the tests of functions that read back what they changed.
+"""
+import time
+from fnmatch import fnmatchcase
+
+import numpy as np
+
+
+class FakeArray:
+    """Mimics the .NET arrays returned by the SDK (indexer and GetLength)."""
+
+    def __init__(self, items) -> None:
+        self._items = items
+
+    def GetLength(self, dimension: int) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+class FakeTools:
+    """Stub for the SA_Python_Tools.SA_Py_Tool object."""
+
+    def GetListWrapper(self, values):
+        return values
+
+
+class FakeNrkSdk:
+    """Stub for the SpatialAnalyzerSDK object, with a configurable per-step latency (seconds)."""
+
+    def __init__(self, latency: float = 0.0, group_size: int = 1000) -> None:
+        self.latency = latency
+        self.simulated = 0.0  # total time slept, in seconds
+        self.steps = 0
+        self.step = ""
+        self.group = FakeArray([f"Col::Grp::P{i}" for i in range(group_size)])
+        self.empty = FakeArray([])
+        self.transform = np.eye(4)
+
+    def reset(self) -> None:
+        self.simulated = 0.0
+        self.steps = 0
+
+    def _sleep(self) -> None:
+        if self.latency > 0.0:
+            start = time.perf_counter()
+            time.sleep(self.latency)
+            self.simulated += time.perf_counter() - start
+
+    # Connection and step control
+    def ConnectEx(self, host, error_code):
+        return (True, 0)
+
+    def SetStep(self, name):
+        self.step = name
+
+    def ExecuteStep(self):
+        self.steps += 1
+        self._sleep()
+
+    def GetMPStepResult(self, index):
+        return (True, 2)
+
+    def GetMPStepMessages(self, values):
+        return (False, self.empty)
+
+    # Arguments (all setters are accepted and ignored)
+    def __getattr__(self, name):
+        if name.startswith("Set") and name.endswith("Arg"):
+            return self._set_arg
+        raise AttributeError(name)
+
+    def _set_arg(self, *args):
+        return True
+
+    # Results
+    def GetBoolArg(self, name, default):
+        return (True, default)
+
+    def GetIntegerArg(self, name, default):
+        return (True, default)
+
+    def GetDoubleArg(self, name, default):
+        return (True, default)
+
+    def GetStringArg(self, name, default):
+        return (True, default)
+
+    def GetVectorArg(self, name, x, y, z):
+        return (True, 1.0, 2.0, 3.0)
+
+    def GetCollectionNameArg(self, name, default):
+        return (True, "Col")
+
+    def GetColInstIdArg(self, name, collection, instrument_id):
+        return (True, "Col", 0)
+
+    def GetPointNameRefListArg(self, name, values):
+        return (True, self.group)
+
+    def GetCollectionObjectNameRefListArg(self, name, values):
+        return (True, self.group)
+
+    def GetStringRefListArg(self, name, values):
+        return (True, self.empty)
+
+    def GetTransformArg(self, name, values):
+        return (True, self.transform)
+
+    def GetWorldTransformArg(self, name, values, scale):
+        return (True, self.transform, 1.0)
+
+
+class FakeJobSdk(FakeNrkSdk):
+    """Stub SDK with the points of a job: {(collection, group, name): (x, y, z)}.
+
+    The point steps (construct, rename, get coordinate, list a group, list or delete point groups) act on the points,
+    every executed step is logged as (step name, arguments). Other steps succeed without effect.
+    """
+
+    def __init__(self, points: dict = None, latency: float = 0.0) -> None:
+        super().__init__(latency=latency, group_size=0)
+        self.points = {key: tuple(xyz) for key, xyz in (points or {}).items()}
+        self.executed = []
+        self.args = {}
+        self.result = 2
+        self.output = None
+
+    def SetStep(self, name):
+        self.step = name
+        self.args = {}
+
+    def _set_arg(self, name, *values):
+        self.args[name] = values[0] if len(values) == 1 else values
+        return True
+
+    def SetCollectionObjectNameRefListArg(self, name, values):
+        self.args[name] = [*values]
+        return True
+
+    def ExecuteStep(self):
+        super().ExecuteStep()
+        self.executed.append((self.step, dict(self.args)))
+        self.result, self.output = 2, None
+        execute = getattr(self, "_" + self.step.lower().replace(" ", "_").replace("-", ""), None)
+        if execute is not None:
+            self.result = 2 if execute(self.args) is not False else 3
+
+    def GetMPStepResult(self, index):
+        return (True, self.result)
+
+    def _construct_a_point_in_working_coordinates(self, args):
+        self.points[args["Point Name"]] = args["Working Coordinates"]
+
+    def _rename_point(self, args):
+        old, new = args["Original Point Name"], args["New Point Name"]
+        if old not in self.points or (new in self.points and new != old and not args["Overwrite if exists?"]):
+            return False
+        self.points[new] = self.points.pop(old)
+
+    def _get_point_coordinate(self, args):
+        if args["Point Name"] not in self.points:
+            return False
+        self.output = self.points[args["Point Name"]]
+
+    def _make_a_point_name_ref_list_from_a_group(self, args):
+        collection, group = args["Group Name"]
+        self.output = [f"{c}::{g}::{n}" for c, g, n in self.points if (c, g) == (collection, group)]
+
+    def _make_a_collection_object_name_ref_list__by_type(self, args):
+        collection = args["Collection"]
+        groups = dict.fromkeys(f"{c}::{g}" for c, g, _ in self.points if c == collection or not collection)
+        self.output = [*groups] if args["Object Type"] in ("Point Group", "Any") else []
+
+    def _make_a_collection_object_name_ref_list__wildcard_selection(self, args):
+        groups = dict.fromkeys(
+            f"{c}::{g}::Point Group"
+            for c, g, _ in self.points
+            if fnmatchcase(c, args["Collection Wildcard Criteria"]) and fnmatchcase(g, args["Object Wildcard Criteria"])
+        )
+        self.output = [*groups] if args["Object Type"] in ("Point Group", "Any") else []
+
+    def _delete_objects(self, args):
+        for ref in args["Object Names"]:
+            collection, name, objtype = ref.split("::")
+            if objtype == "Point Group":
+                self.points = {key: xyz for key, xyz in self.points.items() if key[:2] != (collection, name)}
+
+    def points_of(self, collection: str, group: str) -> dict:
+        """The points of a group, by name."""
+        return {n: xyz for (c, g, n), xyz in self.points.items() if (c, g) == (collection, group)}
+
+    def GetVectorArg(self, name, x, y, z):
+        return (True, *self.output) if self.output is not None else (False, x, y, z)
+
+    def GetPointNameRefListArg(self, name, values):
+        return (True, FakeArray(self.output or []))
+
+    def GetCollectionObjectNameRefListArg(self, name, values):
+        return (True, FakeArray(self.output or []))
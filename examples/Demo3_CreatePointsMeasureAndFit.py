@@ -46,8 +46,9 @@ if __name__ == "__main__":
         sa.NamedPoint3D("p5", xyz=[50, 100, 150]),
         sa.NamedPoint3D("p6", xyz=[150, 50, 200]),
     ]
-    for point in myPoints:
-        sa.construct_a_point_in_working_coordinates(nomCollection, nomGroup, point.name, point.X, point.Y, point.Z)
+    sa.construct_points(
+        nomCollection, nomGroup, [point.name for point in myPoints], [[point.X, point.Y, point.Z] for point in myPoints]
+    )
 
     # Construct plane
     sa.construct_plane(nomCollection, nomPlane)
@@ -25,38 +25,474 @@ elif sys.version_info.major == 3 and sys.version_info.minor == 8:
 elif sys.version_info.major == 3 and sys.version_info.minor >= 9:
     from typing import Union
 
-import clr  # #                          Python.NET library
+import ctypes
+import functools
+import importlib
+import inspect
+import threading
+import time
+from contextlib import contextmanager
 
-clr.AddReference("System")  # #             Import via python.net the .NET System Library
-clr.AddReference("System.Collections")  # # Import via python.net the .NET System.Collections Library
-clr.AddReference("System.Reflection")  # #  Import via python.net the .NET System.Reflection Library
-import System
-from System import Array, Double, String
-from System.Collections.Generic import List
-import System.Reflection
+import numpy as np
+
+from .cache import QueryCache
+from .display import DisplayBatch
+from .executor import SdkExecutor
+from .pointset import PointSet, PointView
+from .profiler import StepProfiler
+
+# The .NET types are resolved by '_load_clr()' on the first connection, so importing this library doesn't need a .NET runtime.
+clr = None
+System = None
+Array = None
+Double = None
+String = None
+List = None
+Int32 = None
+GCHandle = None
+GCHandleType = None
+
+
+class _NoCOMException(Exception):
+    """Placeholder for 'System.Runtime.InteropServices.COMException' until the .NET runtime is loaded."""
+
+
+COMException = _NoCOMException
 
 
 BASE_PATH = r"C:\Analyzer Data\Scripts\SA_Python_Lib"
 DLL_FOLDER = os.path.join(BASE_PATH, "dll")
 
+# SA documents no maximum length of the ref-list arguments, the list wrappers split longer lists in steps of this size
+REF_LIST_CHUNK_SIZE = 1000
+
+
+def _load_clr() -> None:
+    """Import pythonnet and the .NET libraries used by this library."""
+    global clr, System, Array, Double, String, List, Int32, GCHandle, GCHandleType, COMException
+    if clr is not None:
+        return
+
+    import clr as _clr  # #                   Python.NET library
+
+    _clr.AddReference("System")  # #             Import via python.net the .NET System Library
+    _clr.AddReference("System.Collections")  # # Import via python.net the .NET System.Collections Library
+    _clr.AddReference("System.Reflection")  # #  Import via python.net the .NET System.Reflection Library
+    import System
+    import System.Reflection
+    from System import Array, Double, String, Int32
+    from System.Collections.Generic import List
+    from System.Runtime.InteropServices import GCHandle, GCHandleType
+
+    COMException = System.Runtime.InteropServices.COMException
+    clr = _clr
+
+
+class Session:
+    """A connection to the SA SDK.
+
+    The SA assemblies are loaded and the connection is made on first use, not at import time.
+    An already created SDK object (and SA Python Tools object) can be injected, e.g. a stub SDK for offline use.
+    The SA Python Tools assembly is only loaded when a wrapper needs it (for list arguments).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", base_path: str = BASE_PATH, sdk=None, tools=None) -> None:
+        self.host = host
+        self.dll_folder = os.path.join(base_path, "dll")
+        self._sdk = sdk
+        self._tools = tools
+        self._connected = sdk is not None
+        self._lock = threading.RLock()
+        self._profiler = None
+        self._executor = None
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    @property
+    def sdk(self):
+        """The SA SDK object, connects on first access."""
+        if not self._connected:
+            self.connect()
+        return self._sdk
+
+    @property
+    def tools(self):
+        """The SA Python Tools object, loaded on first access."""
+        if self._tools is None:
+            with self._lock:
+                if self._tools is None:
+                    self._tools = self._create_instance("SA_Python_Tools.dll", "SA_Python_Tools.SA_Py_Tool")
+                    if _session is self and self._connected:
+                        _bind(self)
+        return self._tools
+
+    def _create_instance(self, dll_name: str, class_name: str):
+        _load_clr()
+        dll = System.Reflection.Assembly.LoadFile(os.path.join(self.dll_folder, dll_name))
+        return System.Activator.CreateInstance(dll.GetType(class_name))
+
+    def connect(self) -> "Session":
+        """Load the assemblies and connect to SA, does nothing when already connected."""
+        with self._lock:
+            if not self._connected:
+                if self._sdk is None:
+                    self._sdk = self._create_instance("Interop.SpatialAnalyzerSDK.dll", "SpatialAnalyzerSDK.SpatialAnalyzerSDKClass")
+                self._connect_sdk()
+            if _session is self:
+                _bind(self)
+        return self
+
+    def _connect_sdk(self) -> None:
+        log.debug(f"Connecting to SA SDK at: {self.host}")
+        SDK_Err_Code = 0
+        result = self._sdk.ConnectEx(self.host, SDK_Err_Code)
+        if isinstance(result, tuple):
+            # pythonnet returns the 'out' error code as a second value
+            SAConnected, SDK_Err_Code = result[0], result[1]
+        else:
+            SAConnected = result
+        if not SAConnected and SDK_Err_Code != 0:
+            log.error(f"Error code: {SDK_Err_Code}")
+            raise IOError("Connection to SA SDK failed!")
+        self._connected = True
+
+    def reconnect(self) -> "Session":
+        """Connect (again) to SA, e.g. after SA was restarted."""
+        with self._lock:
+            self._connected = False
+            if _session is self:
+                invalidate_query_cache()
+            if self._sdk is None:
+                return self.connect()
+            self._connect_sdk()
+            if _session is self:
+                _bind(self)
+        return self
+
+    @property
+    def profiler(self) -> Union[StepProfiler, None]:
+        return self._profiler
+
+    def enable_profiling(self, profiler: Union[StepProfiler, None] = None) -> StepProfiler:
+        """Record the timing of every SDK call, until 'disable_profiling()' is called."""
+        self._profiler = profiler if profiler is not None else StepProfiler()
+        if _session is self and self._connected:
+            _bind(self)
+        return self._profiler
+
+    def disable_profiling(self) -> Union[StepProfiler, None]:
+        """Stop profiling, the SDK calls run without any instrumentation again."""
+        profiler = self._profiler
+        self._profiler = None
+        if _session is self and self._connected:
+            _bind(self)
+        return profiler
+
+    @property
+    def executor(self) -> Union[SdkExecutor, None]:
+        return self._executor
+
+    def start_executor(self) -> SdkExecutor:
+        """Run all SDK transactions of this session on a dedicated SDK thread.
+
+        The connection is made on that thread, so the SDK objects live in its (STA) COM apartment.
+        """
+        global _executor
+        with self._lock:
+            executor = self._executor
+            if executor is None:
+                executor = self._executor = SdkExecutor()
+        # connect from the SDK thread, without holding the session lock the connection needs
+        executor.call(self.connect)
+        if _session is self:
+            _executor = executor
+        return executor
+
+    def stop_executor(self, wait: bool = True) -> None:
+        """Stop the SDK thread, the SDK transactions run on the calling threads again."""
+        global _executor
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+            if _session is self:
+                _executor = None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def activate(self) -> "Session":
+        """Make this the session used by all the wrapper functions."""
+        global _session, _executor
+        _session = self
+        _executor = self._executor
+        invalidate_query_cache()
+        if self._connected:
+            _bind(self)
+        else:
+            _unbind()
+        return self
+
+
+class _LazyHandle:
+    """Stands in for 'NrkSdk' and 'sa_py_tools' until the active session is connected."""
+
+    def __init__(self, attr: str) -> None:
+        self._attr = attr
+
+    def __getattr__(self, name: str):
+        # the session properties connect or load the SA Python Tools, and bind the handles
+        return getattr(getattr(get_session(), self._attr), name)
+
+    def __repr__(self) -> str:
+        return f"<unconnected SA {self._attr}>"
+
+
+def _bind(session: Session) -> None:
+    """Point the module level SDK handles to the session objects."""
+    global NrkSdk, sa_py_tools, _empty_wrapper
+    if session._profiler is None:
+        NrkSdk = session._sdk
+        sa_py_tools = session._tools
+    else:
+        NrkSdk = session._profiler.wrap(session._sdk)
+        sa_py_tools = session._profiler.wrap(session._tools, tools=True) if session._tools is not None else None
+    if sa_py_tools is None:
+        # loaded on first use
+        sa_py_tools = _LazyHandle("tools")
+    _empty_wrapper = None
+
+
+def _unbind() -> None:
+    global NrkSdk, sa_py_tools, _empty_wrapper
+    NrkSdk = _LazyHandle("sdk")
+    sa_py_tools = _LazyHandle("tools")
+    _empty_wrapper = None
+
+
+NrkSdk = _LazyHandle("sdk")
+sa_py_tools = _LazyHandle("tools")
+_session = None
+_executor = None  # the SDK thread of the active session, if any
+_sdk_lock = threading.RLock()  # serializes the SDK transactions when there is no SDK thread
+_transactions = 0  # the number of SDK transactions started, see StepHandle
+_empty_wrapper = None  # the shared empty list wrapper of the bound SA Python Tools object
+
+
+def get_session() -> Session:
+    """Get the active session, a default one (connecting to the local SA) is created when needed."""
+    if _session is None:
+        Session().activate()
+    return _session
+
+
+def use_session(session: Session) -> Session:
+    """Run all wrapper functions against the given session (and its SDK object)."""
+    return session.activate()
+
+
+def connect(host: str = "127.0.0.1", base_path: str = BASE_PATH) -> Session:
+    """Create, activate and connect a new session."""
+    return Session(host, base_path).activate().connect()
+
+
+@contextmanager
+def profiling(profiler: Union[StepProfiler, None] = None):
+    """Profile the SDK calls of the active session within a 'with' block.
+
+    with profiling() as profiler:
+        ...
+    print(profiler.summary_table())
+    profiler.export_chrome_trace("trace.json")
+    """
+    session = get_session()
+    previous = session.profiler
+    active = session.enable_profiling(profiler)
+    try:
+        yield active
+    finally:
+        if previous is None:
+            session.disable_profiling()
+        else:
+            session.enable_profiling(previous)
+
+
+def sdk_transaction(func):
+    """Run the decorated wrapper (its SetStep ... Get*Arg sequence) as one atomic SDK transaction.
+
+    With an SDK thread (see 'Session.start_executor()') the call is executed on that thread, otherwise the calling
+    thread runs it while holding the SDK lock. Nested wrapper calls run directly.
+    """
+
+    @functools.wraps(func)
+    def transaction(*args, **kwargs):
+        global _transactions
+        executor = _executor
+        if executor is not None and not executor.is_executor_thread():
+            return executor.call(transaction, *args, **kwargs)
+        with _sdk_lock:
+            _transactions += 1
+            return func(*args, **kwargs)
+
+    transaction.sdk_function = func
+    return transaction
+
+
+_query_cache = None  # the job structure query cache, see enable_query_cache()
+
+
+def enable_query_cache(maxsize: int = 1024, ttl: float = None) -> QueryCache:
+    """Cache the read-only job structure queries (collections, folders and object lists).
+
+    Entries are evicted LRU and expire after 'ttl' seconds (None: never). The mutating wrappers of this library
+    invalidate the affected entries, changes made in SA by other means require invalidate_query_cache(). So does a
+    measurement started without waiting for completion (and without a StepHandle), its point appears later.
+    """
+    global _query_cache
+    _query_cache = QueryCache(maxsize, ttl)
+    return _query_cache
+
+
+def disable_query_cache() -> None:
+    global _query_cache
+    _query_cache = None
 
-# Get SA SDK dll
-sa_sdk_dll_file = os.path.join(DLL_FOLDER, "Interop.SpatialAnalyzerSDK.dll")
-sa_sdk_dll = System.Reflection.Assembly.LoadFile(sa_sdk_dll_file)
-sa_sdk_class_type = sa_sdk_dll.GetType("SpatialAnalyzerSDK.SpatialAnalyzerSDKClass")
-NrkSdk = System.Activator.CreateInstance(sa_sdk_class_type)
-SDK_Err_Code = 0
-SAConnected = NrkSdk.ConnectEx("127.0.0.1", SDK_Err_Code)
-if not SAConnected and SDK_Err_Code != 0:
-    print(f"Error code: {SDK_Err_Code}")
-    raise IOError("Connection to SA SDK failed!")
 
+def invalidate_query_cache(*tags: str) -> None:
+    """Remove the cache entries with any of the tags, or all entries when no tags are given."""
+    cache = _query_cache
+    if cache is None:
+        return
+    if tags:
+        cache.invalidate(tags)
+    else:
+        cache.clear()
+
+
+def _tag_formatter(func, tags: tuple, query: bool):
+    """Get a function that formats the tags (e.g. "objects:{collection}") with the call arguments.
+
+    An empty argument (e.g. the active collection "") is widened: a query is tagged with the tag family ("objects"),
+    an invalidation removes the whole family ("objects:*").
+    """
+    if not any("{" in tag for tag in tags):
+        fixed = frozenset(tags)
+        return lambda args, kwargs: fixed
+
+    signature = inspect.signature(func)
+
+    def format_tags(args, kwargs) -> frozenset:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        formatted = set()
+        for tag in tags:
+            tag = tag.format(**bound.arguments)
+            if tag.endswith(":"):
+                tag = tag[:-1] if query else tag + "*"
+            formatted.add(tag)
+        return frozenset(formatted)
+
+    return format_tags
+
+
+def _copy_cached(value):
+    """Copy a cached query result down to its mutable items (lists, NamedPoint), such that it can't modify the cache."""
+    if isinstance(value, list):
+        return [_copy_cached(item) for item in value]
+    if isinstance(value, NamedPoint):
+        return NamedPoint([value.collection, value.group, value.name])
+    return value
+
+
+def cached_query(*tags: str):
+    """Serve the decorated read-only query from the query cache, when enabled."""
+
+    def decorator(func):
+        format_tags = _tag_formatter(func, tags, True)
+        name = func.__name__
+
+        @functools.wraps(func)
+        def query(*args, **kwargs):
+            cache = _query_cache
+            if cache is None:
+                return func(*args, **kwargs)
+            key = (name, args, tuple(sorted(kwargs.items())))
+            hit, value = cache.get(key)
+            if not hit:
+                # an invalidation during the fetch makes the result possibly stale, put() drops it then
+                generation = cache.generation
+                value = func(*args, **kwargs)
+                cache.put(key, value, format_tags(args, kwargs), generation)
+            return _copy_cached(value)
+
+        return query
+
+    return decorator
+
+
+def invalidates(*tags: str):
+    """Invalidate the query cache entries with the tags after the decorated (mutating) wrapper ran."""
+
+    def decorator(func):
+        format_tags = _tag_formatter(func, tags, False)
+
+        @functools.wraps(func)
+        def mutation(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                cache = _query_cache
+                if cache is not None:
+                    cache.invalidate(format_tags(args, kwargs))
+
+        return mutation
+
+    return decorator
+
+
+_display_batches = threading.local()  # the active batch_display() of each thread
 
-# Get SA Python Tools dll
-sa_py_tools_dll_file = os.path.join(DLL_FOLDER, "SA_Python_Tools.dll")
-sa_py_tools_dll = System.Reflection.Assembly.LoadFile(sa_py_tools_dll_file)
-sa_py_tools_class_type = sa_py_tools_dll.GetType("SA_Python_Tools.SA_Py_Tool")
-sa_py_tools = System.Activator.CreateInstance(sa_py_tools_class_type)
+
+@contextmanager
+def batch_display(recenter: bool = False):
+    """Queue the display commands of the block and execute only their net effect, at the end of the block.
+
+    Show/hide objects, show/hide by object type, show/hide callout views and center graphics are queued. Of the queued
+    commands only the last one per object (type, callout view) is executed, with all object visibility changes in one
+    show and one hide step. With recenter=True the graphics are centered once at the end. The queued commands are
+    dropped when the block raises. A nested batch_display() joins the outer one.
+    """
+    batch = getattr(_display_batches, "batch", None)
+    if batch is not None:
+        batch.recenter = batch.recenter or recenter
+        yield batch
+        return
+
+    batch = _display_batches.batch = DisplayBatch(recenter)
+    try:
+        yield batch
+    finally:
+        _display_batches.batch = None
+    commands = batch.commands()
+    log.debug(f"Display batch: {len(commands)} steps for {batch.queued} queued display commands")
+    for name, args, kwargs in commands:
+        globals()[name](*args, **kwargs)
+
+
+def _deferred_display(queue):
+    """Queue the decorated display command with queue(batch, *args, **kwargs) while a batch_display() is active."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def display(*args, **kwargs):
+            batch = getattr(_display_batches, "batch", None)
+            if batch is None:
+                return func(*args, **kwargs)
+            queue(batch, *args, **kwargs)
+
+        return display
+
+    return decorator
 
 
 # Get the logger
@@ -73,9 +509,120 @@ def getResult_Bare(func_name: str) -> tuple[str, str]:
     return (boolean, result)
 
 
-def getResult(func_name: str) -> bool:
-    """Get the methods execution result and process the result."""
+def getResult(func_name: str, wait: Union[bool, "WaitStrategy"] = True) -> bool:
+    """Get the methods execution result and process the result.
+
+    A step that is still in progress is waited for with the 'default_wait_strategy' (or the given WaitStrategy),
+    with wait=False it is reported as success right away.
+    """
     boolean, result = NrkSdk.GetMPStepResult(0)
+    if result == 1 and wait:
+        boolean, result = wait_for_step_result(func_name, wait if isinstance(wait, WaitStrategy) else None, (boolean, result))
+    return processResult(func_name, boolean, result)
+
+
+class WaitStrategy:
+    """How to wait for a step that is still in progress (INPROGRESS).
+
+    The result is polled every 'poll_interval' seconds, the interval grows by the factor 'backoff' up to
+    'max_interval'. After 'deadline' seconds (None: no deadline) a TimeoutError is raised.
+    """
+
+    def __init__(self, poll_interval: float = 0.05, backoff: float = 1.5, max_interval: float = 1.0, deadline: float = None) -> None:
+        self.poll_interval = poll_interval
+        self.backoff = backoff
+        self.max_interval = max_interval
+        self.deadline = deadline
+
+    def intervals(self):
+        interval = self.poll_interval
+        while True:
+            yield interval
+            interval = min(interval * self.backoff, self.max_interval)
+
+
+default_wait_strategy = WaitStrategy()
+
+
+def wait_for_step_result(func_name: str, strategy: Union[WaitStrategy, None] = None, first: tuple = None) -> tuple:
+    """Poll the execution result until the step isn't in progress anymore, the final (boolean, result) is returned."""
+    if strategy is None:
+        strategy = default_wait_strategy
+    end = None if strategy.deadline is None else time.monotonic() + strategy.deadline
+    boolean, result = first if first is not None else NrkSdk.GetMPStepResult(0)
+    for interval in strategy.intervals():
+        if result != 1:
+            break
+        if end is not None:
+            remaining = end - time.monotonic()
+            if remaining <= 0.0:
+                log.error(f"{func_name}: still in progress after {strategy.deadline} seconds.")
+                raise TimeoutError(f"{func_name}: still in progress after {strategy.deadline} seconds.")
+            interval = min(interval, remaining)
+        time.sleep(interval)
+        boolean, result = NrkSdk.GetMPStepResult(0)
+    return (boolean, result)
+
+
+class StepHandle:
+    """An executed step that may still be in progress, to be checked later.
+
+    Python work can continue in the meantime, but no other SA step should be started before the handle is done: the
+    step result is that of the last executed step. Checking the handle after another SDK transaction ran (e.g. of
+    another thread) raises a SystemError. Create the handle in the transaction that executed the step.
+    """
+
+    def __init__(self, func_name: str, strategy: Union[WaitStrategy, None] = None) -> None:
+        self.func_name = func_name
+        self.strategy = strategy
+        self._result = None  # the final (boolean, result)
+        self._transaction = _transactions  # the last transaction of the step
+
+    def _check_last_step(self) -> None:
+        """Called within the next transaction on the step, which should follow the last one directly."""
+        if _transactions != self._transaction + 1:
+            log.error(f"{self.func_name}: another SDK step ran before the step was finished.")
+            raise SystemError(f"{self.func_name}: the step result is lost, another SDK step ran before it was finished.")
+        self._transaction = _transactions
+
+    def poll(self) -> Union[int, None]:
+        """Check the step without blocking, the result code is returned when finished, otherwise None."""
+        if self._result is None:
+            boolean, result = _get_step_result(self)
+            if result == 1:
+                return None
+            self._finish((boolean, result))
+        return self._result[1]
+
+    def done(self) -> bool:
+        return self.poll() is not None
+
+    def wait(self) -> bool:
+        """Wait for the step to finish and process its result (see getResult)."""
+        if self._result is None:
+            self._finish(_wait_for_step_result(self))
+        return processResult(self.func_name, *self._result)
+
+    def _finish(self, result: tuple) -> None:
+        self._result = result
+        # the measured points appear when the step is finished, not when it was started
+        invalidate_query_cache("objects", "objects:*")
+
+
+@sdk_transaction
+def _get_step_result(handle: StepHandle) -> tuple:
+    handle._check_last_step()
+    return NrkSdk.GetMPStepResult(0)
+
+
+@sdk_transaction
+def _wait_for_step_result(handle: StepHandle) -> tuple:
+    handle._check_last_step()
+    return wait_for_step_result(handle.func_name, handle.strategy)
+
+
+def processResult(func_name: str, boolean: bool, result: int) -> bool:
+    """Process an already fetched execution result."""
     if result == -1:
         # SDKERROR = -1
         log.error(f"{func_name}: {boolean}, {result}")
@@ -127,15 +674,15 @@ def getResult(func_name: str) -> bool:
 def MPStepMessages() -> None:
     """Get the MPStep messages."""
     log.debug("Get the MPStep messages.")
-    stringList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    stringList = empty_list_wrapper()
     try:
         vStringList = NrkSdk.GetMPStepMessages(stringList)
         if vStringList[0]:
-            for i in range(vStringList[1].GetLength(0)):
-                log.info(f"MPStepMessage: {vStringList[1][i]}")
+            for message in csharp_string_array_to_list(vStringList[1]):
+                log.info(f"MPStepMessage: {message}")
         else:
             log.info("MPStepMessage: 'NO MESSAGES'")
-    except System.Runtime.InteropServices.COMException as err:
+    except COMException as err:
         log.error(f"Getting MP Step failed with error: {err}")
 
 
@@ -157,7 +704,7 @@ class NamedPoint:
 
 
 class NamedPoint3D:
-    def __init__(self, point: Union[NamedPoint, str, list[str]], xyz: list[float] = []) -> None:
+    def __init__(self, point: Union[NamedPoint, str, list[str]], xyz: list[float] = None) -> None:
         log.debug("NamedPoint3D")
 
         if isinstance(point, NamedPoint):
@@ -205,36 +752,205 @@ def InchHgtoMilliBar(pressInchHg: float) -> float:
     return pressMilliBar
 
 
-def python_list_to_csharp_2D_array(input_list: list, array_depth: tuple = (4, 4)) -> Array:
-    """Convert a python N-List to a C# Array."""
-    CSharpArray = Array.CreateInstance(Double, array_depth[0], array_depth[1])
-    for i in range(array_depth[0]):
-        for j in range(array_depth[1]):
-            CSharpArray.SetValue(input_list[i][j], i, j)
+def _pinned_copy(net_array: Array, np_array: np.ndarray, to_net: bool) -> None:
+    """Block copy between a System.Double array and a C-contiguous float64 numpy array of the same size."""
+    if np_array.size == 0:
+        return
+    handle = GCHandle.Alloc(net_array, GCHandleType.Pinned)
+    try:
+        address = handle.AddrOfPinnedObject().ToInt64()
+        if to_net:
+            ctypes.memmove(address, np_array.ctypes.data, np_array.nbytes)
+        else:
+            ctypes.memmove(np_array.ctypes.data, address, np_array.nbytes)
+    finally:
+        handle.Free()
+
+
+def numpy_to_csharp_array(input_array: Union[np.ndarray, list]) -> Array:
+    """Convert a numpy array (or nested list) of any shape to a System.Double array with a single block copy."""
+    values = np.ascontiguousarray(input_array, dtype=np.float64)
+    if Array is None:
+        # No .NET runtime loaded, e.g. a session with a stub SDK
+        return values.copy()
+    if values.ndim == 1:
+        CSharpArray = Array.CreateInstance(Double, values.shape[0])
+    else:
+        CSharpArray = Array.CreateInstance(Double, Array[Int32]([int(n) for n in values.shape]))
+    _pinned_copy(CSharpArray, values, True)
     return CSharpArray
 
 
+def csharp_array_to_numpy(input_array: Array) -> np.ndarray:
+    """Convert a .NET array of any rank to a float64 numpy array with a single block copy."""
+    if Array is None or not isinstance(input_array, Array):
+        return np.array(input_array, dtype=np.float64)
+    shape = tuple(input_array.GetLength(d) for d in range(input_array.Rank))
+    if input_array.GetType().GetElementType() != clr.GetClrType(Double):
+        # e.g. a boxed VARIANT (System.Object) array from COM, unbox it in one .NET call first
+        if input_array.Rank == 1:
+            doubles = Array.CreateInstance(Double, shape[0])
+        else:
+            doubles = Array.CreateInstance(Double, Array[Int32]([int(n) for n in shape]))
+        Array.Copy(input_array, doubles, input_array.Length)
+        input_array = doubles
+    output_array = np.empty(shape, dtype=np.float64)
+    _pinned_copy(input_array, output_array, False)
+    return output_array
+
+
+def python_list_to_csharp_2D_array(input_list: Union[list, np.ndarray], array_depth: tuple = (4, 4)) -> Array:
+    """Convert a python N-List to a C# Array."""
+    return numpy_to_csharp_array(np.reshape(np.asarray(input_list, dtype=np.float64), array_depth))
+
+
 def python_list_to_csharp_list(input_list: list) -> List:
-    output_list = List[String]()
-    for item in input_list:
-        output_list.Add(item)
+    return csharp_list_from_iterable(input_list)
+
+
+def csharp_list_from_iterable(items) -> List:
+    """Convert an iterable of strings to a C# List[String], filled with one AddRange over a prebuilt array."""
+    values = [*items]
+    if List is None:
+        # No .NET runtime loaded, e.g. a session with a stub SDK
+        return values
+    output_list = List[String](len(values))
+    output_list.AddRange(Array[String](values))
     return output_list
 
 
+def _point_ref(point) -> str:
+    """Get the 'collection::group::name' reference of a NamedPoint or a (collection, group, name) tuple."""
+    if isinstance(point, str):
+        return point
+    if isinstance(point, (NamedPoint, NamedPoint3D, PointView)):
+        return f"{point.collection}::{point.group}::{point.name}"
+    collection, group, name = point
+    return f"{collection}::{group}::{name}"
+
+
+def _point_refs(points) -> list[str]:
+    """Get the 'collection::group::name' references of a PointSet or of a list of points (see _point_ref)."""
+    if isinstance(points, PointSet):
+        return points.refs()
+    return [_point_ref(point) for point in points]
+
+
+def _object_ref(obj) -> str:
+    """Get the 'collection::name::type' reference of a (collection, name, type) tuple."""
+    if isinstance(obj, str):
+        return obj
+    collection, name, objtype = obj
+    return f"{collection}::{name}::{objtype}"
+
+
+def _ref_list_operation(func_name: str, arg_name: str, refs: list, chunk_size: int, points: bool = False) -> int:
+    """Run a ref-list step for all references, 'chunk_size' references per step.
+
+    Returns the number of references in the chunks that failed.
+    """
+    if chunk_size < 1:
+        raise ValueError("The chunk size should be at least 1.")
+    log.debug(f"{func_name}: {len(refs)} references")
+    failed = 0
+    for start in range(0, len(refs), chunk_size):
+        chunk = refs[start : start + chunk_size]
+        # each chunk is one SDK transaction, other threads can use the SDK in between the chunks
+        if not _ref_list_step(func_name, arg_name, chunk, points):
+            failed += len(chunk)
+    return failed
+
+
+@sdk_transaction
+def _ref_list_step(func_name: str, arg_name: str, refs: list, points: bool) -> bool:
+    NrkSdk.SetStep(func_name)
+    vObjectList = sa_py_tools.GetListWrapper(csharp_list_from_iterable(refs))
+    if points:
+        NrkSdk.SetPointNameRefListArg(arg_name, vObjectList)
+    else:
+        NrkSdk.SetCollectionObjectNameRefListArg(arg_name, vObjectList)
+    NrkSdk.ExecuteStep()
+    return bool(getResult(func_name))
+
+
+def empty_list_wrapper():
+    """Get the shared empty list wrapper, used for the (output) list arguments that don't need any input."""
+    global _empty_wrapper
+    wrapper = _empty_wrapper
+    if wrapper is None:
+        wrapper = _empty_wrapper = sa_py_tools.GetListWrapper(csharp_list_from_iterable(()))
+    return wrapper
+
+
 def csharp_array_to_python_2D_list(input_array: Array, array_depth: tuple = (4, 4)) -> list:
     """Convert a C# Array to a N-List."""
-    python_list = []
-    python_list.append([])
-    for i in range(array_depth[0]):
-        for j in range(array_depth[1]):
-            python_list[i].append(input_array.GetValue(i, j))
-        python_list.append([])
-    return python_list
+    return csharp_array_to_numpy(input_array)[: array_depth[0], : array_depth[1]].tolist()
+
+
+_UNIT_SEPARATOR = "\x1f"  # joins the strings of a .NET array, it doesn't occur in SA names
+
+
+def _join_net_strings(input_array: Array, separator: str) -> str:
+    """Get all strings of a .NET String array as one string, with one interop call."""
+    return String.Join(separator, input_array)
+
+
+def csharp_string_array_to_list(input_array: Array) -> list[str]:
+    """Convert a .NET String array to a list of str in one transfer, instead of one indexer call per entry."""
+    if Array is None or not isinstance(input_array, Array):
+        # No .NET runtime loaded (a stub SDK) or already a Python sequence
+        return [*input_array]
+    n = input_array.Length
+    if n == 0:
+        return []
+    values = _join_net_strings(input_array, _UNIT_SEPARATOR).split(_UNIT_SEPARATOR)
+    if len(values) != n:
+        # a string contained the separator after all
+        values = [input_array[i] for i in range(n)]
+    return values
+
+
+def split_ref_list(input_array: Array) -> list[list[str]]:
+    """Decode a .NET 'collection::...::name' reference array to lists of parts, e.g. ['collection', 'name']."""
+    return [ref.split("::") for ref in csharp_string_array_to_list(input_array)]
+
+
+def ref_list_columns(input_array: Array, fields: int = 3) -> tuple:
+    """Decode a .NET reference array (e.g. 'collection::group::name') to 'fields' columns (lists of str).
+
+    The whole array is transferred and split at once, the strings in all but the last column (the collections and
+    groups, few distinct values) are interned.
+    """
+    if Array is not None and isinstance(input_array, Array):
+        n = input_array.Length
+        parts = _join_net_strings(input_array, "::").split("::") if n else []
+    else:
+        refs = [*input_array]
+        n = len(refs)
+        parts = "::".join(refs).split("::") if n else []
+    if len(parts) != n * fields:
+        # a name contains '::', or the references don't have 'fields' parts
+        parts = []
+        for ref in csharp_string_array_to_list(input_array):
+            ref_parts = ref.split("::", fields - 1)
+            if len(ref_parts) != fields:
+                raise ValueError(f"Expected a reference with {fields} parts, got: '{ref}'")
+            parts.extend(ref_parts)
+    columns = [parts[i::fields] for i in range(fields)]
+    for i in range(fields - 1):
+        columns[i] = [*map(sys.intern, columns[i])]
+    return tuple(columns)
+
+
+def point_set_from_ref_list(input_array: Array) -> PointSet:
+    """Decode a .NET 'collection::group::name' point reference array to a PointSet (without coordinates)."""
+    return PointSet(*ref_list_columns(input_array, 3))
 
 
 # ##############################
 # Chapter 2 - File Operations ##
 # ##############################
+@sdk_transaction
 def find_files_in_directory(directory: str, searchPattern: str) -> list:
     """p29"""
     func_name = "Find Files in Directory"
@@ -247,13 +963,10 @@ def find_files_in_directory(directory: str, searchPattern: str) -> list:
     results = getResult(func_name)
     if not results:
         return []
-    stringList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    stringList = empty_list_wrapper()
     vStringList = NrkSdk.GetStringRefListArg("Files", stringList)
     if vStringList[0]:
-        files = []
-        for i in range(vStringList[1].GetLength(0)):
-            files.append(vStringList[1][i])
-        return files
+        return csharp_string_array_to_list(vStringList[1])
     else:
         return []
 
@@ -261,6 +974,7 @@ def find_files_in_directory(directory: str, searchPattern: str) -> list:
 # ######################################
 # Chapter 3 - Process Flow Operations ##
 # ######################################
+@sdk_transaction
 def ask_for_string(question: str, initialanswer: str = "") -> str:
     """p123"""
     func_name = "Ask for String"
@@ -276,6 +990,7 @@ def ask_for_string(question: str, initialanswer: str = "") -> str:
     return answer[1]
 
 
+@sdk_transaction
 def ask_for_string_pulldown(question: str, answers: list) -> str:
     """p124"""
     func_name = "Ask for String (Pull-Down Version)"
@@ -305,6 +1020,8 @@ def ask_for_string_pulldown(question: str, answers: list) -> str:
 # ###########################
 # Chapter 5 - View Control ##
 # ###########################
+@_deferred_display(lambda batch, collection, objects, name: batch.set_objects_visible([f"{collection}::{objects}::{name}"], True))
+@sdk_transaction
 def show_objects(collection: str, objects: str, name: str) -> None:
     """p161"""
     func_name = "Show Objects"
@@ -317,6 +1034,8 @@ def show_objects(collection: str, objects: str, name: str) -> None:
     getResult(func_name)
 
 
+@_deferred_display(lambda batch, collection, name, objtype: batch.set_objects_visible([f"{collection}::{name}::{objtype}"], False))
+@sdk_transaction
 def hide_objects(collection: str, name: str, objtype: str) -> None:
     """p163"""
     func_name = "Hide Objects"
@@ -329,6 +1048,20 @@ def hide_objects(collection: str, name: str, objtype: str) -> None:
     getResult(func_name)
 
 
+@_deferred_display(lambda batch, objects, chunk_size=None: batch.set_objects_visible([_object_ref(obj) for obj in objects], True))
+def show_object_list(objects: list, chunk_size: int = REF_LIST_CHUNK_SIZE) -> None:
+    """p161 - Show many objects, 'chunk_size' objects per step. The objects are (collection, name, type) tuples."""
+    _ref_list_operation("Show Objects", "Objects To Show", [_object_ref(obj) for obj in objects], chunk_size)
+
+
+@_deferred_display(lambda batch, objects, chunk_size=None: batch.set_objects_visible([_object_ref(obj) for obj in objects], False))
+def hide_object_list(objects: list, chunk_size: int = REF_LIST_CHUNK_SIZE) -> None:
+    """p163 - Hide many objects, 'chunk_size' objects per step. The objects are (collection, name, type) tuples."""
+    _ref_list_operation("Hide Objects", "Objects To Hide", [_object_ref(obj) for obj in objects], chunk_size)
+
+
+@_deferred_display(DisplayBatch.set_type_hidden)
+@sdk_transaction
 def show_hide_by_object_type(collection: str, objtype: str, hide: bool) -> None:
     """p164"""
     func_name = "Show / Hide by Object Type"
@@ -354,6 +1087,8 @@ def show_hide_by_object_type(collection: str, objtype: str, hide: bool) -> None:
     getResult(func_name)
 
 
+@_deferred_display(DisplayBatch.set_callout_shown)
+@sdk_transaction
 def show_hide_callout_view(collection: str, calloutname: str, show: bool) -> None:
     """p167"""
     func_name = "Show / Hide Callout View"
@@ -369,6 +1104,8 @@ def show_hide_callout_view(collection: str, calloutname: str, show: bool) -> Non
     getResult(func_name)
 
 
+@_deferred_display(DisplayBatch.hide_all_callouts)
+@sdk_transaction
 def hide_all_callout_views() -> None:
     """p168"""
     func_name = "Hide All Callout Views"
@@ -378,6 +1115,8 @@ def hide_all_callout_views() -> None:
     getResult(func_name)
 
 
+@_deferred_display(lambda batch, *args, **kwargs: batch.center(args, kwargs))
+@sdk_transaction
 def center_graphics_about_objects(objtype: str = "Any", ColWild: str = "*", ObjWild: str = "*") -> None:
     """p198"""
     func_name = "Center Graphics About Object(s)"
@@ -406,6 +1145,8 @@ def center_graphics_about_objects(objtype: str = "Any", ColWild: str = "*", ObjW
 # ######################################
 # Chapter 7 - Construction Operations ##
 # ######################################
+@invalidates("objects", "objects:{orgCol}", "objects:{newCol}")
+@sdk_transaction
 def rename_point(orgCol: str, orgGrp: str, orgName: str, newCol: str, newGrp: str, newName: str, overwrite: bool = False) -> None:
     """p216"""
     func_name = "Rename Point"
@@ -419,6 +1160,51 @@ def rename_point(orgCol: str, orgGrp: str, orgName: str, newCol: str, newGrp: st
         raise SystemError(f"Renaming point: '{orgCol}::{orgGrp}::{orgName}' failed.")
 
 
+@invalidates("objects", "objects:*")
+def rename_points(renames: list, overwrite: bool = False, chunk_size: int = 500) -> int:
+    """p216 - Rename many points, 'renames' has (orgCol, orgGrp, orgName, newCol, newGrp, newName) tuples.
+
+    SA has no multi point version of this step, the points are renamed in chunks of 'chunk_size' points per SDK
+    transaction. Returns the number of successfully renamed points.
+    """
+    func_name = "Rename Point"
+    if chunk_size < 1:
+        raise ValueError("The chunk size should be at least 1.")
+    log.debug(f"{func_name}: {len(renames)} points")
+    failed = 0
+    for start in range(0, len(renames), chunk_size):
+        failed += _rename_points_chunk(func_name, renames[start : start + chunk_size], overwrite)
+    if failed:
+        log.error(f"{func_name}: {failed} of {len(renames)} points failed.")
+    return len(renames) - failed
+
+
+@sdk_transaction
+def _rename_points_chunk(func_name: str, renames: list, overwrite: bool) -> int:
+    """p216 - Rename the points, the number of failed points is returned."""
+    SetStep = NrkSdk.SetStep
+    SetPointNameArg = NrkSdk.SetPointNameArg
+    SetBoolArg = NrkSdk.SetBoolArg
+    ExecuteStep = NrkSdk.ExecuteStep
+    GetMPStepResult = NrkSdk.GetMPStepResult
+
+    failed = 0
+    for orgCol, orgGrp, orgName, newCol, newGrp, newName in renames:
+        SetStep(func_name)
+        SetPointNameArg("Original Point Name", orgCol, orgGrp, orgName)
+        SetPointNameArg("New Point Name", newCol, newGrp, newName)
+        SetBoolArg("Overwrite if exists?", overwrite)
+        ExecuteStep()
+        boolean, result = GetMPStepResult(0)
+        if result == 1:
+            boolean, result = wait_for_step_result(func_name, None, (boolean, result))
+        if result != 2 and not processResult(func_name, boolean, result):
+            failed += 1
+    return failed
+
+
+@invalidates("collections", "objects", "objects:{fromName}", "objects:{toName}")
+@sdk_transaction
 def rename_collection(fromName: str, toName: str) -> None:
     """p218"""
     func_name = "Rename Collection"
@@ -431,6 +1217,8 @@ def rename_collection(fromName: str, toName: str) -> None:
         raise SystemError(f"Renaming folder: '{fromName}' failed!")
 
 
+@invalidates("objects", "objects:{old_col}", "objects:{new_col}")
+@sdk_transaction
 def rename_object(old_col: str, old_name: str, new_col: str, new_name: str) -> None:
     """p219"""
     func_name = "Rename Object"
@@ -445,6 +1233,8 @@ def rename_object(old_col: str, old_name: str, new_col: str, new_name: str) -> N
         log.error(f"Renaming object: '{old_col}::{old_name}' failed!")
 
 
+@invalidates("objects", "objects:{collection}")
+@sdk_transaction
 def delete_points(collection: str, group: str, name: str) -> bool:
     """p221"""
     func_name = "Delete Points"
@@ -460,6 +1250,21 @@ def delete_points(collection: str, group: str, name: str) -> bool:
     return True
 
 
+@invalidates("objects", "objects:*")
+def delete_point_list(points: Union[list, PointSet], chunk_size: int = REF_LIST_CHUNK_SIZE) -> bool:
+    """p221 - Delete many points, 'chunk_size' points per step.
+
+    The points are a PointSet, or NamedPoints, (collection, group, name) tuples or 'collection::group::name' strings.
+    """
+    refs = _point_refs(points)
+    failed = _ref_list_operation("Delete Points", "Point Names", refs, chunk_size, points=True)
+    if failed:
+        log.error(f"Failed to delete {failed} of {len(refs)} points")
+    return not failed
+
+
+@invalidates("objects", "objects:{collection}")
+@sdk_transaction
 def delete_points_wildcard_selection(collection: str, group: str, name: str, objtype: str) -> None:
     """p222"""
     func_name = "Delete Points WildCard Selection"
@@ -473,6 +1278,8 @@ def delete_points_wildcard_selection(collection: str, group: str, name: str, obj
     getResult(func_name)
 
 
+@invalidates("objects", "objects:*")
+@sdk_transaction
 def construct_objects_from_surface_faces_runtime_select(facetype: str = "") -> None:
     """p223"""
     func_name = "Construct Objects From Surface Faces - Runtime Select"
@@ -512,6 +1319,8 @@ def construct_objects_from_surface_faces_runtime_select(facetype: str = "") -> N
     getResult(func_name)
 
 
+@invalidates("collections")
+@sdk_transaction
 def set_or_construct_default_collection(collection: str) -> None:
     """p225"""
     func_name = "Set (or construct) default collection"
@@ -522,6 +1331,8 @@ def set_or_construct_default_collection(collection: str) -> None:
     getResult(func_name)
 
 
+@invalidates("collections")
+@sdk_transaction
 def construct_collection(collection: str, make_default: bool = True) -> None:
     """p226"""
     func_name = "Construct Collection"
@@ -537,6 +1348,8 @@ def construct_collection(collection: str, make_default: bool = True) -> None:
     getResult(func_name)
 
 
+@cached_query("collections")
+@sdk_transaction
 def get_active_collection_name() -> str:
     """p203"""
     func_name = "Get Active Collection Name"
@@ -550,6 +1363,8 @@ def get_active_collection_name() -> str:
     return sValue[1]
 
 
+@invalidates("collections", "objects", "objects:{collection}")
+@sdk_transaction
 def delete_collection(collection: str) -> None:
     """p228"""
     func_name = "Delete Collection"
@@ -560,6 +1375,8 @@ def delete_collection(collection: str) -> None:
     getResult(func_name)
 
 
+@invalidates("objects", "objects:{collection}")
+@sdk_transaction
 def construct_a_point_in_working_coordinates(collection: str, group: str, name: str, x: float, y: float, z: float) -> None:
     """p232"""
     func_name = "Construct a Point in Working Coordinates"
@@ -571,6 +1388,68 @@ def construct_a_point_in_working_coordinates(collection: str, group: str, name:
     getResult(func_name)
 
 
+@invalidates("objects", "objects:{collection}")
+def construct_points(
+    collection: str, group: str, names: list[str], xyz_array: np.ndarray, chunk_size: int = 500, progress=None
+) -> int:
+    """p232 - Construct many points in working coordinates.
+
+    SA has no multi point (or import from array) version of this step, so this still takes one SDK step per point:
+    the round trip per point remains and dominates the time. The per point Python work is kept to the SDK calls: the
+    coordinates are passed straight from the rows of the float64 array (no list copy of the array, no tuple per point)
+    and the result is only processed on failure.
+    'progress' is called as progress(done, total) after each chunk of 'chunk_size' points.
+    Returns the number of successfully constructed points.
+    """
+    func_name = "Construct a Point in Working Coordinates"
+    xyz = np.asarray(xyz_array, dtype=np.float64)
+    if xyz.ndim != 2 or xyz.shape[1] != 3:
+        raise ValueError(f"Expected an (N,3) coordinate array, got shape: {xyz.shape}")
+    total = xyz.shape[0]
+    if len(names) != total:
+        raise ValueError(f"Got {len(names)} names for {total} coordinates.")
+    if chunk_size < 1:
+        raise ValueError("The chunk size should be at least 1.")
+    log.debug(f"{func_name}: {total} points in {collection}::{group}")
+
+    failed = 0
+    for start in range(0, total, chunk_size):
+        # each chunk is one SDK transaction, other threads can use the SDK in between the chunks
+        failed += _construct_points_chunk(func_name, collection, group, names[start : start + chunk_size], xyz[start : start + chunk_size])
+        if progress is not None:
+            progress(min(start + chunk_size, total), total)
+
+    if failed:
+        log.error(f"{func_name}: {failed} of {total} points failed.")
+    return total - failed
+
+
+@sdk_transaction
+def _construct_points_chunk(func_name: str, collection: str, group: str, names: list[str], xyz: np.ndarray) -> int:
+    """p232 - Construct the points with the names and the rows of the (n,3) 'xyz' view, the number of failed points is returned."""
+    SetStep = NrkSdk.SetStep
+    SetPointNameArg = NrkSdk.SetPointNameArg
+    SetVectorArg = NrkSdk.SetVectorArg
+    ExecuteStep = NrkSdk.ExecuteStep
+    GetMPStepResult = NrkSdk.GetMPStepResult
+
+    x, y, z = xyz.T  # column views, indexed per point without creating a row array
+    failed = 0
+    for i, name in enumerate(names):
+        SetStep(func_name)
+        SetPointNameArg("Point Name", collection, group, name)
+        SetVectorArg("Working Coordinates", x[i], y[i], z[i])
+        ExecuteStep()
+        boolean, result = GetMPStepResult(0)
+        if result == 1:
+            boolean, result = wait_for_step_result(func_name, None, (boolean, result))
+        if result != 2 and not processResult(func_name, boolean, result):
+            failed += 1
+    return failed
+
+
+@invalidates("objects", "objects:{collection_point}")
+@sdk_transaction
 def construct_point_at_intersection_of_plane_and_line(
     collection_plane: str,
     name_plane: str,
@@ -591,6 +1470,8 @@ def construct_point_at_intersection_of_plane_and_line(
     getResult(func_name)
 
 
+@invalidates("objects", "objects:{collection_line}")
+@sdk_transaction
 def construct_line_2_points(
     collection_line: str,
     name_line: str,
@@ -612,6 +1493,8 @@ def construct_line_2_points(
     getResult(func_name)
 
 
+@invalidates("objects", "objects:{collection_plane}")
+@sdk_transaction
 def construct_plane(collection_plane: str, name_plane: str) -> None:
     """p300"""
     func_name = "Construct Plane"
@@ -625,6 +1508,8 @@ def construct_plane(collection_plane: str, name_plane: str) -> None:
     getResult(func_name)
 
 
+@invalidates("objects", "objects:{collection_frame}")
+@sdk_transaction
 def construct_frame_known_origin_object_direction_object_direction(
     collection_point: str,
     group_point: str,
@@ -664,6 +1549,8 @@ def construct_frame_known_origin_object_direction_object_direction(
     getResult(func_name)
 
 
+@invalidates("objects", "objects:{collection_callout}")
+@sdk_transaction
 def create_relationship_callout(
     collection_callout: str,
     name_callout: str,
@@ -680,12 +1567,14 @@ def create_relationship_callout(
     NrkSdk.SetCollectionObjectNameArg("Relationship Name", collection_relationship, name_relationship)
     NrkSdk.SetDoubleArg("View X Position", xpos)
     NrkSdk.SetDoubleArg("View Y Position", ypos)
-    vStringList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    vStringList = empty_list_wrapper()
     NrkSdk.SetEditTextArg("Additional Notes (blank for none)", vStringList)
     NrkSdk.ExecuteStep()
     getResult(func_name)
 
 
+@invalidates("objects", "objects:{collection_callout}")
+@sdk_transaction
 def create_text_callout(collection_callout: str, name_callout: str, text: str, xpos: float = 0.1, ypos: float = 0.1) -> None:
     """p402"""
     func_name = "Create Text Callout"
@@ -702,6 +1591,7 @@ def create_text_callout(collection_callout: str, name_callout: str, text: str, x
     getResult(func_name)
 
 
+@sdk_transaction
 def set_default_callout_view_properties(name_callout: str) -> None:
     """p409"""
     func_name = "Set Default Callout View Properties"
@@ -721,6 +1611,8 @@ def set_default_callout_view_properties(name_callout: str) -> None:
     getResult(func_name)
 
 
+@invalidates("objects", "objects:{collection}")
+@sdk_transaction
 def delete_callout_view(collection: str, callout_name: str) -> None:
     """p410"""
     func_name = "Delete Callout View"
@@ -731,6 +1623,7 @@ def delete_callout_view(collection: str, callout_name: str) -> None:
     getResult(func_name)
 
 
+@sdk_transaction
 def make_a_system_string(str_option: str) -> str:
     """p427"""
     func_name = "Make a System String"
@@ -751,6 +1644,7 @@ def make_a_system_string(str_option: str) -> str:
     return sValue[1]
 
 
+@sdk_transaction
 def make_a_point_name_runtime_select(user_prompt: str) -> NamedPoint:
     """p435"""
     func_name = "Make a Point Name - Runtime Select"
@@ -770,25 +1664,41 @@ def make_a_point_name_runtime_select(user_prompt: str) -> NamedPoint:
     return NamedPoint([collection, group, name])
 
 
-def make_a_point_name_ref_list_from_a_group(collection: str, group: str) -> list[NamedPoint]:
-    """p439"""
+@sdk_transaction
+def _point_name_ref_list_from_a_group(collection: str, group: str):
+    """p439 - Get the raw 'collection::group::name' ref list, or None when it is empty."""
     func_name = "Make a Point Name Ref List From a Group"
     log.debug(func_name)
     NrkSdk.SetStep(func_name)
     NrkSdk.SetCollectionObjectNameArg("Group Name", collection, group)
     NrkSdk.ExecuteStep()
     getResult(func_name)
-    userPtList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    userPtList = empty_list_wrapper()
     ptList = NrkSdk.GetPointNameRefListArg("Resultant Point Name List", userPtList)
     if not ptList[0]:
+        return None
+    return ptList[1]
+
+
+@cached_query("objects:{collection}")
+def make_a_point_name_ref_list_from_a_group(collection: str, group: str) -> list[NamedPoint]:
+    """p439"""
+    ptList = _point_name_ref_list_from_a_group(collection, group)
+    if ptList is None:
         return []
 
-    points = []
-    for i in range(ptList[1].GetLength(0)):
-        points.append(NamedPoint(ptList[1][i].split("::")))
-    return points
+    return [NamedPoint(point) for point in zip(*ref_list_columns(ptList))]
+
+
+def make_a_point_set_from_a_group(collection: str, group: str) -> PointSet:
+    """p439 - Get the point names of a group as a PointSet (without coordinates)."""
+    ptList = _point_name_ref_list_from_a_group(collection, group)
+    if ptList is None:
+        return PointSet(collection, group, [])
+    return point_set_from_ref_list(ptList)
 
 
+@sdk_transaction
 def make_a_point_name_ref_list_runtime_select(user_prompt: str) -> list[NamedPoint]:
     """p440"""
     func_name = "Make a Point Name Ref List - Runtime Select"
@@ -797,17 +1707,15 @@ def make_a_point_name_ref_list_runtime_select(user_prompt: str) -> list[NamedPoi
     NrkSdk.SetStringArg("User Prompt", user_prompt)
     NrkSdk.ExecuteStep()
     getResult(func_name)
-    userPtList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    userPtList = empty_list_wrapper()
     ptList = NrkSdk.GetPointNameRefListArg("Resultant Point Name List", userPtList)
     if not ptList[0]:
         return []
 
-    points = []
-    for i in range(ptList[1].GetLength(0)):
-        points.append(NamedPoint(ptList[1][i].split("::")))
-    return points
+    return [NamedPoint(point) for point in zip(*ref_list_columns(ptList[1]))]
 
 
+@sdk_transaction
 def make_a_collection_name_runtime_select(user_prompt: str) -> str:
     """p446"""
     func_name = "Make a Collection Name - Runtime Select"
@@ -822,6 +1730,7 @@ def make_a_collection_name_runtime_select(user_prompt: str) -> str:
     return sValue[1]
 
 
+@sdk_transaction
 def make_a_collection_object_name_runtime_select(user_prompt: str, obj_type: str) -> tuple[str, ...]:
     """p450"""
     func_name = "Make a Collection Object Name - Runtime Select"
@@ -846,6 +1755,8 @@ def make_a_collection_object_name_runtime_select(user_prompt: str, obj_type: str
     return (result[1], result[2])
 
 
+@cached_query("objects:{collection}")
+@sdk_transaction
 def make_a_collection_object_name_ref_list_by_type(collection: str, objtype: str) -> list[list[str]]:
     """p454"""
     func_name = "Make a Collection Object Name Ref List - By Type"
@@ -863,16 +1774,64 @@ def make_a_collection_object_name_ref_list_by_type(collection: str, objtype: str
 
     NrkSdk.ExecuteStep()
     getResult(func_name)
-    userObjectList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    userObjectList = empty_list_wrapper()
     objectList = NrkSdk.GetCollectionObjectNameRefListArg("Resultant Collection Object Name List", userObjectList)
     if not objectList[0]:
         return []
-    objects = []
-    for i in range(objectList[1].GetLength(0)):
-        objects.append(objectList[1][i].split("::"))  # splits the string in 'collection' and 'object_name'
-    return objects
+    return split_ref_list(objectList[1])  # splits the strings in 'collection' and 'object_name'
+
+
+# The object types of the "Object Type" arguments, without "Any"
+OBJECT_TYPES = (
+    "B-Spline",
+    "Circle",
+    "Cloud",
+    "Scan Stripe Cloud",
+    "Cross Section Cloud",
+    "Cone",
+    "Cylinder",
+    "Datum",
+    "Ellipse",
+    "Frame",
+    "Frame Set",
+    "Line",
+    "Paraboloid",
+    "Perimeter",
+    "Plane",
+    "Point Group",
+    "Point Set",
+    "Poly Surface",
+    "Scan Stripe Mesh",
+    "Slot",
+    "Sphere",
+    "Surface",
+    "Torus",
+    "Vector Group",
+)
+
+
+@cached_query("objects")
+@sdk_transaction
+def make_a_collection_object_name_ref_list_wildcard_selection(collection_wild: str, object_wild: str, objtype: str = "Any") -> list[list[str]]:
+    """Make a Collection Object Name Ref List - WildCard Selection (all collections and objects matching the criteria)"""
+    func_name = "Make a Collection Object Name Ref List - WildCard Selection"
+    log.debug(func_name)
+    NrkSdk.SetStep(func_name)
+    NrkSdk.SetStringArg("Collection Wildcard Criteria", collection_wild)
+    NrkSdk.SetStringArg("Object Wildcard Criteria", object_wild)
+    NrkSdk.SetObjectTypeArg("Object Type", objtype)
+    NrkSdk.ExecuteStep()
+    if not getResult(func_name):
+        return []
+    userObjectList = empty_list_wrapper()
+    objectList = NrkSdk.GetCollectionObjectNameRefListArg("Resultant Collection Object Name List", userObjectList)
+    if not objectList[0]:
+        return []
+    return split_ref_list(objectList[1])  # splits the strings in 'collection' and 'object_name'
 
 
+@cached_query("objects")
+@sdk_transaction
 def make_a_relationship_reference_list_wildCard_selection(collection: str, name_relationship: str) -> list[list[str]]:
     """p464"""
     func_name = "Make a Relationship Reference List- WildCard Selection"
@@ -885,16 +1844,14 @@ def make_a_relationship_reference_list_wildCard_selection(collection: str, name_
         log.error(f"An empty results was returned for: {collection}::{name_relationship}")
         return []
 
-    userObjectList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    userObjectList = empty_list_wrapper()
     objectList = NrkSdk.GetCollectionObjectNameRefListArg("Resultant Relationship Reference List", userObjectList)
     if not objectList[0]:
         return []
-    objects = []
-    for i in range(objectList[1].GetLength(0)):
-        objects.append(objectList[1][i].split("::"))  # splits the string in 'collection' and 'relationship_name'
-    return objects
+    return split_ref_list(objectList[1])  # splits the strings in 'collection' and 'relationship_name'
 
 
+@sdk_transaction
 def make_a_relationship_reference_list_runtime_selection(question: str) -> list[list[str]]:
     """p465"""
     func_name = "Make a Relationship Reference List- Runtime Select"
@@ -903,20 +1860,19 @@ def make_a_relationship_reference_list_runtime_selection(question: str) -> list[
     NrkSdk.SetStringArg("User Prompt", question)
     NrkSdk.ExecuteStep()
     getResult(func_name)
-    userObjectList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    userObjectList = empty_list_wrapper()
     objectList = NrkSdk.GetCollectionObjectNameRefListArg("Resultant Relationship Reference List", userObjectList)
     if not objectList[0]:
         return []
 
-    objects = []
-    for i in range(objectList[1].GetLength(0)):
-        objects.append(objectList[1][i].split("::"))  # splits the string in 'collection' and 'relationship_name'
-    return objects
+    return split_ref_list(objectList[1])  # splits the strings in 'collection' and 'relationship_name'
 
 
 # ##################################
 # Chapter 8 - Analysis Operations ##
 # ##################################
+@cached_query("collections")
+@sdk_transaction
 def get_number_of_collections() -> int:
     """p503"""
     func_name = "Get Number of Collections"
@@ -931,6 +1887,8 @@ def get_number_of_collections() -> int:
     return n[1]
 
 
+@cached_query("collections")
+@sdk_transaction
 def get_ith_collection_name(i: int) -> str:
     """p504"""
     func_name = "Get i-th Collection Name"
@@ -946,6 +1904,7 @@ def get_ith_collection_name(i: int) -> str:
     return collection[1]
 
 
+@sdk_transaction
 def get_vector_group_properties(collection: str, name_vectorgroup: str) -> dict:
     """p519"""
     func_name = "Get Vector Group Properties"
@@ -977,6 +1936,7 @@ def get_vector_group_properties(collection: str, name_vectorgroup: str) -> dict:
     return results
 
 
+@sdk_transaction
 def set_vector_group_colorization_options_selected(collection: str, name_vectorgroup: str, **kwargs) -> None:
     """p523"""
     func_name = "Set Vector Group Colorization Options (Selected)"
@@ -1011,6 +1971,7 @@ def set_vector_group_colorization_options_selected(collection: str, name_vectorg
     getResult(func_name)
 
 
+@sdk_transaction
 def get_point_coordinate(collection: str, group: str, name: str) -> Point3D:
     """p527"""
     func_name = "Get Point Coordinate"
@@ -1029,6 +1990,76 @@ def get_point_coordinate(collection: str, group: str, name: str) -> Point3D:
     return Point3D(Vector[1], Vector[2], Vector[3])
 
 
+def get_group_coordinates(collection: str, group: str, chunk_size: int = 500, progress=None) -> tuple[list[str], np.ndarray]:
+    """p439, p527 - Get the point names and an (N,3) float64 coordinate array of a point group.
+
+    SA has no MP step returning the coordinates of a whole group, so this still takes one "Get Point Coordinate" step
+    per point (N + 1 steps): it saves the Python objects and call overhead per point, not the SDK round trips.
+    The group is listed once, the coordinates are written straight into a preallocated array, in chunks of
+    'chunk_size' points per SDK transaction. 'progress' is called as progress(done, total) after each chunk.
+    Points whose coordinate couldn't be read are set to NaN.
+    """
+    func_name = "Get Point Coordinate"
+    if chunk_size < 1:
+        raise ValueError("The chunk size should be at least 1.")
+    ptList = _point_name_ref_list_from_a_group(collection, group)
+    if ptList is None:
+        return ([], np.empty((0, 3), dtype=np.float64))
+
+    names = ref_list_columns(ptList)[2]
+    n = len(names)
+    xyz = np.empty((n, 3), dtype=np.float64)
+    log.debug(f"{func_name}: {n} points in {collection}::{group}")
+
+    failed = 0
+    for start in range(0, n, chunk_size):
+        # each chunk is one SDK transaction, other threads can use the SDK in between the chunks
+        failed += _get_coordinates_chunk(func_name, collection, group, names[start : start + chunk_size], xyz[start : start + chunk_size])
+        if progress is not None:
+            progress(min(start + chunk_size, n), n)
+
+    if failed:
+        log.error(f"{func_name}: {failed} of {n} coordinates couldn't be read from {collection}::{group}.")
+    return (names, xyz)
+
+
+@sdk_transaction
+def _get_coordinates_chunk(func_name: str, collection: str, group: str, names: list[str], xyz: np.ndarray) -> int:
+    """p527 - Read the coordinates of the points into the (n,3) 'xyz' view, the number of failed points is returned."""
+    SetStep = NrkSdk.SetStep
+    SetPointNameArg = NrkSdk.SetPointNameArg
+    ExecuteStep = NrkSdk.ExecuteStep
+    GetMPStepResult = NrkSdk.GetMPStepResult
+    GetVectorArg = NrkSdk.GetVectorArg
+
+    failed = 0
+    for i, name in enumerate(names):
+        SetStep(func_name)
+        SetPointNameArg("Point Name", collection, group, name)
+        ExecuteStep()
+        boolean, result = GetMPStepResult(0)
+        if result == 1:
+            boolean, result = wait_for_step_result(func_name, None, (boolean, result))
+        if result != 2 and not processResult(func_name, boolean, result):
+            xyz[i] = np.nan
+            failed += 1
+            continue
+        Vector = GetVectorArg("Vector Representation", 0.0, 0.0, 0.0)
+        if Vector[0]:
+            xyz[i] = Vector[1:4]
+        else:
+            xyz[i] = np.nan
+            failed += 1
+    return failed
+
+
+def get_group_point_set(collection: str, group: str) -> PointSet:
+    """p439, p527 - Get the points of a point group, with their coordinates, as a PointSet."""
+    names, xyz = get_group_coordinates(collection, group)
+    return PointSet(collection, group, names, xyz)
+
+
+@sdk_transaction
 def get_point_to_point_distance(
     collection_p1: str, group_p1: str, name_p1: str, collection_p2: str, group_p2: str, name_p2: str
 ) -> tuple[Point3D, float]:
@@ -1062,6 +2093,7 @@ def get_point_to_point_distance(
     return (Point3D(Vector[1], Vector[2], Vector[3]), mag)
 
 
+@sdk_transaction
 def set_default_colorization_options() -> None:
     """p569"""
     func_name = "Set Default Colorization Options"
@@ -1093,6 +2125,7 @@ def set_default_colorization_options() -> None:
     getResult(func_name)
 
 
+@sdk_transaction
 def set_vector_group_display_attributes(magnification: float, blotch_size: float, tolerance: float) -> None:
     """p570"""
     func_name = "Set Vector Group Display Attributes"
@@ -1136,7 +2169,8 @@ def set_vector_group_display_attributes(magnification: float, blotch_size: float
     getResult(func_name)
 
 
-def transform_object_by_delta_world_transform_operator(objects: list[str], transform: list[float]) -> None:
+@sdk_transaction
+def transform_object_by_delta_world_transform_operator(objects: list[str], transform: Union[list, np.ndarray]) -> None:
     """p582"""
     func_name = "Transform Objects by Delta (World Transform Operator)"
     log.debug(func_name)
@@ -1150,8 +2184,8 @@ def transform_object_by_delta_world_transform_operator(objects: list[str], trans
     vObjectList = sa_py_tools.GetListWrapper(objNameList)
     NrkSdk.SetCollectionObjectNameRefListArg("Objects to Transform", vObjectList)
 
-    # transform is a list of 6 floats: x,y,z,rx,ry,rz
-    T = python_list_to_csharp_2D_array(transform)
+    # transform is a 4x4 matrix (nested list or numpy array)
+    T = numpy_to_csharp_array(np.reshape(transform, (4, 4)))
     scale = 1.0
     vMatrixobj = sa_py_tools.GetListWrapper(T)
     NrkSdk.SetWorldTransformArg("Delta Transform", vMatrixobj, scale)
@@ -1160,7 +2194,8 @@ def transform_object_by_delta_world_transform_operator(objects: list[str], trans
     getResult(func_name)
 
 
-def transform_objects_by_delta_about_working_frame(objects: list[tuple[str, str]], transform: list[float]) -> None:
+@sdk_transaction
+def transform_objects_by_delta_about_working_frame(objects: list[tuple[str, str]], transform: Union[list, np.ndarray]) -> None:
     """p583"""
     func_name = "Transform Objects by Delta (About Working Frame)"
     log.debug(func_name)
@@ -1174,14 +2209,16 @@ def transform_objects_by_delta_about_working_frame(objects: list[tuple[str, str]
     vObjectList = sa_py_tools.GetListWrapper(objectList)
     NrkSdk.SetCollectionObjectNameRefListArg("Objects to Transform", vObjectList)
 
-    # transform is a list of 6 floats: x,y,z,rx,ry,rz
-    T = python_list_to_csharp_2D_array(transform)
+    # transform is a 4x4 matrix (nested list or numpy array)
+    T = numpy_to_csharp_array(np.reshape(transform, (4, 4)))
     vMatrixobj = sa_py_tools.GetListWrapper(T)
     NrkSdk.SetTransformArg("Delta Transform", vMatrixobj)
     NrkSdk.ExecuteStep()
     getResult(func_name)
 
 
+@invalidates("objects", "objects:{collection_result}")
+@sdk_transaction
 def fit_geometry_to_point_group(
     geomType: str,
     collection_data: str,
@@ -1214,6 +2251,7 @@ def fit_geometry_to_point_group(
     getResult(func_name)
 
 
+@sdk_transaction
 def best_fit_transformation_group_to_group(
     collection_ref: str,
     group_ref: str,
@@ -1223,6 +2261,12 @@ def best_fit_transformation_group_to_group(
     rms_tol: float,
     max_tol: float,
     allow_scale: bool,
+    allow_x: bool = True,
+    allow_y: bool = True,
+    allow_z: bool = True,
+    allow_rx: bool = True,
+    allow_ry: bool = True,
+    allow_rz: bool = True,
 ) -> dict:
     """p589"""
     func_name = "Best Fit Transformation - Group to Group"
@@ -1234,12 +2278,12 @@ def best_fit_transformation_group_to_group(
     NrkSdk.SetDoubleArg("RMS Tolerance (0.0 for none)", rms_tol)
     NrkSdk.SetDoubleArg("Maximum Absolute Tolerance (0.0 for none)", max_tol)
     NrkSdk.SetBoolArg("Allow Scale", allow_scale)
-    NrkSdk.SetBoolArg("Allow X", True)
-    NrkSdk.SetBoolArg("Allow Y", True)
-    NrkSdk.SetBoolArg("Allow Z", True)
-    NrkSdk.SetBoolArg("Allow Rx", True)
-    NrkSdk.SetBoolArg("Allow Ry", True)
-    NrkSdk.SetBoolArg("Allow Rz", True)
+    NrkSdk.SetBoolArg("Allow X", allow_x)
+    NrkSdk.SetBoolArg("Allow Y", allow_y)
+    NrkSdk.SetBoolArg("Allow Z", allow_z)
+    NrkSdk.SetBoolArg("Allow Rx", allow_rx)
+    NrkSdk.SetBoolArg("Allow Ry", allow_ry)
+    NrkSdk.SetBoolArg("Allow Rz", allow_rz)
     NrkSdk.SetBoolArg("Lock Degrees of Freedom", False)
     NrkSdk.SetBoolArg("Generate Event", False)
     NrkSdk.SetFilePathArg("File Path for CSV Text Report (requires Show Interface = TRUE)", "", False)
@@ -1248,13 +2292,13 @@ def best_fit_transformation_group_to_group(
 
     results = {}
 
-    T = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    T = empty_list_wrapper()
     trans_in_work = NrkSdk.GetTransformArg("Transform in Working", T)
-    results["trans_in_work"] = csharp_array_to_python_2D_list(trans_in_work[1])
+    results["trans_in_work"] = csharp_array_to_numpy(trans_in_work[1]).tolist()
 
-    T = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    T = empty_list_wrapper()
     trans_optimum = NrkSdk.GetWorldTransformArg("Optimum Transform", T, 0.0)
-    results["trans_in_world"] = csharp_array_to_python_2D_list(trans_optimum[1])
+    results["trans_in_world"] = csharp_array_to_numpy(trans_optimum[1]).tolist()
     results["scale"] = trans_optimum[2]
 
     results["rms"] = NrkSdk.GetDoubleArg("RMS Deviation", 0.0)[1]
@@ -1266,6 +2310,7 @@ def best_fit_transformation_group_to_group(
     return results
 
 
+@sdk_transaction
 def get_measurement_weather_data(collection: str, group: str, name: str) -> dict:
     """p595"""
     func_name = "Get Measurement Weather Data"
@@ -1288,6 +2333,7 @@ def get_measurement_weather_data(collection: str, group: str, name: str) -> dict
     return returndict
 
 
+@sdk_transaction
 def get_measurement_auxiliary_data(collection: str, group: str, name: str, name_aux: str) -> dict:
     """p596"""
     func_name = "Get Measurement Auxiliary Data"
@@ -1306,6 +2352,7 @@ def get_measurement_auxiliary_data(collection: str, group: str, name: str, name_
     return returndict
 
 
+@sdk_transaction
 def get_measurement_info_data(collection: str, group: str, name: str) -> list:
     """p599"""
     func_name = "Get Measurement Info Data"
@@ -1327,6 +2374,8 @@ def get_measurement_info_data(collection: str, group: str, name: str) -> list:
     return results
 
 
+@invalidates("objects", "objects:{collection_relationship}")
+@sdk_transaction
 def make_point_to_point_relationship(
     collection_relationship: str,
     name_relationship: str,
@@ -1386,6 +2435,8 @@ def make_point_to_point_relationship(
     getResult(func_name)
 
 
+@invalidates("objects", "objects:{collection_relationship}")
+@sdk_transaction
 def make_group_to_nominal_group_relationship(
     collection_relationship: str,
     name_relationship: str,
@@ -1450,6 +2501,8 @@ def make_group_to_nominal_group_relationship(
     getResult(func_name)
 
 
+@invalidates("objects", "objects:{collection_relationship}", "objects:{collection_result}")
+@sdk_transaction
 def make_geometry_fit_and_compare_to_nominal_relationship(
     collection_relationship: str,
     name_relationship: str,
@@ -1479,6 +2532,8 @@ def make_geometry_fit_and_compare_to_nominal_relationship(
     getResult(func_name)
 
 
+@invalidates("objects", "objects:{collection}")
+@sdk_transaction
 def delete_relationship(collection: str, name_relationship: str) -> None:
     """p701"""
     func_name = "Delete Relationship"
@@ -1489,6 +2544,7 @@ def delete_relationship(collection: str, name_relationship: str) -> None:
     getResult(func_name)
 
 
+@sdk_transaction
 def get_general_relationship_statistics(collection: str, name_relationship: str) -> dict:
     """p704"""
     func_name = "Get General Relationship Statistics"
@@ -1506,6 +2562,7 @@ def get_general_relationship_statistics(collection: str, name_relationship: str)
     return results
 
 
+@sdk_transaction
 def get_geom_relationship_criteria(collection_relationship: str, name_relationship: str, criteria: str) -> dict:
     """p726"""
     func_name = "Get Geom Relationship Criteria"
@@ -1532,6 +2589,7 @@ def get_geom_relationship_criteria(collection_relationship: str, name_relationsh
     return results
 
 
+@sdk_transaction
 def set_relationship_associated_data(collection_relationship: str, name_relationship: str, method: str, **kwargs) -> None:
     """p708"""
     func_name = "Set Relationship Associated Data"
@@ -1548,7 +2606,7 @@ def set_relationship_associated_data(collection_relationship: str, name_relation
 
     if method == "points":
         # individual points
-        vPointObjectList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+        vPointObjectList = empty_list_wrapper()
         NrkSdk.SetPointNameRefListArg("Individual Points", vPointObjectList)
     elif method == "point_group":
         if "point_groups_data" not in kwargs:
@@ -1575,11 +2633,11 @@ def set_relationship_associated_data(collection_relationship: str, name_relation
         NrkSdk.SetCollectionObjectNameRefListArg("Point Groups", vObjectList)
     elif method == "point_cloud":
         # point cloud
-        vObjectList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+        vObjectList = empty_list_wrapper()
         NrkSdk.SetCollectionObjectNameRefListArg("Point Clouds", vObjectList)
     elif method == "objects":
         # objects
-        vObjectList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+        vObjectList = empty_list_wrapper()
         NrkSdk.SetCollectionObjectNameRefListArg("Objects", vObjectList)
 
     # additional setting
@@ -1588,6 +2646,7 @@ def set_relationship_associated_data(collection_relationship: str, name_relation
     getResult(func_name)
 
 
+@sdk_transaction
 def get_relationship_associated_data(collection_relationship: str, name_relationship: str) -> dict:
     """p709"""
     # The function only excepts 'groups' as an input.
@@ -1609,44 +2668,39 @@ def get_relationship_associated_data(collection_relationship: str, name_relation
         results["relationship_type"] = sValue[1]
 
     # individual_points
-    vPointObjectList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    vPointObjectList = empty_list_wrapper()
     userPtList = NrkSdk.GetPointNameRefListArg("Individual Points", vPointObjectList)
     # log.debug(f"userPtList: {userPtList}")
     if userPtList[0]:
-        for i in range(userPtList[1].GetLength(0)):
-            # log.debug(f"userPtList {i}: {userPtList[1][i]}")
-            results["individual_points"].append(userPtList[1][i].split("::"))  # splits the string in 'collection' and 'relationship_name'
+        results["individual_points"] = split_ref_list(userPtList[1])
 
     # point_groups
-    objNameList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    objNameList = empty_list_wrapper()
     PointGroups = NrkSdk.GetCollectionObjectNameRefListArg("Point Groups", objNameList)
     # log.debug(f"PointGroups: {PointGroups}")
     if PointGroups[0]:
-        for i in range(PointGroups[1].GetLength(0)):
-            # log.debug(f"PointGroups {i}: {PointGroups[1][i]}")
-            results["point_groups"].append(PointGroups[1][i].split("::"))  # splits the string in 'collection' and 'relationship_name'
+        results["point_groups"] = split_ref_list(PointGroups[1])
 
     # point_clouds
-    vObjectList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    vObjectList = empty_list_wrapper()
     PointClouds = NrkSdk.GetCollectionObjectNameRefListArg("Point Clouds", vObjectList)
     # log.debug(f"PointClouds: {PointClouds}")
     if PointClouds[0]:
-        for i in range(PointClouds[1].GetLength(0)):
-            log.debug(f"PointClouds {i}: {PointClouds[1][i]}")
-            results["point_clouds"].append(PointClouds[1][i])
+        results["point_clouds"] = csharp_string_array_to_list(PointClouds[1])
+        log.debug(f"PointClouds: {results['point_clouds']}")
 
     # objects
-    vObjectList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    vObjectList = empty_list_wrapper()
     objectList = NrkSdk.GetCollectionObjectNameRefListArg("Objects", vObjectList)
     # log.debug(f"objectList: {objectList}")
     if objectList[0]:
-        for i in range(objectList[1].GetLength(0)):
-            log.debug(f"object {i}: {objectList[1][i]}")
-            results["objects"].append(objectList[1][i])
+        results["objects"] = csharp_string_array_to_list(objectList[1])
+        log.debug(f"objects: {results['objects']}")
 
     return results
 
 
+@sdk_transaction
 def set_relationship_reporting_frame(collection_relationship: str, name_relationship: str, collection_frame: str, name_frame: str) -> None:
     """p723"""
     func_name = "Set Relationship Reporting Frame"
@@ -1658,6 +2712,7 @@ def set_relationship_reporting_frame(collection_relationship: str, name_relation
     getResult(func_name)
 
 
+@sdk_transaction
 def set_geom_relationship_criteria(collection_relationship: str, name_relationship: str, criteria_type: str) -> None:
     """p725"""
     func_name = "Set Geom Relationship Criteria"
@@ -1702,6 +2757,7 @@ def set_geom_relationship_criteria(collection_relationship: str, name_relationsh
     getResult(func_name)
 
 
+@sdk_transaction
 def set_geom_relationship_cardinal_points(collection_relationship: str, name_relationship: str, name_group: str) -> None:
     """p734"""
     func_name = "Set Geom Relationship Cardinal Points"
@@ -1715,6 +2771,7 @@ def set_geom_relationship_cardinal_points(collection_relationship: str, name_rel
     getResult(func_name)
 
 
+@sdk_transaction
 def get_geom_relationship_cardinal_points(collection_relationship: str, name_relationship: str) -> list[NamedPoint]:
     """p735"""
     func_name = "Get Geom Relationship Cardinal Points"
@@ -1725,16 +2782,14 @@ def get_geom_relationship_cardinal_points(collection_relationship: str, name_rel
     if not getResult(func_name):
         return []
 
-    ptNameList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    ptNameList = empty_list_wrapper()
     objectList = NrkSdk.GetCollectionObjectNameRefListArg("Cardinal Point Name List", ptNameList)
     if not objectList[0]:
         return []
-    points = []
-    for i in range(objectList[1].GetLength(0)):
-        points.append(NamedPoint(objectList[1][i].split("::")))
-    return points
+    return [NamedPoint(point) for point in zip(*ref_list_columns(objectList[1]))]
 
 
+@sdk_transaction
 def set_geom_relationship_auto_vectors_nominal_avn(collection_relationship: str, name_relationship: str, create_autovectors: bool) -> None:
     """p739"""
     func_name = "Set Geom Relationship Auto Vectors Nominal (AVN)"
@@ -1746,6 +2801,7 @@ def set_geom_relationship_auto_vectors_nominal_avn(collection_relationship: str,
     getResult(func_name)
 
 
+@sdk_transaction
 def set_relationship_auto_vectors_fit_avf(collection_relationship: str, name_relationship: str, create_autovectors: bool) -> None:
     """p740"""
     func_name = "Set Relationship Auto Vectors Fit (AVF)"
@@ -1757,6 +2813,7 @@ def set_relationship_auto_vectors_fit_avf(collection_relationship: str, name_rel
     getResult(func_name)
 
 
+@sdk_transaction
 def set_relationship_desired_meas_count(collection_relationship: str, name_relationship: str, count: int) -> None:
     """p742"""
     func_name = "Set Relationship Desired Meas Count"
@@ -1768,6 +2825,7 @@ def set_relationship_desired_meas_count(collection_relationship: str, name_relat
     getResult(func_name)
 
 
+@sdk_transaction
 def set_relationship_tolerance_vector_type(collection_relationship: str, name_relationship: str) -> None:
     """p746"""
     func_name = "Set Relationship Tolerance (Vector Type)"
@@ -1800,6 +2858,7 @@ def set_relationship_tolerance_vector_type(collection_relationship: str, name_re
 # ###################################
 # Chapter 9 - Reporting Operations ##
 # ###################################
+@sdk_transaction
 def set_vector_group_report_options(collection: str, name_vectorgroup: str, **kwargs) -> None:
     """p819"""
     func_name = "Set Vector Group Report Options"
@@ -1825,6 +2884,7 @@ def set_vector_group_report_options(collection: str, name_vectorgroup: str, **kw
     getResult(func_name)
 
 
+@sdk_transaction
 def set_relationship_report_options(collection_relationship: str, name_relationship: str, **kwargs) -> None:
     """p820"""
     func_name = "Set Relationship Report Options"
@@ -1850,6 +2910,7 @@ def set_relationship_report_options(collection_relationship: str, name_relations
     getResult(func_name)
 
 
+@sdk_transaction
 def notify_user_text_array(txt: str, timeout: int = 0) -> None:
     """p854"""
     func_name = "Notify User Text Array"
@@ -1878,6 +2939,7 @@ def notify_user_text_array(txt: str, timeout: int = 0) -> None:
 # #####################################
 # Chapter 12 - Instrument Operations ##
 # #####################################
+@sdk_transaction
 def get_last_instrument_index() -> int:
     """p920"""
     func_name = "Get Last Instrument Index"
@@ -1893,6 +2955,7 @@ def get_last_instrument_index() -> int:
     return InstID[1]
 
 
+@sdk_transaction
 def point_at_target(collection_inst: str, id_inst: int, collection_target: str, group_target: str, name_target: str) -> None:
     """p927"""
     func_name = "Point At Target"
@@ -1902,7 +2965,7 @@ def point_at_target(collection_inst: str, id_inst: int, collection_target: str,
     NrkSdk.SetPointNameArg("Target ID", collection_target, group_target, name_target)
     NrkSdk.SetFilePathArg("HTML Prompt File (optional)", "", False)
     NrkSdk.ExecuteStep()
-    result = getResult_Bare(func_name)
+    boolean, result = getResult_Bare(func_name)
     if result in [-1, 0, 3, 6]:
         log.error(f"Error code was: {result}")
         raise SystemError(f"Failed pointing at point: {collection_target}::{group_target}::{name_target}")
@@ -1910,6 +2973,8 @@ def point_at_target(collection_inst: str, id_inst: int, collection_target: str,
         return
 
 
+@invalidates("objects", "objects:{collection}")
+@sdk_transaction
 def measure_single_point_here(
     collection_inst: str, id_inst: int, collection: str, group: str, name: str, measure_immediately: bool = False
 ) -> bool:
@@ -1927,6 +2992,7 @@ def measure_single_point_here(
     return True
 
 
+@sdk_transaction
 def stop_active_measurement_mode(collection_inst: str, id_inst: int) -> bool:
     """p934"""
     func_name = "Stop Active Measurement Mode"
@@ -1939,6 +3005,8 @@ def stop_active_measurement_mode(collection_inst: str, id_inst: int) -> bool:
     return True
 
 
+@invalidates("objects", "objects:*")
+@sdk_transaction
 def add_new_instrument(inst_type: str) -> tuple[str, int]:
     """p939"""
     func_name = "Add New Instrument"
@@ -1955,10 +3023,12 @@ def add_new_instrument(inst_type: str) -> tuple[str, int]:
     return (Col_InstID[1], Col_InstID[2])
 
 
+@invalidates("objects", "objects:*")
+@sdk_transaction
 def initiate_servo_guide(
     collection_inst: str,
     id_inst: int,
-    nomPoints: list[Union[NamedPoint, NamedPoint3D]],
+    nomPoints: Union[list[Union[NamedPoint, NamedPoint3D]], PointSet],
     groupname_suffix: str = "",
     targetname_suffix: str = "",
     tolerance: float = 1.0,
@@ -1968,11 +3038,7 @@ def initiate_servo_guide(
     log.debug(func_name)
     NrkSdk.SetStep(func_name)
     NrkSdk.SetColInstIdArg("Instrument ID", collection_inst, id_inst)
-    ptList = []
-    for point in nomPoints:
-        ptList.append(f"{point.collection}::{point.group}::{point.name}")
-    ptNameList = python_list_to_csharp_list(ptList)
-    vPointObjectList = sa_py_tools.GetListWrapper(ptNameList)
+    vPointObjectList = sa_py_tools.GetListWrapper(csharp_list_from_iterable(_point_refs(nomPoints)))
     NrkSdk.SetPointNameRefListArg("Nominal Points", vPointObjectList)
     NrkSdk.SetStringArg("Group name suffix", groupname_suffix)
     NrkSdk.SetStringArg("Target name suffix", targetname_suffix)
@@ -1983,6 +3049,7 @@ def initiate_servo_guide(
     return True
 
 
+@sdk_transaction
 def watch_point_to_point(collection_inst: str, id_inst: int, ref_point: Union[NamedPoint, NamedPoint3D], measure_mode) -> None:
     """p945"""
     func_name = "Watch Point To Point"
@@ -2001,6 +3068,7 @@ def watch_point_to_point(collection_inst: str, id_inst: int, ref_point: Union[Na
     getResult(func_name)
 
 
+@sdk_transaction
 def watch_point_to_point_with_view_zooming(collection_inst: str, id_inst: int, ref_point: Union[NamedPoint, NamedPoint3D]) -> None:
     """p950"""
     func_name = "Watch Point To Point With View Zooming"
@@ -2013,6 +3081,7 @@ def watch_point_to_point_with_view_zooming(collection_inst: str, id_inst: int, r
     getResult(func_name)
 
 
+@sdk_transaction
 def start_instrument_interface(collection_inst: str, id_inst: int, initialize: bool = True, simulation: bool = False) -> None:
     """p952"""
     func_name = "Start Instrument Interface"
@@ -2028,6 +3097,7 @@ def start_instrument_interface(collection_inst: str, id_inst: int, initialize: b
     getResult(func_name)
 
 
+@sdk_transaction
 def stop_instrument_interface(collection_inst: str, id_inst: int) -> None:
     """p953"""
     func_name = "Stop Instrument Interface"
@@ -2038,6 +3108,7 @@ def stop_instrument_interface(collection_inst: str, id_inst: int) -> None:
     getResult(func_name)
 
 
+@sdk_transaction
 def verify_instrument_connection(collection_inst: str, id_inst: int) -> bool:
     """p955"""
     func_name = "Verify Instrument Connection"
@@ -2053,6 +3124,8 @@ def verify_instrument_connection(collection_inst: str, id_inst: int) -> bool:
     return bValue[1]
 
 
+@invalidates("objects", "objects:{collection_target}")
+@sdk_transaction
 def configure_and_measure(
     collection_inst: str,
     id_inst: int,
@@ -2063,8 +3136,12 @@ def configure_and_measure(
     measure_immediately: bool,
     wait_for_completion: bool,
     timeout_in_secs: float,
-) -> bool:
-    """p956"""
+    handle: bool = False,
+) -> Union[bool, StepHandle]:
+    """p956
+
+    With handle=True a StepHandle is returned right after executing the step, to check on the measurement later.
+    """
     func_name = "Configure and Measure"
     log.debug(func_name)
     NrkSdk.SetStep(func_name)
@@ -2075,19 +3152,29 @@ def configure_and_measure(
     NrkSdk.SetBoolArg("Wait for Completion", wait_for_completion)
     NrkSdk.SetDoubleArg("Timeout in Seconds", timeout_in_secs)
     NrkSdk.ExecuteStep()
-    return getResult(func_name)
+    if handle:
+        return StepHandle(func_name)
+    return getResult(func_name, wait=wait_for_completion)
+
 
+@invalidates("objects", "objects:*")
+@sdk_transaction
+def measure(collection_inst: str, id_inst: int, handle: bool = False) -> Union[bool, StepHandle]:
+    """p958
 
-def measure(collection_inst: str, id_inst: int) -> bool:
-    """p958"""
+    With handle=True a StepHandle is returned right after executing the step, to check on the measurement later.
+    """
     func_name = "Measure"
     log.debug(func_name)
     NrkSdk.SetStep(func_name)
     NrkSdk.SetColInstIdArg("Instrument's ID", collection_inst, id_inst)
     NrkSdk.ExecuteStep()
+    if handle:
+        return StepHandle(func_name)
     return getResult(func_name)
 
 
+@sdk_transaction
 def compute_CTE_scale_factor(cte: float, parttemp: float) -> float:
     """p979"""
     func_name = "Compute CTE Scale Factor"
@@ -2105,6 +3192,7 @@ def compute_CTE_scale_factor(cte: float, parttemp: float) -> float:
     return scaleFactor[1]
 
 
+@sdk_transaction
 def set_instrument_scale_absolute(collection_inst: str, id_inst: int, scale_factor: float) -> None:
     """p981"""
     func_name = "Set (absolute) Instrument Scale Factor (CAUTION!)"
@@ -2116,6 +3204,8 @@ def set_instrument_scale_absolute(collection_inst: str, id_inst: int, scale_fact
     getResult(func_name)
 
 
+@invalidates("objects", "objects:{collection_dest}")
+@sdk_transaction
 def move_measurement_observation(
     collection: str, group: str, name: str, index: int, collection_dest: str, group_dest: str, name_dest: str
 ) -> None:
@@ -2131,6 +3221,7 @@ def move_measurement_observation(
     getResult(func_name)
 
 
+@sdk_transaction
 def instrument_operational_check(collection_inst: str, id_inst: int, check_type: str) -> bool:
     """p986"""
     func_name = "Instrument Operational Check"
@@ -2145,6 +3236,7 @@ def instrument_operational_check(collection_inst: str, id_inst: int, check_type:
     return getResult(func_name)
 
 
+@sdk_transaction
 def get_number_of_observations_on_target(collection: str, group: str, name: str) -> int:
     """p998"""
     func_name = "Get Number of Observations on Target"
@@ -2161,6 +3253,7 @@ def get_number_of_observations_on_target(collection: str, group: str, name: str)
     return value[1]
 
 
+@sdk_transaction
 def get_targets_measured_by_instrument(collection: str, instrument_id: int) -> list[NamedPoint]:
     """p1000"""
     func_name = "Get Targets Measured by Instrument"
@@ -2172,19 +3265,16 @@ def get_targets_measured_by_instrument(collection: str, instrument_id: int) -> l
         log.error("Executing the function resluted with an error.")
         return []
 
-    userPtList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    userPtList = empty_list_wrapper()
     ptList = NrkSdk.GetPointNameRefListArg("Points Measured by Instrument", userPtList)
     if not ptList[0]:
         log.warning("Tracker doesn't have measured points.")
         return []
 
-    points = []
-    for i in range(ptList[1].GetLength(0)):
-        points.append(NamedPoint(ptList[1][i].split("::")))
-
-    return points
+    return [NamedPoint(point) for point in zip(*ref_list_columns(ptList[1]))]
 
 
+@sdk_transaction
 def get_observation_info(collection: str, group: str, name: str, index=0) -> dict:
     """p1002"""
     func_name = "Get Observation Info"
@@ -2229,6 +3319,7 @@ def get_observation_info(collection: str, group: str, name: str, index=0) -> dic
     return results
 
 
+@sdk_transaction
 def set_instrument_measurement_mode_profile(collection_inst: str, id_inst: int, mode_profile: str) -> None:
     """p1005"""
     func_name = "Set Instrument Measurement Mode/Profile"
@@ -2240,6 +3331,7 @@ def set_instrument_measurement_mode_profile(collection_inst: str, id_inst: int,
     getResult(func_name)
 
 
+@sdk_transaction
 def get_instrument_target_status(collection_inst: str, id_inst: int) -> dict:
     """p1013"""
     func_name = "Get Instrument Target Status"
@@ -2263,6 +3355,8 @@ def get_instrument_target_status(collection_inst: str, id_inst: int) -> dict:
     return results
 
 
+@invalidates("objects", "objects:{collection_measured}")
+@sdk_transaction
 def auto_measure_points(
     collection_inst: str,
     id_inst: int,
@@ -2286,6 +3380,8 @@ def auto_measure_points(
     getResult(func_name)
 
 
+@invalidates("objects", "objects:{collection_measured}")
+@sdk_transaction
 def auto_correspond_closest_point(
     collection_inst: str,
     id_inst: int,
@@ -2305,6 +3401,8 @@ def auto_correspond_closest_point(
     getResult(func_name)
 
 
+@invalidates("objects", "objects:{collection_measured}")
+@sdk_transaction
 def auto_correspond_with_proximity_trigger(
     collection_inst: str,
     id_inst: int,
@@ -2313,8 +3411,10 @@ def auto_correspond_with_proximity_trigger(
     collection_measured: str,
     group_measured: str,
     proximity: float,
+    vector_threshold: float = 0.25,
+    warbler_zone: float = 12.0,
 ) -> None:
-    """p1022"""
+    """p1022 - See also streaming.ProximityMatcher, for matching the measurements in Python while they come in."""
     func_name = "Auto-Correspond with Proximity Trigger"
     log.debug(func_name)
     NrkSdk.SetStep(func_name)
@@ -2322,9 +3422,9 @@ def auto_correspond_with_proximity_trigger(
     NrkSdk.SetCollectionObjectNameArg("Nominal Point Group or Vector Group", collection_nom, group_nom)
     NrkSdk.SetCollectionObjectNameArg("Results Point Group for measurements", collection_measured, group_measured)
     NrkSdk.SetDoubleArg("Point distance threshold", proximity)
-    NrkSdk.SetDoubleArg("Vector axis threshold", 0.250000)
+    NrkSdk.SetDoubleArg("Vector axis threshold", vector_threshold)
     NrkSdk.SetBoolArg("Project results to nominal vector", False)
-    NrkSdk.SetDoubleArg("Warbler ramp start zone distance", 12.000000)
+    NrkSdk.SetDoubleArg("Warbler ramp start zone distance", warbler_zone)
     NrkSdk.SetBoolArg("Show Watch window on startup", False)
     NrkSdk.SetVectorGroupNameArg("Vector Group to make while Measuring (blank means ignore)", "")
     NrkSdk.SetBoolArg("Make unmeasured group when done", False)
@@ -2341,6 +3441,8 @@ def auto_correspond_with_proximity_trigger(
 # ##################################
 # Chapter 14 - Utility Operations ##
 # ##################################
+@invalidates("collections", "folders", "objects", "objects:*")
+@sdk_transaction
 def delete_folder(foldername: str) -> None:
     """p1116"""
     func_name = "Delete Folder"
@@ -2351,6 +3453,8 @@ def delete_folder(foldername: str) -> None:
     getResult(func_name)
 
 
+@invalidates("collections", "folders")
+@sdk_transaction
 def move_collection_to_folder(collection: str, folder: str) -> None:
     """p1117"""
     func_name = "Move Collection to Folder"
@@ -2362,6 +3466,8 @@ def move_collection_to_folder(collection: str, folder: str) -> None:
     getResult(func_name)
 
 
+@cached_query("folders")
+@sdk_transaction
 def get_folders_by_wildcard(search: str) -> list[str]:
     """p1119"""
     func_name = "Get Folders by Wildcard"
@@ -2372,16 +3478,15 @@ def get_folders_by_wildcard(search: str) -> list[str]:
     NrkSdk.ExecuteStep()
     getResult(func_name)
 
-    stringList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    stringList = empty_list_wrapper()
     vStringList = NrkSdk.GetStringRefListArg("Folder List", stringList)
-    if vStringList[0]:
+    if not vStringList[0]:
         return []
-    folders = []
-    for i in range(vStringList[1].GetLength(0)):
-        folders.append(vStringList[1][i])
-    return folders
+    return csharp_string_array_to_list(vStringList[1])
 
 
+@cached_query("collections", "folders")
+@sdk_transaction
 def get_folder_collections(folder: str) -> list[str]:
     """p1122"""
     func_name = "Get Folder Collections"
@@ -2391,16 +3496,14 @@ def get_folder_collections(folder: str) -> list[str]:
     NrkSdk.ExecuteStep()
     getResult(func_name)
 
-    stringList = sa_py_tools.GetListWrapper(python_list_to_csharp_list([]))
+    stringList = empty_list_wrapper()
     vStringList = NrkSdk.GetStringRefListArg("Collection List", stringList)
     if not vStringList[0]:
         return []
-    folders = []
-    for i in range(vStringList[1].GetLength(0)):
-        folders.append(vStringList[1][i])
-    return folders
+    return csharp_string_array_to_list(vStringList[1])
 
 
+@sdk_transaction
 def set_collection_notes(collection: str, notes: str) -> None:
     """p1125"""
     func_name = "Set Collection Notes"
@@ -2415,6 +3518,7 @@ def set_collection_notes(collection: str, notes: str) -> None:
     getResult(func_name)
 
 
+@sdk_transaction
 def set_working_frame(collection: str, name: str) -> None:
     """p1142"""
     func_name = "Set Working Frame"
@@ -2425,6 +3529,8 @@ def set_working_frame(collection: str, name: str) -> None:
     getResult(func_name)
 
 
+@invalidates("objects", "objects:{collection}")
+@sdk_transaction
 def delete_objects(collection: str, name: str, objtype: str) -> None:
     """p1151"""
     func_name = "Delete Objects"
@@ -2440,6 +3546,21 @@ def delete_objects(collection: str, name: str, objtype: str) -> None:
     getResult(func_name)
 
 
+@invalidates("objects", "objects:*")
+def delete_object_list(objects: list, chunk_size: int = REF_LIST_CHUNK_SIZE) -> bool:
+    """p1151 - Delete many objects, 'chunk_size' objects per step.
+
+    The objects are (collection, name, type) tuples or 'collection::name::type' strings.
+    """
+    refs = [_object_ref(obj) for obj in objects]
+    failed = _ref_list_operation("Delete Objects", "Object Names", refs, chunk_size)
+    if failed:
+        log.error(f"Failed to delete {failed} of {len(refs)} objects")
+    return not failed
+
+
+@invalidates("objects", "objects:*")
+@sdk_transaction
 def delete_items():
     """p1152"""
     func_name = "Delete Items"
@@ -2450,6 +3571,7 @@ def delete_items():
     getResult(func_name)
 
 
+@sdk_transaction
 def set_interaction_mode(sa_interaction_mode: str, mp_interaction_mode: str, mp_dialog_interaction_mode: str) -> None:
     """p1180"""
     func_name = "Set Interaction Mode"
@@ -2495,3 +3617,48 @@ def set_interaction_mode(sa_interaction_mode: str, mp_interaction_mode: str, mp_
 # #########################
 # Chapter 19 - Variables ##
 # #########################
+
+
+# The analysis modules are imported on first use of one of their names, such that "import SAPyLib" only loads the
+# SDK wrappers (and no .NET runtime).
+_LAZY_MODULES = {
+    "snapshot": ("JobSnapshot", "snapshot_job"),
+    "selection": ("delete_objects_matching", "delete_points_matching", "select_objects", "select_points", "select_relationships"),
+    "bestfit": ("best_fit", "best_fit_groups", "best_fit_subsets"),
+    "fitting": ("fit_geometries", "fit_geometry", "fit_geometry_to_group"),
+    "robust": ("robust_fit", "robust_fit_many", "robust_fit_to_point_groups"),
+    "spatial": ("KDTree", "correspond", "correspond_groups", "rename_to_nominals"),
+    "streaming": ("MatchEvent", "Observation", "ProximityMatcher", "poll_group_feed", "simulated_feed"),
+    "route": ("optimize_route",),
+    "pipeline": ("MeasurePipeline", "MeasureRecord"),
+    "orchestrator": ("Orchestrator", "start_instruments"),
+}
+_LAZY_NAMES = {name: module for module, names in _LAZY_MODULES.items() for name in names}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_MODULES:
+        return importlib.import_module(f".{name}", __name__)
+    module = _LAZY_NAMES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_LAZY_NAMES})
+
+
+# The public names: the wrappers, classes, constants and SDK handles of this module and the names of the analysis modules
+__all__ = sorted(
+    {
+        name
+        for name, value in globals().items()
+        if not name.startswith("_")
+        and (name.isupper() or ((inspect.isfunction(value) or inspect.isclass(value)) and value.__module__.startswith(__name__)))
+    }
+    | {"NrkSdk", "sa_py_tools", "default_wait_strategy", "log"}
+    | _LAZY_NAMES.keys()
+)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio versions of the SAPyLib wrapper functions.
+
+Every SDK wrapper of SAPyLib is available here as a coroutine function with the same name and arguments. The calls
+are executed on the SDK thread of the active session (started on first use), so the event loop keeps running while
+SA works:
+
+    from SAPyLib import aio
+
+    await aio.point_at_target(instCol, instId, nomCol, nomGroup, "p1")
+    ok = await asyncio.wait_for(aio.configure_and_measure(instCol, instId, ...), timeout=30)
+
+The generated coroutine functions wait at most 'default_timeout' seconds, run() takes a '_timeout' argument.
+Timeouts and cancellation apply to waiting for the result. A call that is still queued is removed from the queue,
+a step that SA already executes can't be interrupted and runs to completion on the SDK thread.
+Blocking (non async) wrapper calls made in between are executed on the same SDK thread, in order.
+"""
+import asyncio
+import functools
+import sys
+
+from . import get_session
+
+_sa = sys.modules[__package__]
+
+# Timeout (seconds) used by the generated coroutine functions, None waits forever
+default_timeout = None
+
+# Functions that aren't a single SDK transaction themselves, but consist of several
+_COMPOSITE_FUNCTIONS = (
+    "construct_points",
+    "rename_points",
+    "make_a_point_name_ref_list_from_a_group",
+    "make_a_point_set_from_a_group",
+    "get_group_coordinates",
+    "get_group_point_set",
+    "delete_point_list",
+    "delete_object_list",
+    "show_object_list",
+    "hide_object_list",
+    "best_fit_groups",
+    "fit_geometry_to_group",
+    "robust_fit_to_point_groups",
+    "correspond_groups",
+    "rename_to_nominals",
+    "select_objects",
+    "select_points",
+    "select_relationships",
+    "delete_points_matching",
+    "delete_objects_matching",
+    "start_instruments",
+)
+
+
+async def _executor():
+    session = get_session()
+    executor = session.executor
+    if executor is None:
+        # starting the SDK thread connects to SA, which doesn't block the event loop in a worker thread
+        executor = await asyncio.get_running_loop().run_in_executor(None, session.start_executor)
+    return executor
+
+
+async def _run(func, args: tuple, kwargs: dict, timeout: float):
+    future = (await _executor()).submit(func, *args, **kwargs)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except (asyncio.CancelledError, asyncio.TimeoutError):
+        # only removes the call when it hasn't started yet
+        future.cancel()
+        raise
+
+
+async def run(func, *args, _timeout: float = None, **kwargs):
+    """Run any (wrapper) function on the SDK thread and await its result, waiting at most '_timeout' seconds.
+
+    The keyword arguments are passed to the function, '_timeout' is underscored to keep it apart from them.
+    """
+    return await _run(func, args, kwargs, _timeout)
+
+
+def _make_async(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await _run(func, args, kwargs, default_timeout)
+
+    return wrapper
+
+
+__all__ = ["run", "default_timeout"]
+for _name in dir(_sa):
+    _func = getattr(_sa, _name)
+    if _name.startswith("_") or not callable(_func):
+        continue
+    if hasattr(_func, "sdk_function") or _name in _COMPOSITE_FUNCTIONS:
+        globals()[_name] = _make_async(_func)
+        __all__.append(_name)
+del _name, _func
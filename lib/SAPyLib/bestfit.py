@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Local rigid (and similarity) best fit of a corresponding point set onto a reference point set.
+
+The result dict has the keys of best_fit_transformation_group_to_group(), such that candidate point selections can
+be evaluated locally and only the final best fit is done in SA. The transform maps the corresponding points onto the
+reference points: reference ~= scale * R @ corresponding + t, with 'trans_in_world' = [[R, t], [0, 0, 0, 1]].
+
+Without locked degrees of freedom the fit is the closed form SVD solution (Kabsch/Umeyama), also for thousands of
+point subsets at once (best_fit_subsets). With locked degrees of freedom (translations and/or X-Y-Z rotation angles,
+R = Rz @ Ry @ Rx) the free parameters are solved with Gauss-Newton, starting from the closed form solution.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from . import PointSet, get_group_point_set, log
+
+_SUBSET_CHUNK = 256  # subsets per block in best_fit_subsets, bounds the (subsets, points, 3) temporary arrays
+
+
+def _as_points(xyz) -> np.ndarray:
+    xyz = np.asarray(xyz, dtype=np.float64)
+    if xyz.ndim != 2 or xyz.shape[1] != 3:
+        raise ValueError(f"Expected an (N,3) coordinate array, got shape: {xyz.shape}")
+    return xyz
+
+
+def _transform(rotation: np.ndarray, translation: np.ndarray) -> np.ndarray:
+    """Get the 4x4 (or (K,4,4)) homogeneous transforms of rotations and translations."""
+    transform = np.zeros(rotation.shape[:-2] + (4, 4))
+    transform[..., :3, :3] = rotation
+    transform[..., :3, 3] = translation
+    transform[..., 3, 3] = 1.0
+    return transform
+
+
+def best_fit_subsets(reference, corresponding, subsets, allow_scale: bool = False) -> dict:
+    """Best fit the corresponding onto the reference (N,3) points, for K subsets of the points at once.
+
+    'subsets' is a (K,N) boolean mask (or non-negative weights) array, every subset needs 3 or more points.
+    Returns a dict of arrays: 'trans_in_world' (K,4,4), 'scale', 'rms', 'max_abs_dev' and 'n_points' (K,).
+    """
+    ref = _as_points(reference)
+    corr = _as_points(corresponding)
+    if ref.shape != corr.shape:
+        raise ValueError(f"The reference {ref.shape} and corresponding {corr.shape} points don't match.")
+    weights = np.atleast_2d(np.asarray(subsets, dtype=np.float64))
+    if weights.shape[1] != ref.shape[0]:
+        raise ValueError(f"Expected subsets of {ref.shape[0]} points, got shape: {weights.shape}")
+    total = weights.sum(axis=1)
+    if np.any(np.count_nonzero(weights, axis=1) < 3):
+        raise ValueError("A best fit needs at least 3 points per subset.")
+
+    # center on the overall means first, to keep the moment sums below accurate for far away coordinates
+    ref_offset = ref.mean(axis=0)
+    corr_offset = corr.mean(axis=0)
+    r = ref - ref_offset
+    c = corr - corr_offset
+
+    mean_r = weights @ r / total[:, None]
+    mean_c = weights @ c / total[:, None]
+    cov = np.einsum("kn,ni,nj->kij", weights, c, r) - total[:, None, None] * mean_c[:, :, None] * mean_r[:, None, :]
+    u, s, vt = np.linalg.svd(cov)
+    d = np.sign(np.linalg.det(np.swapaxes(vt, 1, 2) @ np.swapaxes(u, 1, 2)))
+    d[d == 0] = 1.0
+    s[:, 2] *= d
+    vt[:, 2, :] *= d[:, None]
+    rotation = np.swapaxes(vt, 1, 2) @ np.swapaxes(u, 1, 2)
+
+    if allow_scale:
+        var_c = weights @ np.einsum("ni,ni->n", c, c) - total * np.einsum("ki,ki->k", mean_c, mean_c)
+        scale = s.sum(axis=1) / var_c
+    else:
+        scale = np.ones(len(weights))
+    translation = mean_r + ref_offset - scale[:, None] * np.einsum("kij,kj->ki", rotation, mean_c + corr_offset)
+
+    rms = np.empty(len(weights))
+    max_abs_dev = np.empty(len(weights))
+    for start in range(0, len(weights), _SUBSET_CHUNK):
+        block = slice(start, start + _SUBSET_CHUNK)
+        fitted = scale[block, None, None] * np.einsum("kij,nj->kni", rotation[block], corr) + translation[block, None, :]
+        dev = np.linalg.norm(fitted - ref, axis=2)
+        w = weights[block]
+        rms[block] = np.sqrt(np.einsum("kn,kn->k", w, dev * dev) / total[block])
+        max_abs_dev[block] = np.where(w > 0, dev, 0.0).max(axis=1)
+
+    return {
+        "trans_in_world": _transform(rotation, translation),
+        "scale": scale,
+        "rms": rms,
+        "max_abs_dev": max_abs_dev,
+        "n_points": np.count_nonzero(weights, axis=1),
+    }
+
+
+def _rotation(angles: np.ndarray) -> tuple:
+    """Get R = Rz @ Ry @ Rx of the X-Y-Z angles, and its derivatives to the three angles."""
+    cx, cy, cz = np.cos(angles)
+    sx, sy, sz = np.sin(angles)
+    rx = np.array([[1.0, 0.0, 0.0], [0.0, cx, -sx], [0.0, sx, cx]])
+    ry = np.array([[cy, 0.0, sy], [0.0, 1.0, 0.0], [-sy, 0.0, cy]])
+    rz = np.array([[cz, -sz, 0.0], [sz, cz, 0.0], [0.0, 0.0, 1.0]])
+    drx = np.array([[0.0, 0.0, 0.0], [0.0, -sx, -cx], [0.0, cx, -sx]])
+    dry = np.array([[-sy, 0.0, cy], [0.0, 0.0, 0.0], [-cy, 0.0, -sy]])
+    drz = np.array([[-sz, -cz, 0.0], [cz, -sz, 0.0], [0.0, 0.0, 0.0]])
+    return rz @ ry @ rx, (rz @ ry @ drx, rz @ dry @ rx, drz @ ry @ rx)
+
+
+def _euler_angles(rotation: np.ndarray) -> np.ndarray:
+    """Get the X-Y-Z angles of R = Rz @ Ry @ Rx."""
+    return np.array(
+        [
+            np.arctan2(rotation[2, 1], rotation[2, 2]),
+            -np.arcsin(np.clip(rotation[2, 0], -1.0, 1.0)),
+            np.arctan2(rotation[1, 0], rotation[0, 0]),
+        ]
+    )
+
+
+def _constrained_fit(ref: np.ndarray, corr: np.ndarray, weights: np.ndarray, free: np.ndarray, start: dict) -> tuple:
+    """Gauss-Newton fit of the free parameters [tx, ty, tz, rx, ry, rz, log(scale)], the others stay 0."""
+    params = np.zeros(7)
+    params[:3] = start["trans_in_world"][0, :3, 3]
+    params[3:6] = _euler_angles(start["trans_in_world"][0, :3, :3])
+    params[6] = np.log(start["scale"][0])
+    params[~free] = 0.0
+    sqrt_w = np.sqrt(weights)[:, None]
+
+    for _ in range(100):
+        rotation, derivatives = _rotation(params[3:6])
+        scale = np.exp(params[6])
+        rotated = corr @ rotation.T
+        residual = (scale * rotated + params[:3] - ref) * sqrt_w
+        jacobian = np.empty((len(ref), 3, 7))
+        jacobian[:, :, :3] = np.eye(3)
+        for i, derivative in enumerate(derivatives):
+            jacobian[:, :, 3 + i] = scale * corr @ derivative.T
+        jacobian[:, :, 6] = scale * rotated
+        jacobian *= sqrt_w[:, :, None]
+        step = np.linalg.lstsq(jacobian.reshape(-1, 7)[:, free], -residual.ravel(), rcond=None)[0]
+        params[free] += step
+        if np.max(np.abs(step)) < 1e-12:
+            break
+
+    rotation = _rotation(params[3:6])[0]
+    return rotation, params[:3].copy(), float(np.exp(params[6]))
+
+
+def best_fit(
+    reference,
+    corresponding,
+    allow_scale: bool = False,
+    allow_x: bool = True,
+    allow_y: bool = True,
+    allow_z: bool = True,
+    allow_rx: bool = True,
+    allow_ry: bool = True,
+    allow_rz: bool = True,
+    weights=None,
+    working_transform=None,
+) -> dict:
+    """Best fit the corresponding onto the reference (N,3) points, like best_fit_transformation_group_to_group().
+
+    The locked (not allowed) degrees of freedom stay zero (scale one). 'weights' are optional per point weights,
+    'working_transform' is the working frame in world (for 'trans_in_work'). The result also has the per point
+    'deviations'. SA's 'robustness' isn't computed locally (NaN).
+    """
+    ref = _as_points(reference)
+    corr = _as_points(corresponding)
+    weights = np.ones(len(ref)) if weights is None else np.asarray(weights, dtype=np.float64)
+    free = np.array([allow_x, allow_y, allow_z, allow_rx, allow_ry, allow_rz, allow_scale])
+
+    fit = best_fit_subsets(ref, corr, weights[None, :], allow_scale)
+    if free.all() or (free[:6].all() and not allow_scale):
+        transform = fit["trans_in_world"][0]
+        scale = float(fit["scale"][0])
+    else:
+        rotation, translation, scale = _constrained_fit(ref, corr, weights, free, fit)
+        transform = _transform(rotation, translation)
+
+    deviations = np.linalg.norm(scale * corr @ transform[:3, :3].T + transform[:3, 3] - ref, axis=1)
+    used = weights > 0
+    if working_transform is None:
+        trans_in_work = transform
+    else:
+        working = np.reshape(np.asarray(working_transform, dtype=np.float64), (4, 4))
+        trans_in_work = np.linalg.inv(working) @ transform @ working
+
+    return {
+        "trans_in_work": trans_in_work.tolist(),
+        "trans_in_world": transform.tolist(),
+        "scale": scale,
+        "rms": float(np.sqrt(np.sum(weights * deviations**2) / np.sum(weights))),
+        "max_abs_dev": float(deviations[used].max()),
+        "n_unknown": int(np.count_nonzero(free)),
+        "n_equations": int(3 * np.count_nonzero(used)),
+        "robustness": float("nan"),
+        "deviations": deviations,
+    }
+
+
+def match_points(reference: PointSet, corresponding: PointSet) -> tuple:
+    """Pair the points of two PointSets by name.
+
+    Returns the (M,3) reference and corresponding coordinates and the M common names, in reference order.
+    """
+    ref_index = []
+    corr_index = []
+    for i, name in enumerate(reference.names.tolist()):
+        j = corresponding.index(name)
+        if j is not None:
+            ref_index.append(i)
+            corr_index.append(j)
+    names = reference.names[ref_index].tolist()
+    return reference.xyz[ref_index], corresponding.xyz[corr_index], names
+
+
+def best_fit_groups(collection_ref: str, group_ref: str, collection_corr: str, group_corr: str, allow_scale: bool = False, **kwargs) -> dict:
+    """Read two point groups from SA and best fit them locally, the points are paired by name.
+
+    The keyword arguments are those of best_fit() (DOF locks, weights, working frame).
+    """
+    reference = get_group_point_set(collection_ref, group_ref)
+    corresponding = get_group_point_set(collection_corr, group_corr)
+    ref, corr, names = match_points(reference, corresponding)
+    valid = ~(np.isnan(ref).any(axis=1) | np.isnan(corr).any(axis=1))
+    log.debug(f"Local best fit: {np.count_nonzero(valid)} common points of {collection_ref}::{group_ref} and {collection_corr}::{group_corr}")
+    return best_fit(ref[valid], corr[valid], allow_scale, **kwargs)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Read-through cache for the read-only job structure queries.
+
+Entries are evicted least recently used (LRU) once 'maxsize' is reached, and expire after 'ttl' seconds (when set).
+Every entry carries tags (e.g. "collections", "objects:MyCollection"), the mutating wrappers invalidate the tags
+they affect. A query result fetched while an invalidation happened isn't stored, it may predate the change.
+"""
+import threading
+from collections import OrderedDict
+from time import monotonic
+
+
+class QueryCache:
+    """An LRU/TTL cache with tag based invalidation."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = None) -> None:
+        if maxsize < 1:
+            raise ValueError("The cache size should be at least 1.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0  # incremented by every invalidation
+        self._entries = OrderedDict()  # key -> (value, tags, expires)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key) -> tuple:
+        """Get (True, value) for a valid entry, otherwise (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] is None or entry[2] > monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return (True, entry[0])
+                del self._entries[key]
+            self.misses += 1
+            return (False, None)
+
+    def put(self, key, value, tags: frozenset, generation: int = None) -> bool:
+        """Store an entry, unless the cache was invalidated since 'generation' (the generation before the fetch).
+
+        Returns whether the entry was stored.
+        """
+        expires = None if self.ttl is None else monotonic() + self.ttl
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._entries[key] = (value, tags, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, tags) -> int:
+        """Remove all entries with any of the tags, the number of removed entries is returned.
+
+        A tag ending with a '*' removes all entries with a tag starting with the part before it.
+        """
+        exact = set()
+        prefixes = []
+        for tag in tags:
+            if tag.endswith("*"):
+                prefixes.append(tag[:-1])
+            else:
+                exact.add(tag)
+        prefixes = tuple(prefixes)
+        with self._lock:
+            self.generation += 1
+            stale = [
+                key
+                for key, (_, entry_tags, _) in self._entries.items()
+                if not exact.isdisjoint(entry_tags) or (prefixes and any(tag.startswith(prefixes) for tag in entry_tags))
+            ]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Bookkeeping of the display commands queued by a batch_display() block.
+
+Only the net effect of the queued commands is kept: the last visibility per object, per (collection, object type) and
+per callout view, and the last center graphics call. A show/hide by object type replaces the earlier queued
+visibility of the objects of that type. The commands() of the batch is the minimal sequence of steps to get the same
+display state.
+"""
+
+
+class DisplayBatch:
+    """The net display changes of a batch of display commands."""
+
+    def __init__(self, recenter: bool = False) -> None:
+        self.recenter = recenter
+        self.queued = 0
+        self._objects = {}  # 'collection::name::type' -> visible
+        self._types = {}  # (collection, object type) -> hide
+        self._callouts = {}  # (collection, callout name) -> show
+        self._hide_all_callouts = False
+        self._center = None  # (args, kwargs) of the last center graphics call
+
+    def set_objects_visible(self, refs, visible: bool) -> None:
+        for ref in refs:
+            self._objects[ref] = visible
+            self.queued += 1
+
+    def set_type_hidden(self, collection: str, objtype: str, hide: bool) -> None:
+        self.queued += 1
+        for ref in [ref for ref in self._objects if _replaced_by_type(ref, collection, objtype)]:
+            del self._objects[ref]
+        if objtype == "Any":
+            for key in [key for key in self._types if key[0] == collection]:
+                del self._types[key]
+        self._types[(collection, objtype)] = hide
+
+    def set_callout_shown(self, collection: str, calloutname: str, show: bool) -> None:
+        self.queued += 1
+        self._callouts[(collection, calloutname)] = show
+
+    def hide_all_callouts(self) -> None:
+        self.queued += 1
+        self._callouts.clear()
+        self._hide_all_callouts = True
+
+    def center(self, args: tuple, kwargs: dict) -> None:
+        self.queued += 1
+        self._center = (args, kwargs)
+
+    def commands(self) -> list:
+        """Get the minimal commands as (wrapper name, args, kwargs) tuples, in execution order."""
+        commands = []
+        if self._hide_all_callouts:
+            commands.append(("hide_all_callout_views", (), {}))
+        for (collection, objtype), hide in self._types.items():
+            commands.append(("show_hide_by_object_type", (collection, objtype, hide), {}))
+        shown = [ref for ref, visible in self._objects.items() if visible]
+        hidden = [ref for ref, visible in self._objects.items() if not visible]
+        if shown:
+            commands.append(("show_object_list", (shown,), {}))
+        if hidden:
+            commands.append(("hide_object_list", (hidden,), {}))
+        for (collection, name), show in self._callouts.items():
+            commands.append(("show_hide_callout_view", (collection, name, show), {}))
+        if self._center is not None:
+            commands.append(("center_graphics_about_objects", *self._center))
+        elif self.recenter:
+            commands.append(("center_graphics_about_objects", (), {}))
+        return commands
+
+
+def _replaced_by_type(ref: str, collection: str, objtype: str) -> bool:
+    parts = ref.split("::")
+    return parts[0] == collection and (objtype == "Any" or parts[-1] == objtype)
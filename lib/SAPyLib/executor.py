@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+A dedicated SDK thread, that executes the SA SDK transactions one by one.
+
+The SA SDK is a stateful builder (SetStep, Set*Arg, ExecuteStep, Get*Arg), so a wrapper function has to run as a
+whole before the next one can start. The executor runs them on a single thread, which is also initialized as a
+single-threaded COM apartment (STA) on Windows.
+"""
+import ctypes
+import logging
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+COINIT_APARTMENTTHREADED = 0x2
+
+
+class SdkExecutor:
+    """Runs the submitted SDK transactions in order on one dedicated thread."""
+
+    def __init__(self, initializer=None) -> None:
+        self._thread_id = None
+        self._initializer = initializer
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="SA-SDK", initializer=self._initialize)
+        # Start the thread right away, such that its initialization errors show up here
+        self._pool.submit(lambda: None).result()
+
+    def _initialize(self) -> None:
+        self._thread_id = threading.get_ident()
+        if sys.platform == "win32":
+            result = ctypes.windll.ole32.CoInitializeEx(None, COINIT_APARTMENTTHREADED)
+            if result < 0:
+                log.warning(f"SDK thread COM initialization returned: {result:#x}")
+        if self._initializer is not None:
+            self._initializer()
+
+    @property
+    def thread_id(self) -> int:
+        return self._thread_id
+
+    def is_executor_thread(self) -> bool:
+        """Check if the calling thread is the SDK thread."""
+        return threading.get_ident() == self._thread_id
+
+    def submit(self, func, *args, **kwargs) -> Future:
+        """Queue a transaction, a future with its result is returned."""
+        return self._pool.submit(func, *args, **kwargs)
+
+    def call(self, func, *args, **kwargs):
+        """Run a transaction on the SDK thread and wait for its result."""
+        if self.is_executor_thread():
+            return func(*args, **kwargs)
+        return self._pool.submit(func, *args, **kwargs).result()
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False) -> None:
+        """Stop the SDK thread, after the queued transactions (unless 'cancel_pending') are done."""
+        self._pool.shutdown(wait=wait, cancel_futures=cancel_pending)
@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""
+Local least squares fitting of lines, planes, circles, spheres and cylinders to point groups.
+
+Many point groups are fitted in one call: the points of all groups are concatenated and every fitting step (moments,
+normal equations, Gauss-Newton iterations) is done for all groups at once with segment sums. The results follow
+fit_geometry_to_point_group(): the deviations of the points to the fitted geometry, the RMS and the out of tolerance
+points, for 'fit_tol' > 0. With 'out_tol' (Ignore Out of Tolerance Points) the geometry is fitted again without the
+out of tolerance points, until the set of used points doesn't change.
+
+Deviations: a line gives the distance to the line, a plane the signed distance along the normal, a circle the signed
+radial distance in the circle plane, a sphere and a cylinder the signed radial distance.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from . import get_group_coordinates, log
+
+GEOMETRY_TYPES = ("Line", "Plane", "Circle", "Sphere", "Cylinder")
+_MIN_POINTS = {"Line": 2, "Plane": 3, "Circle": 3, "Sphere": 4, "Cylinder": 5}
+_MAX_REFITS = 10  # fits without the out of tolerance points, with out_tol
+_COST_TOL = 1e-12  # relative change of the sum of squared residuals, Gauss-Newton convergence
+
+
+class _Groups:
+    """The concatenated points of the groups, with the group index of every point."""
+
+    def __init__(self, groups: list) -> None:
+        arrays = [np.asarray(xyz, dtype=np.float64).reshape(-1, 3) for xyz in groups]
+        self.counts = np.array([len(xyz) for xyz in arrays])
+        self.starts = np.concatenate(([0], np.cumsum(self.counts)[:-1]))
+        self.points = np.concatenate(arrays) if arrays else np.empty((0, 3))
+        self.index = np.repeat(np.arange(len(arrays)), self.counts)
+
+    def sum(self, values: np.ndarray) -> np.ndarray:
+        return np.add.reduceat(values, self.starts, axis=0)
+
+    def mean(self, values: np.ndarray) -> np.ndarray:
+        return self.sum(values) / self.counts.reshape((-1,) + (1,) * (values.ndim - 1))
+
+    def split(self, values: np.ndarray) -> list:
+        return np.split(values, self.starts[1:])
+
+
+def _principal_axes(groups: _Groups) -> tuple:
+    """Get the centroids and the principal axes (columns, by increasing variance) of the groups."""
+    centroids = groups.mean(groups.points)
+    centered = groups.points - centroids[groups.index]
+    covariance = groups.sum(centered[:, :, None] * centered[:, None, :])
+    return centroids, np.linalg.eigh(covariance)[1]
+
+
+def _frame(axis: np.ndarray) -> np.ndarray:
+    """Get (G,3,3) orthonormal frames (columns) with the (G,3) axes as third column."""
+    helper = np.where(np.abs(axis[:, :1]) < 0.9, [[1.0, 0.0, 0.0]], [[0.0, 1.0, 0.0]])
+    e1 = np.cross(axis, helper)
+    e1 /= np.linalg.norm(e1, axis=1, keepdims=True)
+    return np.stack((e1, np.cross(axis, e1), axis), axis=2)
+
+
+def _solve(lhs: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """Solve the batched normal equations, slightly damped against singular systems."""
+    damping = 1e-12 * np.trace(lhs, axis1=1, axis2=2)[:, None, None] * np.eye(lhs.shape[1])
+    return np.linalg.solve(lhs + damping, rhs[..., None])[..., 0]
+
+
+def _gauss_newton(groups: _Groups, residual, params: np.ndarray, jacobian=None, iterations: int = 50) -> tuple:
+    """Minimise the residuals of all groups, returns the (G,P) parameters and whether every group converged.
+
+    'residual(per point params)' gives the (M,) residuals, 'jacobian(per point params)' their (M,P) derivatives
+    (finite differences without it).
+    """
+    converged = np.zeros(len(params), dtype=bool)
+    previous = np.full(len(params), np.inf)
+    for _ in range(iterations):
+        per_point = params[groups.index]
+        r = residual(per_point)
+        # or the sum of squared residuals doesn't change anymore
+        cost = groups.sum(r * r)
+        converged |= np.abs(previous - cost) <= _COST_TOL * cost
+        previous = cost
+        if converged.all():
+            break
+        if jacobian is not None:
+            J = jacobian(per_point)
+        else:
+            J = np.empty((len(r), params.shape[1]))
+            for k in range(params.shape[1]):
+                h = 1e-7 * np.maximum(1.0, np.abs(params[:, k]))
+                shifted = params.copy()
+                shifted[:, k] += h
+                J[:, k] = (residual(shifted[groups.index]) - r) / h[groups.index]
+        step = _solve(groups.sum(J[:, :, None] * J[:, None, :]), -groups.sum(J * r[:, None]))
+        step[converged] = 0.0  # converged groups stay put while the others iterate
+        params = params + step
+        # below the finite difference noise level
+        converged |= np.max(np.abs(step), axis=1) < 1e-8 * np.maximum(1.0, np.max(np.abs(params), axis=1))
+        if converged.all():
+            break
+    return params, converged
+
+
+def _radial_jacobian(points: np.ndarray):
+    """Get the jacobian function of the residuals |point - center| - radius, to the parameters [center, radius]."""
+
+    def jacobian(p):
+        offset = points - p[:, :-1]
+        return np.column_stack((-offset / np.linalg.norm(offset, axis=1, keepdims=True), -np.ones(len(p))))
+
+    return jacobian
+
+
+def _circle_2d(groups: _Groups, uv: np.ndarray, refine: bool = True) -> tuple:
+    """Get the (G,3) [center u, center v, radius] of 2D circles: algebraic fit refined by geometric least squares.
+
+    Returns the circles and whether their refinement converged.
+    """
+    a = np.column_stack((uv, np.ones(len(uv))))
+    b = np.einsum("ij,ij->i", uv, uv)
+    solution = _solve(groups.sum(a[:, :, None] * a[:, None, :]), groups.sum(a * b[:, None]))
+    center = solution[:, :2] / 2.0
+    radius = np.sqrt(np.maximum(solution[:, 2] + np.einsum("ij,ij->i", center, center), 0.0))
+    if not refine:
+        return np.column_stack((center, radius)), np.ones(len(center), dtype=bool)
+
+    def residual(p):
+        return np.linalg.norm(uv - p[:, :2], axis=1) - p[:, 2]
+
+    return _gauss_newton(groups, residual, np.column_stack((center, radius)), _radial_jacobian(uv))
+
+
+def _fit_line(groups: _Groups) -> tuple:
+    centroids, axes = _principal_axes(groups)
+    direction = axes[:, :, 2]
+    offset = groups.points - centroids[groups.index]
+    along = np.einsum("ij,ij->i", offset, direction[groups.index])
+    deviations = np.linalg.norm(offset - along[:, None] * direction[groups.index], axis=1)
+    return [{"point": c, "direction": d} for c, d in zip(centroids, direction)], deviations
+
+
+def _fit_plane(groups: _Groups) -> tuple:
+    centroids, axes = _principal_axes(groups)
+    normal = axes[:, :, 0]
+    deviations = np.einsum("ij,ij->i", groups.points - centroids[groups.index], normal[groups.index])
+    return [{"point": c, "normal": n} for c, n in zip(centroids, normal)], deviations
+
+
+def _fit_circle(groups: _Groups) -> tuple:
+    centroids, axes = _principal_axes(groups)
+    frames = axes[:, :, ::-1]  # in plane axes first, the normal last
+    local = np.einsum("mji,mj->mi", frames[groups.index], groups.points - centroids[groups.index])
+    circle, converged = _circle_2d(groups, local[:, :2])
+    deviations = np.linalg.norm(local[:, :2] - circle[groups.index, :2], axis=1) - circle[groups.index, 2]
+    centers = centroids + np.einsum("gij,gj->gi", frames[:, :, :2], circle[:, :2])
+    fits = [
+        {"center": c, "normal": n, "radius": r, "converged": bool(ok)} for c, n, r, ok in zip(centers, frames[:, :, 2], circle[:, 2], converged)
+    ]
+    return fits, deviations
+
+
+def _fit_sphere(groups: _Groups) -> tuple:
+    centroids = groups.mean(groups.points)
+    local = groups.points - centroids[groups.index]
+    a = np.column_stack((2.0 * local, np.ones(len(local))))
+    b = np.einsum("ij,ij->i", local, local)
+    solution = _solve(groups.sum(a[:, :, None] * a[:, None, :]), groups.sum(a * b[:, None]))
+    radius = np.sqrt(np.maximum(solution[:, 3] + np.einsum("ij,ij->i", solution[:, :3], solution[:, :3]), 0.0))
+
+    def residual(p):
+        return np.linalg.norm(local - p[:, :3], axis=1) - p[:, 3]
+
+    sphere, converged = _gauss_newton(groups, residual, np.column_stack((solution[:, :3], radius)), _radial_jacobian(local))
+    deviations = residual(sphere[groups.index])
+    fits = [{"center": c, "radius": r, "converged": bool(ok)} for c, r, ok in zip(centroids + sphere[:, :3], sphere[:, 3], converged)]
+    return fits, deviations
+
+
+def _fit_cylinder(groups: _Groups) -> tuple:
+    centroids, axes = _principal_axes(groups)
+    offset = groups.points - centroids[groups.index]
+
+    def refine(frames: np.ndarray) -> tuple:
+        """Fit the cylinders starting from an axis along the third column of the frames."""
+        local = np.einsum("mji,mj->mi", frames[groups.index], offset)
+
+        def residual(p):
+            # axis through (x0, y0, 0) with direction (a, b, 1) in the local frame, p = [x0, y0, a, b, r]
+            direction = np.column_stack((p[:, 2], p[:, 3], np.ones(len(p))))
+            direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+            u = local - np.column_stack((p[:, 0], p[:, 1], np.zeros(len(p))))
+            return np.linalg.norm(np.cross(u, direction), axis=1) - p[:, 4]
+
+        circle = _circle_2d(groups, local[:, :2], refine=False)[0]
+        params = np.column_stack((circle[:, :2], np.zeros((len(circle), 2)), circle[:, 2]))
+        params, converged = _gauss_newton(groups, residual, params)
+        deviations = residual(params[groups.index])
+        return params, converged, deviations, np.sqrt(groups.mean(deviations * deviations))
+
+    # the axis is along one of the principal axes, which one is ambiguous for cylinders about as long as wide:
+    # refine the fit from every principal axis and keep the one with the smallest residuals
+    best_rms = np.full(len(centroids), np.inf)
+    frames = np.empty_like(axes)
+    params = np.empty((len(centroids), 5))
+    converged = np.zeros(len(centroids), dtype=bool)
+    deviations = np.empty(len(groups.points))
+    for k in range(3):
+        frame = _frame(axes[:, :, k])
+        candidate, candidate_converged, candidate_deviations, rms = refine(frame)
+        better = rms < best_rms
+        best_rms[better] = rms[better]
+        frames[better] = frame[better]
+        params[better] = candidate[better]
+        converged[better] = candidate_converged[better]
+        deviations[better[groups.index]] = candidate_deviations[better[groups.index]]
+
+    direction = np.column_stack((params[:, 2], params[:, 3], np.ones(len(params))))
+    direction = np.einsum("gij,gj->gi", frames, direction / np.linalg.norm(direction, axis=1, keepdims=True))
+    point = centroids + np.einsum("gij,gj->gi", frames[:, :, :2], params[:, :2])
+    point += np.einsum("gi,gi->g", centroids - point, direction)[:, None] * direction  # closest to the centroid
+    along = np.einsum("ij,ij->i", groups.points - point[groups.index], direction[groups.index])
+    length = np.maximum.reduceat(along, groups.starts) - np.minimum.reduceat(along, groups.starts)
+    fits = [
+        {"point": p, "direction": d, "radius": r, "length": n, "converged": bool(ok)}
+        for p, d, r, n, ok in zip(point, direction, params[:, 4], length, converged)
+    ]
+    return fits, deviations
+
+
+_FITTERS = {"Line": _fit_line, "Plane": _fit_plane, "Circle": _fit_circle, "Sphere": _fit_sphere, "Cylinder": _fit_cylinder}
+
+
+def _fit(geomType: str, groups: list) -> tuple:
+    if geomType not in _FITTERS:
+        raise ValueError(f"Local fitting supports: {', '.join(GEOMETRY_TYPES)}. Got: {geomType}")
+    minimum = _MIN_POINTS[geomType]
+    for i, xyz in enumerate(groups):
+        if len(xyz) < minimum:
+            raise ValueError(f"A {geomType} fit needs at least {minimum} points, group {i} has {len(xyz)}.")
+    concatenated = _Groups(groups)
+    fits, deviations = _FITTERS[geomType](concatenated)
+    return fits, concatenated.split(deviations)
+
+
+def fit_geometries(geomType: str, groups: list, fit_tol: float = -1.0, out_tol: bool = False) -> list[dict]:
+    """Fit a geometry of type 'geomType' to every (N,3) point array of 'groups'.
+
+    Every result dict has the geometry parameters (e.g. 'center', 'normal', 'radius'), 'type', 'deviations',
+    'rms', 'max_abs_dev', 'out_of_tol' (per point, |deviation| > fit_tol when fit_tol > 0), 'n_points',
+    'n_used' (the points the final fit is based on) and 'converged' (False when the iterative fit of a circle,
+    sphere or cylinder didn't converge, don't trust its geometry).
+    """
+    groups = [np.asarray(xyz, dtype=np.float64).reshape(-1, 3) for xyz in groups]
+    if not groups:
+        return []
+    fits, deviations = _fit(geomType, groups)
+    used = [np.ones(len(xyz), dtype=bool) for xyz in groups]
+
+    if out_tol and fit_tol > 0:
+        # fit again without the out of tolerance points (of the last fit), until the used points don't change
+        for _ in range(_MAX_REFITS):
+            refit = []
+            for i, dev in enumerate(deviations):
+                within = np.abs(dev) <= fit_tol
+                if not np.array_equal(within, used[i]) and np.count_nonzero(within) >= _MIN_POINTS[geomType]:
+                    used[i] = within
+                    refit.append(i)
+            if not refit:
+                break
+            refits, _ = _fit(geomType, [groups[i][used[i]] for i in refit])
+            for i, fit in zip(refit, refits):
+                fits[i] = fit
+                # the deviations of all points, also the ignored ones, to the new geometry
+                deviations[i] = deviations_to_geometry(geomType, groups[i], fit)
+
+    results = []
+    for i, (fit, dev, use) in enumerate(zip(fits, deviations, used)):
+        fit["type"] = geomType
+        fit.setdefault("converged", True)  # lines and planes are solved directly
+        if not fit["converged"]:
+            log.debug(f"{geomType} fit of group {i} did not converge")
+        fit["deviations"] = dev
+        fit["rms"] = float(np.sqrt(np.mean(dev[use] ** 2)))
+        fit["max_abs_dev"] = float(np.max(np.abs(dev[use])))
+        fit["out_of_tol"] = np.abs(dev) > fit_tol if fit_tol > 0 else np.zeros(len(dev), dtype=bool)
+        fit["n_points"] = len(dev)
+        fit["n_used"] = int(np.count_nonzero(use))
+        results.append(fit)
+    return results
+
+
+def deviations_to_geometry(geomType: str, xyz, fit: dict) -> np.ndarray:
+    """Get the deviations of points to a fitted geometry (a result of fit_geometries())."""
+    xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+    if geomType == "Line":
+        offset = xyz - fit["point"]
+        return np.linalg.norm(offset - np.outer(offset @ fit["direction"], fit["direction"]), axis=1)
+    if geomType == "Plane":
+        return (xyz - fit["point"]) @ fit["normal"]
+    if geomType == "Circle":
+        offset = xyz - fit["center"]
+        in_plane = offset - np.outer(offset @ fit["normal"], fit["normal"])
+        return np.linalg.norm(in_plane, axis=1) - fit["radius"]
+    if geomType == "Sphere":
+        return np.linalg.norm(xyz - fit["center"], axis=1) - fit["radius"]
+    if geomType == "Cylinder":
+        return np.linalg.norm(np.cross(xyz - fit["point"], fit["direction"]), axis=1) - fit["radius"]
+    raise ValueError(f"Local fitting supports: {', '.join(GEOMETRY_TYPES)}. Got: {geomType}")
+
+
+def deviations_to_geometries(geomType: str, xyz, fits: list[dict]) -> np.ndarray:
+    """Get the (G,N) deviations of the same points to each of the G fitted geometries, in one vectorized pass.
+
+    The squared distances are expanded into matrix products of the (N,3) points and the (G,3) geometry vectors, so
+    no (G,N,3) temporaries are needed. The points are centered first, which keeps the cancellation error of the
+    expansion far below the deviations of interest.
+    """
+    if geomType not in _FITTERS:
+        raise ValueError(f"Local fitting supports: {', '.join(GEOMETRY_TYPES)}. Got: {geomType}")
+    xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+    origin = xyz.mean(axis=0) if len(xyz) else np.zeros(3)
+    local = (xyz - origin).T  # (3,N)
+    squared = np.einsum("ij,ij->j", local, local)
+
+    def stack(key: str) -> np.ndarray:
+        return np.array([fit[key] for fit in fits], dtype=np.float64)
+
+    def offsets(point: np.ndarray, axis: np.ndarray = None) -> tuple:
+        """Get |x - p|^2 and (x - p) . axis of all points x to every geometry, as (G,N) arrays."""
+        point = point - origin
+        offset_squared = squared - 2.0 * (point @ local) + np.einsum("gi,gi->g", point, point)[:, None]
+        along = None if axis is None else axis @ local - np.einsum("gi,gi->g", point, axis)[:, None]
+        return offset_squared, along
+
+    if geomType == "Plane":
+        normal = stack("normal")
+        return normal @ local - np.einsum("gi,gi->g", stack("point") - origin, normal)[:, None]
+    if geomType == "Sphere":
+        return np.sqrt(np.maximum(offsets(stack("center"))[0], 0.0)) - stack("radius")[:, None]
+    # the distance to an axis through 'point' (the unit 'axis' is the line/cylinder direction or the circle normal)
+    key, axis, radius = {"Line": ("point", "direction", None), "Circle": ("center", "normal", "radius"), "Cylinder": ("point", "direction", "radius")}[geomType]
+    offset_squared, along = offsets(stack(key), stack(axis))
+    distance = np.sqrt(np.maximum(offset_squared - along * along, 0.0))
+    return distance if radius is None else distance - stack(radius)[:, None]
+
+
+def fit_geometry(geomType: str, xyz, fit_tol: float = -1.0, out_tol: bool = False) -> dict:
+    """Fit a geometry of type 'geomType' to the (N,3) points, see fit_geometries()."""
+    return fit_geometries(geomType, [xyz], fit_tol, out_tol)[0]
+
+
+def fit_geometry_to_group(geomType: str, collection: str, group: str, fit_tol: float = -1.0, out_tol: bool = False) -> dict:
+    """Read a point group from SA and fit a geometry to it locally, like fit_geometry_to_point_group()."""
+    names, xyz = get_group_coordinates(collection, group)
+    valid = ~np.isnan(xyz).any(axis=1)
+    log.debug(f"Local {geomType} fit to {collection}::{group}: {np.count_nonzero(valid)} points")
+    result = fit_geometry(geomType, xyz[valid], fit_tol, out_tol)
+    result["names"] = [name for name, ok in zip(names, valid) if ok]
+    return result
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Concurrent measuring with several instruments over the single SDK connection.
+
+The SDK executes one step at a time and the step result only tells about the last step, so the instruments can't
+each wait for their own measurement step. Instead the measurements are started without waiting for completion
+('Wait for Completion' off) and the orchestrator polls every instrument's measured point until its observation is
+there. While one instrument measures, the steps of the other instruments go ahead: the waits overlap.
+
+A measurement that SA refuses to start fails right away (the MP step result of the start). While a measurement has no
+observation yet, the instrument's target status is checked in the same transaction: an instrument that lost its
+target aborted the measurement, which fails right away instead of at the deadline.
+
+The instruments are served round-robin, every instrument gets at most one SDK transaction per round, so a slow
+instrument doesn't hold up the others. When no instrument could make progress in a round, the orchestrator sleeps for the
+intervals of its WaitStrategy (the strategy's deadline is the time limit per measurement).
+"""
+from __future__ import annotations
+
+from time import monotonic, sleep
+from typing import Callable, Union
+
+from . import (
+    NamedPoint,
+    PointSet,
+    WaitStrategy,
+    add_new_instrument,
+    configure_and_measure,
+    get_instrument_target_status,
+    get_observation_info,
+    log,
+    point_at_target,
+    sdk_transaction,
+    start_instrument_interface,
+)
+from .pipeline import MeasureRecord
+
+
+def start_instruments(inst_types: list[str], initialize: bool = True, simulation: bool = False) -> list[tuple[str, int]]:
+    """Add an instrument of every type and start its interface, returns the (collection, id) of the instruments."""
+    instruments = [add_new_instrument(inst_type) for inst_type in inst_types]
+    for collection_inst, id_inst in instruments:
+        start_instrument_interface(collection_inst, id_inst, initialize, simulation)
+    return instruments
+
+
+@sdk_transaction
+def _start_measurement(collection_inst: str, id_inst: int, nominal: tuple, collection: str, group: str, profile: str, point_at: bool) -> bool:
+    """Point at the target and start measuring it, without waiting for the measurement to complete."""
+    if point_at:
+        point_at_target(collection_inst, id_inst, *nominal)
+    return configure_and_measure(collection_inst, id_inst, collection, group, nominal[2], profile, True, False, 0)
+
+
+@sdk_transaction
+def _check_measurement(collection_inst: str, id_inst: int, collection: str, group: str, name: str, check_status: bool) -> tuple:
+    """Get the observation info of the measured point and, while there is none, why the measurement was aborted.
+
+    Returns (observation, reason), the reason is None while the instrument still measures (or isn't checked).
+    """
+    observation = get_observation_info(collection, group, name)
+    if observation or not check_status:
+        return (observation, None)
+    # an instrument without target status fails the step (an empty dict), it is only checked by the deadline then
+    status = get_instrument_target_status(collection_inst, id_inst)
+    if status and not status["isLocked"]:
+        return (observation, "the instrument lost the target")
+    return (observation, None)
+
+
+class InstrumentJob:
+    """The targets of one instrument and the progress of measuring them."""
+
+    def __init__(
+        self,
+        collection_inst: str,
+        id_inst: int,
+        targets: Union[PointSet, list[NamedPoint]],
+        collection_measured: str,
+        group_measured: str,
+        profile: str,
+        point_at: bool = True,
+        check_status: bool = True,
+    ) -> None:
+        if isinstance(targets, PointSet):
+            self.nominals = [*zip(targets.collections.tolist(), targets.groups.tolist(), targets.names.tolist())]
+        else:
+            self.nominals = [(p.collection, p.group, p.name) for p in targets]
+        self.collection_inst = collection_inst
+        self.id_inst = id_inst
+        self.collection_measured = collection_measured
+        self.group_measured = group_measured
+        self.profile = profile
+        self.point_at = point_at
+        self.check_status = check_status
+        self.records = []
+        self.current = None  # the record being measured
+        self.started = 0.0
+        self.busy = 0.0  # seconds spent measuring
+
+    @property
+    def key(self) -> tuple[str, int]:
+        return (self.collection_inst, self.id_inst)
+
+    @property
+    def done(self) -> bool:
+        return self.current is None and len(self.records) == len(self.nominals)
+
+    def __repr__(self) -> str:
+        return f"InstrumentJob({self.collection_inst}::{self.id_inst}, {len(self.records)}/{len(self.nominals)})"
+
+
+class Orchestrator:
+    """Measure the target lists of several instruments concurrently.
+
+    'on_measured' is called with the MeasureRecord of every finished target, its 'data' has the 'observation' info.
+    The measured points should not exist before, their first observation marks a measurement as complete.
+    """
+
+    def __init__(self, strategy: WaitStrategy = None, on_measured: Callable[[MeasureRecord], None] = None) -> None:
+        self.strategy = WaitStrategy(poll_interval=0.02, backoff=1.5, max_interval=0.25, deadline=60.0) if strategy is None else strategy
+        self.on_measured = on_measured
+        self.jobs = []
+        self.statistics = {}
+
+    def add_instrument(
+        self,
+        collection_inst: str,
+        id_inst: int,
+        targets: Union[PointSet, list[NamedPoint]],
+        collection_measured: str,
+        group_measured: str,
+        profile: str,
+        point_at: bool = True,
+        check_status: bool = True,
+    ) -> InstrumentJob:
+        """Add the targets of an instrument. With check_status=False an aborted measurement fails at the deadline only."""
+        job = InstrumentJob(collection_inst, id_inst, targets, collection_measured, group_measured, profile, point_at, check_status)
+        if any(other.key == job.key for other in self.jobs):
+            raise ValueError(f"Instrument {collection_inst}::{id_inst} is added already.")
+        self.jobs.append(job)
+        return job
+
+    def _start(self, job: InstrumentJob) -> None:
+        nominal = job.nominals[len(job.records)]
+        record = MeasureRecord(len(job.records), nominal, job.collection_measured, job.group_measured)
+        job.records.append(record)
+        try:
+            started = _start_measurement(job.collection_inst, job.id_inst, nominal, record.collection, record.group, job.profile, job.point_at)
+        except Exception as err:
+            log.error(f"{job}: starting {record} failed: {err!r}")
+            record.error = err
+            return
+        if started:
+            job.current = record
+            job.started = monotonic()
+        else:
+            record.error = SystemError(f"Measuring {record} could not be started.")
+
+    def _poll(self, job: InstrumentJob) -> bool:
+        """Check the current measurement of the job, True when it is finished (or aborted, or timed out)."""
+        record = job.current
+        try:
+            observation, aborted = _check_measurement(job.collection_inst, job.id_inst, record.collection, record.group, record.name, job.check_status)
+        except Exception as err:
+            log.error(f"{job}: checking {record} failed: {err!r}")
+            observation, aborted = None, err
+        now = monotonic()
+        if observation:
+            record.ok = True
+            record.data["observation"] = observation
+        elif isinstance(aborted, Exception):
+            record.error = aborted
+        elif aborted is not None:
+            log.error(f"{job}: {record} aborted, {aborted}.")
+            record.error = SystemError(f"{record} aborted, {aborted}.")
+        elif self.strategy.deadline is not None and now - job.started > self.strategy.deadline:
+            log.error(f"{job}: {record} not measured after {self.strategy.deadline} seconds.")
+            record.error = TimeoutError(f"{record} not measured after {self.strategy.deadline} seconds.")
+        else:
+            return False
+        record.acquired = now
+        job.busy += now - job.started
+        job.current = None
+        if self.on_measured is not None:
+            self.on_measured(record)
+        return True
+
+    def run(self) -> dict[tuple[str, int], list[MeasureRecord]]:
+        """Measure all targets, returns the records of every instrument (by (collection, id), in target order)."""
+        start = monotonic()
+        steps = 0
+        intervals = None
+        while not all(job.done for job in self.jobs):
+            progress = False
+            for job in self.jobs:
+                if job.current is not None:
+                    progress |= self._poll(job)
+                elif not job.done:
+                    self._start(job)
+                    progress = True
+                else:
+                    continue
+                steps += 1
+            if progress:
+                intervals = None
+            else:
+                intervals = self.strategy.intervals() if intervals is None else intervals
+                sleep(next(intervals))
+
+        elapsed = monotonic() - start
+        busy = sum(job.busy for job in self.jobs)
+        self.statistics = {
+            "instruments": len(self.jobs),
+            "measured": sum(record.ok for job in self.jobs for record in job.records),
+            "failed": sum(record.error is not None for job in self.jobs for record in job.records),
+            "elapsed": elapsed,
+            "sdk_steps": steps,
+            # the average number of instruments measuring at the same time
+            "overlap": busy / elapsed if elapsed > 0 else float("nan"),
+            "busy": {job.key: job.busy for job in self.jobs},
+        }
+        log.debug(f"Orchestrator: {self.statistics}")
+        return {job.key: job.records for job in self.jobs}
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+Pipelined measuring: the instrument moves on to the next target while the previous points are processed.
+
+The acquisition stage (point at the target, configure and measure) runs in the calling thread, its SDK transactions
+are executed in order on the SDK thread of the session. Every measured point is put in a bounded queue, worker
+threads take the points from it and run the processing stages on them: fetching results from SA (these SDK
+transactions are queued on the same SDK thread, in between the measurements), tolerance checks, logging to disk.
+When the processing falls behind, the bounded queue makes the acquisition wait, instead of piling up points.
+"""
+from __future__ import annotations
+
+import json
+import queue
+import threading
+from time import perf_counter
+from typing import Callable, Union
+
+import numpy as np
+
+from . import (
+    NamedPoint,
+    PointSet,
+    configure_and_measure,
+    get_measurement_weather_data,
+    get_observation_info,
+    get_point_coordinate,
+    get_session,
+    log,
+    point_at_target,
+    sdk_transaction,
+)
+
+
+class MeasureRecord:
+    """A measured target: the nominal and measured point names, its timing and the data of the processing stages."""
+
+    __slots__ = ("index", "nominal", "collection", "group", "name", "ok", "error", "acquired", "processed", "data")
+
+    def __init__(self, index: int, nominal: tuple, collection: str, group: str) -> None:
+        self.index = index
+        self.nominal = nominal  # (collection, group, name) of the target
+        self.collection = collection
+        self.group = group
+        self.name = nominal[2]
+        self.ok = False
+        self.error = None
+        self.acquired = None
+        self.processed = None
+        self.data = {}
+
+    def __repr__(self) -> str:
+        return f"MeasureRecord({self.index}, {self.collection}::{self.group}::{self.name}, ok={self.ok})"
+
+
+@sdk_transaction
+def _acquire(collection_inst: str, id_inst: int, nominal: tuple, collection: str, group: str, profile: str, point_at: bool) -> bool:
+    """Point at and measure one target, as one transaction such that no fetch of the workers comes in between."""
+    if point_at:
+        point_at_target(collection_inst, id_inst, *nominal)
+    return configure_and_measure(collection_inst, id_inst, collection, group, nominal[2], profile, True, True, 0)
+
+
+def fetch_coordinate(record: MeasureRecord) -> None:
+    """Stage: get the measured coordinate, as data['xyz']."""
+    point = get_point_coordinate(record.collection, record.group, record.name)
+    record.data["xyz"] = (point.X, point.Y, point.Z)
+
+
+def fetch_observation_info(record: MeasureRecord) -> None:
+    """Stage: get the observation info (instrument, RMS error, timestamp, ...), as data['observation']."""
+    record.data["observation"] = get_observation_info(record.collection, record.group, record.name)
+
+
+def fetch_weather(record: MeasureRecord) -> None:
+    """Stage: get the weather data of the measurement, as data['weather']."""
+    record.data["weather"] = get_measurement_weather_data(record.collection, record.group, record.name)
+
+
+def tolerance_check(nominals: PointSet, tolerance: float) -> Callable[[MeasureRecord], None]:
+    """Stage factory: compare data['xyz'] (see fetch_coordinate) with the nominal coordinate.
+
+    Sets data['deviation'] (the distance) and data['in_tolerance'].
+    """
+
+    def check(record: MeasureRecord) -> None:
+        index = nominals.index(record.nominal[2], record.nominal[0], record.nominal[1])
+        if index is None:
+            index = nominals.index(record.nominal[2])
+        if index is None:
+            raise KeyError(f"No nominal for: {'::'.join(record.nominal)}")
+        deviation = float(np.linalg.norm(np.asarray(record.data["xyz"]) - nominals.xyz[index]))
+        record.data["deviation"] = deviation
+        record.data["in_tolerance"] = deviation <= tolerance
+        if deviation > tolerance:
+            log.warning(f"{record.name}: deviation {deviation:.4f} out of tolerance {tolerance}")
+
+    return check
+
+
+class JsonLinesLog:
+    """Stage: append every record as a JSON line to a file, use it as a context manager."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "JsonLinesLog":
+        self._file = open(self.path, "a", encoding="utf-8")
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._file.close()
+        self._file = None
+
+    def __call__(self, record: MeasureRecord) -> None:
+        line = {
+            "index": record.index,
+            "point": f"{record.collection}::{record.group}::{record.name}",
+            "nominal": "::".join(record.nominal),
+            "acquired": record.acquired,
+            **record.data,
+        }
+        text = json.dumps(line, default=str)
+        with self._lock:
+            self._file.write(text + "\n")
+            self._file.flush()
+
+
+class MeasurePipeline:
+    """Measure targets with an instrument, while worker threads run the processing 'stages' on the measured points.
+
+    A stage is a callable that takes a MeasureRecord and adds its results to 'record.data'. The stages run in order
+    per point, a failing stage stops the processing of that point (its exception is the record's 'error').
+    'queue_size' bounds the number of measured points waiting for processing.
+    """
+
+    def __init__(
+        self,
+        collection_inst: str,
+        id_inst: int,
+        collection_measured: str,
+        group_measured: str,
+        profile: str,
+        stages: list[Callable[[MeasureRecord], None]] = (),
+        workers: int = 2,
+        queue_size: int = 16,
+        point_at: bool = True,
+    ) -> None:
+        if workers < 1 or queue_size < 1:
+            raise ValueError("A pipeline needs at least 1 worker and a queue size of at least 1.")
+        self.collection_inst = collection_inst
+        self.id_inst = id_inst
+        self.collection_measured = collection_measured
+        self.group_measured = group_measured
+        self.profile = profile
+        self.stages = [*stages]
+        self.workers = workers
+        self.queue_size = queue_size
+        self.point_at = point_at
+        self.statistics = {}
+
+    def _process(self, points: queue.Queue) -> None:
+        while True:
+            record = points.get()
+            if record is None:
+                return
+            try:
+                for stage in self.stages:
+                    stage(record)
+            except Exception as err:
+                log.error(f"Processing {record}: {err!r}")
+                record.error = err
+            record.processed = perf_counter()
+
+    def run(self, targets: Union[PointSet, list[NamedPoint]], stop_on_error: bool = False) -> list[MeasureRecord]:
+        """Measure the targets in order and process them, returns a record per target (in target order).
+
+        The SDK thread of the session is started when it isn't running, and stopped again afterwards. A target that
+        couldn't be measured has ok=False and its 'error', a point of which a stage failed has ok=True and the stage's
+        exception as 'error': the statistics count them as 'acquisition_failed' and 'processing_failed'.
+        """
+        if isinstance(targets, PointSet):
+            nominals = [*zip(targets.collections.tolist(), targets.groups.tolist(), targets.names.tolist())]
+        else:
+            nominals = [(p.collection, p.group, p.name) for p in targets]
+        session = get_session()
+        own_executor = session.executor is None
+        if own_executor:
+            session.start_executor()
+
+        points = queue.Queue(maxsize=self.queue_size)
+        threads = [threading.Thread(target=self._process, args=(points,), name=f"SA-Pipeline-{i}", daemon=True) for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+
+        records = []
+        acquisition = 0.0
+        backlog = 0
+        start = perf_counter()
+        try:
+            for index, nominal in enumerate(nominals):
+                record = MeasureRecord(index, nominal, self.collection_measured, self.group_measured)
+                records.append(record)
+                begin = perf_counter()
+                try:
+                    record.ok = bool(
+                        _acquire(self.collection_inst, self.id_inst, nominal, record.collection, record.group, self.profile, self.point_at)
+                    )
+                except Exception as err:
+                    log.error(f"Measuring {record}: {err!r}")
+                    record.error = err
+                if not record.ok and record.error is None:
+                    log.error(f"Measuring {record} failed.")
+                    record.error = SystemError(f"Measuring {record} failed.")
+                record.acquired = perf_counter()
+                acquisition += record.acquired - begin
+                if record.ok:
+                    backlog = max(backlog, points.qsize())
+                    points.put(record)
+                elif stop_on_error:
+                    break
+        finally:
+            for _ in threads:
+                points.put(None)
+            for thread in threads:
+                thread.join()
+            if own_executor:
+                session.stop_executor()
+
+        elapsed = perf_counter() - start
+        measured = sum(record.ok for record in records)
+        self.statistics = {
+            "targets": len(nominals),
+            "measured": measured,
+            "acquisition_failed": sum(not record.ok for record in records),
+            "processing_failed": sum(record.ok and record.error is not None for record in records),
+            "elapsed": elapsed,
+            "acquisition_time": acquisition,
+            "processing_tail": elapsed - (records[-1].acquired - start) if records else 0.0,
+            "max_backlog": backlog,
+            "rate": measured / elapsed if elapsed > 0 else float("nan"),
+        }
+        log.debug(f"Measure pipeline: {self.statistics}")
+        return records
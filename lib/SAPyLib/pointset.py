@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Array backed point container, for large numbers of named points.
+
+A PointSet keeps the coordinates in one (N,3) float64 array and the collection, group and name of the points in
+object arrays, with every distinct collection and group string stored once. Slicing a PointSet gives a PointSet that shares the arrays, and
+the points are PointView objects that read (and write) their row of the set.
+"""
+import sys
+
+import numpy as np
+
+
+def _column(values, n: int, intern: bool = True) -> np.ndarray:
+    """Get an object array of 'n' strings (a single string is repeated).
+
+    With 'intern' equal strings share one (interned) object, used for the few distinct collections and groups.
+    """
+    column = np.empty(n, dtype=object)
+    if isinstance(values, str):
+        column[:] = sys.intern(values)
+        return column
+    if intern:
+        values = [sys.intern(value) for value in values]
+    if len(values) != n:
+        raise ValueError(f"Got {len(values)} values for {n} points.")
+    column[:] = values
+    return column
+
+
+class PointView:
+    """One point of a PointSet, with the attributes of a NamedPoint3D (collection, group, name, X, Y, Z)."""
+
+    __slots__ = ("_set", "_index")
+
+    def __init__(self, point_set: "PointSet", index: int) -> None:
+        self._set = point_set
+        self._index = index
+
+    @property
+    def collection(self) -> str:
+        return self._set.collections[self._index]
+
+    @property
+    def group(self) -> str:
+        return self._set.groups[self._index]
+
+    @property
+    def name(self) -> str:
+        return self._set.names[self._index]
+
+    @property
+    def X(self) -> float:
+        return float(self._set.xyz[self._index, 0])
+
+    @X.setter
+    def X(self, value: float) -> None:
+        self._set.xyz[self._index, 0] = value
+
+    @property
+    def Y(self) -> float:
+        return float(self._set.xyz[self._index, 1])
+
+    @Y.setter
+    def Y(self, value: float) -> None:
+        self._set.xyz[self._index, 1] = value
+
+    @property
+    def Z(self) -> float:
+        return float(self._set.xyz[self._index, 2])
+
+    @Z.setter
+    def Z(self, value: float) -> None:
+        self._set.xyz[self._index, 2] = value
+
+    @property
+    def ref(self) -> str:
+        return f"{self.collection}::{self.group}::{self.name}"
+
+    def __repr__(self) -> str:
+        return f"PointView({self.ref}, {self.X}, {self.Y}, {self.Z})"
+
+
+class PointSet:
+    """N named points: an (N,3) float64 coordinate array and the collection, group and name columns.
+
+    The collections and groups can be a single string for all points. Without coordinates they are NaN.
+    """
+
+    __slots__ = ("xyz", "collections", "groups", "names", "_lookup")
+
+    def __init__(self, collections, groups, names, xyz=None) -> None:
+        n = len(names)
+        self.names = _column(names, n, intern=False)
+        self.collections = _column(collections, n)
+        self.groups = _column(groups, n)
+        if xyz is None:
+            self.xyz = np.full((n, 3), np.nan)
+        else:
+            self.xyz = np.asarray(xyz, dtype=np.float64)
+            if self.xyz.shape != (n, 3):
+                raise ValueError(f"Expected an ({n},3) coordinate array, got shape: {self.xyz.shape}")
+        self._lookup = None
+
+    @classmethod
+    def _from_arrays(cls, collections: np.ndarray, groups: np.ndarray, names: np.ndarray, xyz: np.ndarray) -> "PointSet":
+        point_set = cls.__new__(cls)
+        point_set.collections = collections
+        point_set.groups = groups
+        point_set.names = names
+        point_set.xyz = xyz
+        point_set._lookup = None
+        return point_set
+
+    @classmethod
+    def from_refs(cls, refs, xyz=None) -> "PointSet":
+        """Create a PointSet from 'collection::group::name' references."""
+        parts = [ref.split("::") for ref in refs]
+        if any(len(part) != 3 for part in parts):
+            raise ValueError("A point reference is not in the 'collection::group::name' format.")
+        if not parts:
+            return cls((), (), (), xyz)
+        collections, groups, names = zip(*parts)
+        return cls(collections, groups, names, xyz)
+
+    @classmethod
+    def from_points(cls, points) -> "PointSet":
+        """Create a PointSet from NamedPoint (no coordinates) or NamedPoint3D objects."""
+        points = [*points]
+        xyz = [[getattr(p, "X", np.nan), getattr(p, "Y", np.nan), getattr(p, "Z", np.nan)] for p in points]
+        return cls(
+            [p.collection for p in points],
+            [p.group for p in points],
+            [p.name for p in points],
+            np.array(xyz, dtype=np.float64).reshape(len(points), 3),
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self):
+        return (PointView(self, i) for i in range(len(self)))
+
+    def __getitem__(self, item):
+        """An index gives a PointView, a slice (a view) or an index/mask array (a copy) gives a PointSet."""
+        if isinstance(item, (int, np.integer)):
+            if item < 0:
+                item += len(self)
+            if not 0 <= item < len(self):
+                raise IndexError("PointSet index out of range")
+            return PointView(self, int(item))
+        return PointSet._from_arrays(self.collections[item], self.groups[item], self.names[item], self.xyz[item])
+
+    def __contains__(self, name: str) -> bool:
+        return self.index(name) is not None
+
+    def __repr__(self) -> str:
+        return f"PointSet({len(self)} points)"
+
+    def index(self, name: str, collection: str = None, group: str = None):
+        """Get the index of the point by name (the first one when not unique), or None when it isn't in the set.
+
+        With the collection and group the full 'collection::group::name' is looked up.
+        """
+        lookup = self._lookup
+        if lookup is None:
+            lookup = {}
+            for i, key in enumerate(zip(self.collections.tolist(), self.groups.tolist(), self.names.tolist())):
+                lookup.setdefault(key, i)
+                lookup.setdefault(key[2], i)
+            self._lookup = lookup
+        if collection is None and group is None:
+            return lookup.get(name)
+        return lookup.get((collection, group, name))
+
+    def refs(self) -> list:
+        """Get the 'collection::group::name' references of the points."""
+        return [f"{c}::{g}::{n}" for c, g, n in zip(self.collections.tolist(), self.groups.tolist(), self.names.tolist())]
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Per MP step latency profiler for the SA SDK calls.
+
+The profiler wraps the SDK and SA Python Tools objects of a session, so nothing is measured (or slowed down) while
+profiling is off. Every 'SetStep' starts a new step record, the following SDK calls are booked on that step as:
+- marshal: SetStep, Set*Arg and the SA Python Tools calls (argument marshalling)
+- execute: ExecuteStep
+- fetch: GetMPStepResult, GetMPStepMessages and Get*Arg (result fetching)
+The remaining wall time of a step is the Python time spent in between the SDK calls.
+"""
+import json
+import os
+import threading
+from time import perf_counter
+
+
+class StepRecord:
+    """The timing of a single MP step, all times are in seconds."""
+
+    __slots__ = ("command", "start", "end", "marshal", "execute", "fetch", "calls", "thread_id")
+
+    def __init__(self, command: str, start: float, thread_id: int) -> None:
+        self.command = command
+        self.start = start
+        self.end = start
+        self.marshal = 0.0
+        self.execute = 0.0
+        self.fetch = 0.0
+        self.calls = []  # (method, phase, start, duration)
+        self.thread_id = thread_id
+
+    @property
+    def wall(self) -> float:
+        return self.end - self.start
+
+    @property
+    def python(self) -> float:
+        return max(self.wall - self.marshal - self.execute - self.fetch, 0.0)
+
+
+def _phase(method: str, tools: bool) -> str:
+    if tools or method == "SetStep" or (method.startswith("Set") and method.endswith("Arg")):
+        return "marshal"
+    if method == "ExecuteStep":
+        return "execute"
+    return "fetch"
+
+
+class _ProfiledObject:
+    """Forwards all attribute access to the wrapped object and times the method calls."""
+
+    def __init__(self, target, profiler: "StepProfiler", tools: bool = False) -> None:
+        self._target = target
+        self._profiler = profiler
+        self._tools = tools
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        phase = _phase(name, self._tools)
+        record = self._profiler._record
+        if name == "SetStep":
+            start_step = self._profiler._start_step
+
+            def call(*args):
+                start = perf_counter()
+                start_step(args[0] if args else "", start)
+                try:
+                    return attr(*args)
+                finally:
+                    record(name, phase, start, perf_counter() - start)
+
+        else:
+
+            def call(*args):
+                start = perf_counter()
+                try:
+                    return attr(*args)
+                finally:
+                    record(name, phase, start, perf_counter() - start)
+
+        # cache the timed method, the next lookups don't reach __getattr__ anymore
+        self.__dict__[name] = call
+        return call
+
+
+class StepProfiler:
+    """Collects per MP step timings, see 'Session.enable_profiling()'."""
+
+    def __init__(self) -> None:
+        self.steps = []
+        self._current = None
+        self._origin = perf_counter()
+        self._lock = threading.Lock()
+
+    def wrap(self, target, tools: bool = False) -> _ProfiledObject:
+        """Wrap an SDK (or SA Python Tools) object, such that its calls are recorded."""
+        return _ProfiledObject(target, self, tools)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.steps = []
+            self._current = None
+
+    def _start_step(self, command: str, start: float) -> None:
+        step = StepRecord(command, start, threading.get_ident())
+        with self._lock:
+            self.steps.append(step)
+            self._current = step
+
+    def _record(self, method: str, phase: str, start: float, duration: float) -> None:
+        step = self._current
+        if step is None:
+            # SDK calls outside of a step, e.g. the connection
+            self._start_step(f"<{method}>", start)
+            step = self._current
+        step.calls.append((method, phase, start, duration))
+        if phase == "marshal":
+            step.marshal += duration
+        elif phase == "execute":
+            step.execute += duration
+        else:
+            step.fetch += duration
+        step.end = max(step.end, start + duration)
+
+    def summary(self, top: int = 10) -> list:
+        """Get the per MP command totals, sorted from the slowest (total wall time) to the fastest."""
+        totals = {}
+        for step in self.steps:
+            entry = totals.get(step.command)
+            if entry is None:
+                entry = totals[step.command] = {
+                    "command": step.command,
+                    "count": 0,
+                    "wall": 0.0,
+                    "max": 0.0,
+                    "marshal": 0.0,
+                    "execute": 0.0,
+                    "fetch": 0.0,
+                    "python": 0.0,
+                }
+            entry["count"] += 1
+            entry["wall"] += step.wall
+            entry["max"] = max(entry["max"], step.wall)
+            entry["marshal"] += step.marshal
+            entry["execute"] += step.execute
+            entry["fetch"] += step.fetch
+            entry["python"] += step.python
+        for entry in totals.values():
+            entry["mean"] = entry["wall"] / entry["count"]
+        ordered = sorted(totals.values(), key=lambda item: item["wall"], reverse=True)
+        return ordered[:top] if top else ordered
+
+    def summary_table(self, top: int = 10) -> str:
+        """Format the summary as a text table, times in milliseconds."""
+        header = f"{'MP command':<50} {'count':>7} {'total':>10} {'mean':>9} {'max':>9} {'marshal':>9} {'execute':>9} {'fetch':>9} {'python':>9}"
+        lines = [header, "-" * len(header)]
+        for entry in self.summary(top):
+            lines.append(
+                f"{entry['command'][:50]:<50} {entry['count']:>7} {entry['wall'] * 1e3:>10.2f} {entry['mean'] * 1e3:>9.3f}"
+                f" {entry['max'] * 1e3:>9.3f} {entry['marshal'] * 1e3:>9.2f} {entry['execute'] * 1e3:>9.2f}"
+                f" {entry['fetch'] * 1e3:>9.2f} {entry['python'] * 1e3:>9.2f}"
+            )
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> dict:
+        """Get the steps as Chrome trace-event data (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        origin = self._origin
+        events = []
+        for step in self.steps:
+            events.append(
+                {
+                    "name": step.command,
+                    "cat": "step",
+                    "ph": "X",
+                    "ts": (step.start - origin) * 1e6,
+                    "dur": step.wall * 1e6,
+                    "pid": pid,
+                    "tid": step.thread_id,
+                    "args": {
+                        "marshal_ms": step.marshal * 1e3,
+                        "execute_ms": step.execute * 1e3,
+                        "fetch_ms": step.fetch * 1e3,
+                        "python_ms": step.python * 1e3,
+                    },
+                }
+            )
+            for method, phase, start, duration in step.calls:
+                events.append(
+                    {
+                        "name": method,
+                        "cat": phase,
+                        "ph": "X",
+                        "ts": (start - origin) * 1e6,
+                        "dur": duration * 1e6,
+                        "pid": pid,
+                        "tid": step.thread_id,
+                    }
+                )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, filename: str) -> None:
+        """Write the Chrome trace-event JSON file."""
+        with open(filename, "w") as f:
+            json.dump(self.chrome_trace(), f)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Robust geometry fitting: reject spurious points locally, then fit once in SA on the remaining points.
+
+A RANSAC search (all random samples fitted in one batched call and scored in vectorized blocks) finds the consensus
+geometry: the points further than 'threshold' from it are rejected. The consensus points are then trimmed
+iteratively: the geometry is refitted and the points deviating more than 'trim_sigma' times the robust (MAD) standard
+deviation are rejected, until no more points are rejected. Every rejected point gets the reason it was rejected.
+
+Many groups are processed in parallel threads: nearly all the time of a fit is spent in NumPy array operations on
+(hypotheses, points) blocks, which release the GIL.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from . import (
+    construct_points,
+    delete_object_list,
+    fit_geometry_to_point_group,
+    get_group_coordinates,
+    log,
+    make_a_collection_object_name_ref_list_by_type,
+)
+from .fitting import _MIN_POINTS, deviations_to_geometries, deviations_to_geometry, fit_geometries, fit_geometry
+
+# RANSAC sample size per geometry type, the cylinder uses more than the minimum for a stable start
+_SAMPLE_SIZE = {**_MIN_POINTS, "Cylinder": 8}
+_SCORE_BLOCK = 1 << 18  # hypotheses x points per scoring block, bounds the (hypotheses, points, 3) temporary arrays
+
+REJECT_INVALID = "invalid coordinate"
+REJECT_CONSENSUS = "outside consensus"
+REJECT_TRIMMED = "trimmed"
+
+
+def robust_fit(
+    geomType: str,
+    xyz,
+    threshold: float,
+    names: list = None,
+    iterations: int = 200,
+    trim_sigma: float = 3.0,
+    max_trims: int = 20,
+    seed=None,
+) -> dict:
+    """Fit a geometry robustly to the (N,3) points.
+
+    'threshold' is the maximum absolute deviation of a RANSAC consensus point. Returns a dict with the final local
+    'fit' (see fit_geometry()), the boolean 'inliers' mask and 'rejected': (index, name, reason, deviation) tuples.
+    """
+    xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+    names = [str(i) for i in range(len(xyz))] if names is None else names
+    if geomType not in _SAMPLE_SIZE:
+        raise ValueError(f"Robust fitting supports: {', '.join(_SAMPLE_SIZE)}. Got: {geomType}")
+    minimum = _SAMPLE_SIZE[geomType]
+
+    reasons = {}
+    valid = ~np.isnan(xyz).any(axis=1)
+    for i in np.flatnonzero(~valid):
+        reasons[i] = (REJECT_INVALID, np.nan)
+    candidates = np.flatnonzero(valid)
+    if len(candidates) < minimum:
+        raise ValueError(f"A robust {geomType} fit needs at least {minimum} valid points, got {len(candidates)}.")
+
+    # RANSAC: fit all random samples in one call, score all of them in blocks of (hypotheses, points) arrays and keep
+    # the geometry with the most points within the threshold
+    rng = np.random.default_rng(seed)
+    points = xyz[candidates]
+    samples = [points[rng.choice(len(points), minimum, replace=False)] for _ in range(iterations)]
+    block = max(1, _SCORE_BLOCK // len(points))
+    with np.errstate(all="ignore"):
+        hypotheses = fit_geometries(geomType, samples)
+        counts = np.concatenate(
+            [
+                np.count_nonzero(np.abs(deviations_to_geometries(geomType, points, hypotheses[start : start + block])) <= threshold, axis=1)
+                for start in range(0, len(hypotheses), block)
+            ]
+        )
+        best = hypotheses[int(counts.argmax())]  # the first of the best, like a sequential search
+        deviations = deviations_to_geometry(geomType, points, best)
+    inliers = np.abs(deviations) <= threshold
+    if np.count_nonzero(inliers) < _MIN_POINTS[geomType]:
+        inliers[:] = True
+    for i in np.flatnonzero(~inliers):
+        reasons[candidates[i]] = (REJECT_CONSENSUS, deviations[i])
+
+    # iterative trimming of the consensus points
+    for _ in range(max_trims):
+        fit = fit_geometry(geomType, points[inliers])
+        deviations = deviations_to_geometry(geomType, points, fit)
+        # the line deviations are distances (>= 0), the other deviations are signed around 0
+        center = np.median(deviations[inliers]) if geomType != "Line" else 0.0
+        sigma = 1.4826 * np.median(np.abs(deviations[inliers] - center))
+        trim = inliers & (np.abs(deviations - center) > trim_sigma * sigma) if sigma > 0 else np.zeros_like(inliers)
+        if not trim.any() or np.count_nonzero(inliers & ~trim) < _MIN_POINTS[geomType]:
+            break
+        for i in np.flatnonzero(trim):
+            reasons[candidates[i]] = (REJECT_TRIMMED, deviations[i])
+        inliers &= ~trim
+    else:
+        fit = fit_geometry(geomType, points[inliers])
+
+    inlier_mask = np.zeros(len(xyz), dtype=bool)
+    inlier_mask[candidates[inliers]] = True
+    fit["deviations"] = np.full(len(xyz), np.nan)
+    fit["deviations"][candidates] = deviations_to_geometry(geomType, points, fit)
+    rejected = [(int(i), names[i], reason, float(deviation)) for i, (reason, deviation) in sorted(reasons.items())]
+    return {"fit": fit, "inliers": inlier_mask, "rejected": rejected}
+
+
+def robust_fit_many(geomType: str, groups: list, threshold: float, max_workers: int = None, **kwargs) -> list[dict]:
+    """Robustly fit a geometry to every (N,3) point array of 'groups', in parallel threads.
+
+    The keyword arguments are those of robust_fit(), 'names' is a list with the names of every group.
+    """
+    names = kwargs.pop("names", None) or [None] * len(groups)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="SA-Robust") as pool:
+        futures = [pool.submit(robust_fit, geomType, xyz, threshold, group_names, **kwargs) for xyz, group_names in zip(groups, names)]
+        return [future.result() for future in futures]
+
+
+def robust_fit_to_point_groups(
+    geomType: str,
+    collection: str,
+    groups: list[str],
+    threshold: float,
+    name_profile: str = "",
+    fit_tol: float = -1.0,
+    out_tol: bool = False,
+    filtered_suffix: str = " robust",
+    max_workers: int = None,
+    keep_filtered: bool = False,
+    **kwargs,
+) -> dict:
+    """Read the point groups, reject their spurious points in parallel and fit each filtered group once in SA.
+
+    The accepted points of a group are constructed in the temporary group '<group><filtered_suffix>', which must not
+    exist yet (ValueError). The SA fit result is named after the group. The temporary groups are deleted afterwards,
+    unless 'keep_filtered'. Returns the robust_fit() result of every group, by group name.
+    """
+    filtered_groups = [f"{group}{filtered_suffix}" for group in groups]
+    existing = {item[1] for item in make_a_collection_object_name_ref_list_by_type(collection, "Point Group")}
+    clashes = [filtered for filtered in filtered_groups if filtered in existing]
+    if clashes:
+        raise ValueError(f"The filtered point groups exist already in {collection}: {', '.join(clashes)}")
+
+    coordinates = [get_group_coordinates(collection, group) for group in groups]
+    results = robust_fit_many(geomType, [xyz for _, xyz in coordinates], threshold, max_workers, names=[names for names, _ in coordinates], **kwargs)
+
+    reports = {}
+    constructed = []
+    try:
+        for group, filtered, (names, xyz), result in zip(groups, filtered_groups, coordinates, results):
+            keep = result["inliers"]
+            log.debug(f"Robust {geomType} fit of {collection}::{group}: {np.count_nonzero(keep)} of {len(keep)} points kept")
+            constructed.append((collection, filtered, "Point Group"))
+            construct_points(collection, filtered, [name for name, ok in zip(names, keep) if ok], xyz[keep])
+            fit_geometry_to_point_group(geomType, collection, filtered, collection, group, name_profile, False, fit_tol, out_tol)
+            reports[group] = result
+    finally:
+        if constructed and not keep_filtered:
+            delete_object_list(constructed)
+    return reports
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Wildcard selection resolved locally, against the (cached) job index instead of in SA.
+
+The SA wildcard steps take one pattern per step. Here the collection, group and object patterns (SA style glob
+patterns, or regular expressions with regex=True) are matched against the object names of the job and the point
+name lists, after which the selection is acted upon in one ref-list step. A pattern can also be a list of patterns,
+which selects the union of their matches.
+
+The object names are read with one wildcard step per selected object type (not the whole job structure), these
+steps are served from the query cache when it is enabled. A JobSnapshot can be passed instead.
+"""
+from __future__ import annotations
+
+import fnmatch
+import functools
+import re
+from typing import Callable, Union
+
+from . import (
+    OBJECT_TYPES,
+    NamedPoint,
+    delete_object_list,
+    delete_point_list,
+    log,
+    make_a_collection_object_name_ref_list_wildcard_selection,
+    make_a_point_name_ref_list_from_a_group,
+    make_a_relationship_reference_list_wildCard_selection,
+    sdk_transaction,
+)
+from .snapshot import JobSnapshot
+
+Pattern = Union[str, list, tuple]
+
+
+@functools.lru_cache(maxsize=512)
+def compile_pattern(pattern: str, regex: bool = False) -> re.Pattern:
+    """Compile a glob ('*', '?', '[...]', case sensitive) or regular expression pattern, matched against the whole name."""
+    return re.compile(pattern if regex else fnmatch.translate(pattern))
+
+
+def matcher(pattern: Pattern, regex: bool = False) -> Callable[[str], bool]:
+    """Get a function telling whether a name matches the pattern (or any of the patterns)."""
+    patterns = (pattern,) if isinstance(pattern, str) else tuple(pattern)
+    if "*" in patterns:  # the default pattern, also in regex mode
+        return lambda name: True
+    compiled = [compile_pattern(p, regex).fullmatch for p in patterns]
+    if len(compiled) == 1:
+        match = compiled[0]
+        return lambda name: match(name) is not None
+    return lambda name: any(match(name) is not None for match in compiled)
+
+
+@sdk_transaction
+def _job_objects(objtype: str = "Any") -> dict:
+    """Get collection -> object type -> object names of one object type ("Any": all of OBJECT_TYPES).
+
+    One wildcard step per object type, served from the query cache when enabled.
+    """
+    collections = {}
+    for typ in OBJECT_TYPES if objtype == "Any" else (objtype,):
+        for item in make_a_collection_object_name_ref_list_wildcard_selection("*", "*", typ):
+            collections.setdefault(item[0], {}).setdefault(typ, []).append(item[1])
+    return collections
+
+
+def select_objects(collection: Pattern = "*", name: Pattern = "*", objtype: str = "Any", regex: bool = False, snapshot: JobSnapshot = None) -> list[tuple]:
+    """Get the (collection, name, type) tuples of the objects matching the patterns."""
+    collections = _job_objects(objtype) if snapshot is None else snapshot.collections
+    collection_match = matcher(collection, regex)
+    name_match = matcher(name, regex)
+    selected = []
+    for col, types in collections.items():
+        if not collection_match(col):
+            continue
+        for typ, names in types.items():
+            if objtype != "Any" and typ != objtype:
+                continue
+            selected.extend((col, n, typ) for n in names if name_match(n))
+    return selected
+
+
+def select_points(collection: Pattern = "*", group: Pattern = "*", name: Pattern = "*", regex: bool = False, snapshot: JobSnapshot = None) -> list[NamedPoint]:
+    """Get the points matching the patterns, from the point groups matching the collection and group patterns."""
+    name_match = matcher(name, regex)
+    points = []
+    for col, grp, _ in select_objects(collection, group, "Point Group", regex, snapshot):
+        points.extend(point for point in make_a_point_name_ref_list_from_a_group(col, grp) if name_match(point.name))
+    return points
+
+
+def select_relationships(collection: Pattern = "*", name: Pattern = "*", regex: bool = False) -> list[tuple]:
+    """Get the (collection, name) tuples of the relationships matching the patterns."""
+    collection_match = matcher(collection, regex)
+    name_match = matcher(name, regex)
+    return [(col, rel) for col, rel in make_a_relationship_reference_list_wildCard_selection("*", "*") if collection_match(col) and name_match(rel)]
+
+
+def delete_points_matching(collection: Pattern = "*", group: Pattern = "*", name: Pattern = "*", regex: bool = False) -> int:
+    """Delete the points matching the patterns in one step, returns the number of deleted points."""
+    points = select_points(collection, group, name, regex)
+    log.debug(f"Deleting {len(points)} matching points")
+    if points and not delete_point_list(points):
+        return 0
+    return len(points)
+
+
+def delete_objects_matching(collection: Pattern = "*", name: Pattern = "*", objtype: str = "Any", regex: bool = False) -> int:
+    """Delete the objects matching the patterns in one step, returns the number of deleted objects."""
+    objects = select_objects(collection, name, objtype, regex)
+    log.debug(f"Deleting {len(objects)} matching objects")
+    if objects and not delete_object_list(objects):
+        return 0
+    return len(objects)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+An in-memory index of the job structure: folder -> collection -> object type -> object names.
+
+snapshot_job() builds the index with as few SDK steps as possible: one step for the folders, one per folder for its
+collections, N+1 for the collections and one wildcard object list per object type (for all collections at once).
+A snapshot can be saved to (and loaded from) a JSON file, and diffed against a previous snapshot.
+"""
+from __future__ import annotations
+
+import json
+import time
+
+from . import (
+    OBJECT_TYPES,
+    cached_query,
+    get_folder_collections,
+    get_folders_by_wildcard,
+    get_ith_collection_name,
+    get_number_of_collections,
+    log,
+    make_a_collection_object_name_ref_list_wildcard_selection,
+    sdk_transaction,
+)
+
+
+class JobSnapshot:
+    """The job structure at one moment in time.
+
+    folders: folder path -> collection names in that folder
+    collections: collection name -> object type -> sorted object names
+    """
+
+    def __init__(self, folders: dict, collections: dict, created: float = None) -> None:
+        self.folders = folders
+        self.collections = collections
+        self.created = time.time() if created is None else created
+        self._folder_of = {collection: folder for folder, names in folders.items() for collection in names}
+
+    def folder_of(self, collection: str) -> str:
+        """Get the folder of a collection, "" for collections outside of a folder."""
+        return self._folder_of.get(collection, "")
+
+    def objects(self, collection: str, objtype: str) -> list[str]:
+        return self.collections.get(collection, {}).get(objtype, [])
+
+    def index(self) -> dict:
+        """Get the nested folder -> collection -> object type -> names index ("" is the root folder)."""
+        index = {}
+        for collection, types in self.collections.items():
+            index.setdefault(self.folder_of(collection), {})[collection] = types
+        return index
+
+    def object_keys(self) -> set:
+        """Get all objects as (collection, object type, name) tuples."""
+        return {(collection, objtype, name) for collection, types in self.collections.items() for objtype, names in types.items() for name in names}
+
+    def to_dict(self) -> dict:
+        return {"created": self.created, "folders": self.folders, "collections": self.collections}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "JobSnapshot":
+        return cls(data["folders"], data["collections"], data.get("created"))
+
+    def save(self, filename: str) -> None:
+        with open(filename, "w") as f:
+            json.dump(self.to_dict(), f, indent=1, sort_keys=True)
+
+    @classmethod
+    def load(cls, filename: str) -> "JobSnapshot":
+        with open(filename) as f:
+            return cls.from_dict(json.load(f))
+
+    def diff(self, previous: "JobSnapshot") -> dict:
+        """Get the changes since a previous snapshot.
+
+        The result has sorted lists of added/removed collections, added/removed objects ((collection, type, name)
+        tuples) and moved collections ((collection, old folder, new folder) tuples).
+        """
+        collections = set(self.collections)
+        previous_collections = set(previous.collections)
+        objects = self.object_keys()
+        previous_objects = previous.object_keys()
+        moved = [
+            (collection, previous.folder_of(collection), self.folder_of(collection))
+            for collection in sorted(collections & previous_collections)
+            if previous.folder_of(collection) != self.folder_of(collection)
+        ]
+        return {
+            "added_collections": sorted(collections - previous_collections),
+            "removed_collections": sorted(previous_collections - collections),
+            "added_objects": sorted(objects - previous_objects),
+            "removed_objects": sorted(previous_objects - objects),
+            "moved_collections": moved,
+        }
+
+
+@cached_query("collections", "folders", "objects")
+@sdk_transaction
+def snapshot_job(object_types: tuple = OBJECT_TYPES) -> JobSnapshot:
+    """Build a JobSnapshot of the current job, as one SDK transaction.
+
+    With the query cache enabled the snapshot is served from the cache until the job structure changes, don't modify it.
+    """
+    log.debug("Snapshot job")
+    folders = {}
+    for folder in get_folders_by_wildcard("*"):
+        folders[folder] = get_folder_collections(folder)
+
+    collections = {get_ith_collection_name(i): {} for i in range(get_number_of_collections())}
+    for objtype in object_types:
+        for item in make_a_collection_object_name_ref_list_wildcard_selection("*", "*", objtype):
+            collection, name = item[0], item[1]
+            collections.setdefault(collection, {}).setdefault(objtype, []).append(name)
+
+    for types in collections.values():
+        for names in types.values():
+            names.sort()
+    return JobSnapshot(folders, collections)
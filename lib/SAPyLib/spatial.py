@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""
+Spatial index (KD-tree) over point coordinates, for pairing measured points with nominals.
+
+The tree is built once over the (N,3) coordinates. Queries are answered for a whole batch of points at once: the
+tree is walked once for the batch, every node only handles the queries that can still have a closer (or in range)
+point in it, and the points of a leaf are compared to these queries with one array operation. Points can be removed
+from the tree (e.g. nominals that are measured), the nodes without remaining points are skipped.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from . import PointSet, get_group_point_set, log, make_a_point_name_ref_list_from_a_group, rename_points
+
+LEAF_SIZE = 64
+
+
+class KDTree:
+    """A KD-tree over (N,3) coordinates, nodes are split at the median of their widest dimension."""
+
+    def __init__(self, xyz, leaf_size: int = LEAF_SIZE) -> None:
+        self.xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+        if np.isnan(self.xyz).any():
+            raise ValueError("The coordinates of a KDTree can't be NaN.")
+        self.leaf_size = max(1, leaf_size)
+        self.order = np.arange(len(self.xyz))
+        # per node: [start, end) of its points in 'order', the parent, the children (None for a leaf) and the bounding box
+        self._start = []
+        self._end = []
+        self._parent = []
+        self._children = []
+        self._lower = []
+        self._upper = []
+        self._leaf_of = np.empty(len(self.xyz), dtype=int)
+        if len(self.xyz):
+            self._build(0, len(self.xyz), -1)
+        self._start = np.array(self._start, dtype=int)
+        self._end = np.array(self._end, dtype=int)
+        self._lower = np.array(self._lower).reshape(-1, 3)
+        self._upper = np.array(self._upper).reshape(-1, 3)
+        self.sorted_xyz = self.xyz[self.order]
+        self._position = np.empty_like(self.order)
+        self._position[self.order] = np.arange(len(self.order))
+        # the removed points, by position in 'order', and the number of remaining points per node
+        self._active = np.ones(len(self.xyz), dtype=bool)
+        self._count = self._end - self._start
+
+        # the tree as arrays, for descending all queries to their leaf at once
+        leaf = np.array([children is None for children in self._children], dtype=bool)
+        self._left = np.array([-1 if c is None else c[0] for c in self._children], dtype=int)
+        self._right = np.array([-1 if c is None else c[1] for c in self._children], dtype=int)
+        self._dim = np.array([0 if c is None else c[2] for c in self._children], dtype=int)
+        self._split = np.array([0.0 if c is None else c[3] for c in self._children])
+        self._leaf_points = np.full((len(leaf), self.leaf_size), -1)
+        for node in np.flatnonzero(leaf):
+            self._leaf_points[node, : self._end[node] - self._start[node]] = np.arange(self._start[node], self._end[node])
+
+    def __len__(self) -> int:
+        return len(self.xyz)
+
+    def _build(self, start: int, end: int, parent: int) -> int:
+        node = len(self._start)
+        points = self.xyz[self.order[start:end]]
+        lower = points.min(axis=0)
+        upper = points.max(axis=0)
+        self._start.append(start)
+        self._end.append(end)
+        self._parent.append(parent)
+        self._lower.append(lower)
+        self._upper.append(upper)
+        self._children.append(None)
+        if end - start > self.leaf_size:
+            dim = int(np.argmax(upper - lower))
+            middle = (end - start) // 2
+            split = np.argpartition(points[:, dim], middle)
+            self.order[start:end] = self.order[start:end][split]
+            value = float(self.xyz[self.order[start + middle], dim])
+            left = self._build(start, start + middle, node)
+            right = self._build(start + middle, end, node)
+            self._children[node] = (left, right, dim, value)
+        else:
+            self._leaf_of[start:end] = node
+        return node
+
+    @property
+    def remaining(self) -> int:
+        """The number of points that aren't removed."""
+        return int(self._count[0]) if len(self) else 0
+
+    def remove(self, indices) -> None:
+        """Remove points (by index in 'xyz'), they are no longer found by the queries."""
+        positions = self._position[np.unique(np.asarray(indices, dtype=int))]
+        positions = positions[self._active[positions]]
+        self._active[positions] = False
+        parent = self._parent
+        count = self._count
+        for node in self._leaf_of[positions].tolist():
+            while node >= 0:
+                count[node] -= 1
+                node = parent[node]
+
+    def _box_distance(self, node: int, points: np.ndarray) -> np.ndarray:
+        outside = np.maximum(self._lower[node] - points, 0.0) + np.maximum(points - self._upper[node], 0.0)
+        return np.sqrt(np.einsum("ij,ij->i", outside, outside))
+
+    def query(self, points, distance_upper_bound: float = np.inf) -> tuple:
+        """Get the distance to and the index of the nearest point, for every (M,3) query point.
+
+        Queries without a point within 'distance_upper_bound' get distance inf and index -1.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        distance = np.full(len(points), float(distance_upper_bound))
+        index = np.full(len(points), -1)
+        if len(self) and len(points):
+            self._nearest_in_leaf(points, distance, index)
+            self._nearest(0, np.arange(len(points)), points, distance, index)
+        index[np.isinf(distance)] = -1
+        distance[index < 0] = np.inf
+        return distance, index
+
+    def _nearest_in_leaf(self, points: np.ndarray, distance: np.ndarray, index: np.ndarray) -> None:
+        """Start with the nearest point in the leaf of every query, which prunes most of the tree walk."""
+        node = np.zeros(len(points), dtype=int)
+        inner = self._left[node] >= 0
+        while inner.any():
+            n = node[inner]
+            on_left = points[inner, self._dim[n]] < self._split[n]
+            node[inner] = np.where(on_left, self._left[n], self._right[n])
+            inner = self._left[node] >= 0
+        candidates = self._leaf_points[node]
+        offset = points[:, None, :] - self.sorted_xyz[candidates]
+        d = np.where((candidates >= 0) & self._active[candidates], np.sqrt(np.einsum("qnk,qnk->qn", offset, offset)), np.inf)
+        nearest = d.argmin(axis=1)
+        d = d[np.arange(len(points)), nearest]
+        closer = d < distance
+        distance[closer] = d[closer]
+        index[closer] = self.order[candidates[np.arange(len(points)), nearest]][closer]
+
+    def _nearest(self, node: int, queries: np.ndarray, points: np.ndarray, distance: np.ndarray, index: np.ndarray) -> None:
+        if not len(queries) or not self._count[node]:
+            return
+        queries = queries[self._box_distance(node, points[queries]) < distance[queries]]
+        if not len(queries):
+            return
+        children = self._children[node]
+        if children is None:
+            start, end = self._start[node], self._end[node]
+            offset = points[queries, None, :] - self.sorted_xyz[None, start:end, :]
+            d = np.sqrt(np.einsum("qnk,qnk->qn", offset, offset))
+            if self._count[node] < end - start:
+                d[:, ~self._active[start:end]] = np.inf
+            nearest = d.argmin(axis=1)
+            d = d[np.arange(len(queries)), nearest]
+            closer = d < distance[queries]
+            distance[queries[closer]] = d[closer]
+            index[queries[closer]] = self.order[start + nearest[closer]]
+            return
+        left, right, dim, split = children
+        offset = points[queries, dim] - split
+        on_left = offset < 0
+        # the near side first, the far side only for the queries that are closer to the split than to their nearest
+        self._nearest(left, queries[on_left], points, distance, index)
+        self._nearest(right, queries[~on_left], points, distance, index)
+        far = np.abs(offset) < distance[queries]
+        self._nearest(right, queries[on_left & far], points, distance, index)
+        self._nearest(left, queries[~on_left & far], points, distance, index)
+
+    def query_radius(self, points, radius: float) -> list:
+        """Get the indices of the points within 'radius' of every (M,3) query point (sorted by distance)."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        found_queries = []
+        found_points = []
+        found_distances = []
+        if len(self) and len(points):
+            self._radius(0, np.arange(len(points)), points, radius, found_queries, found_points, found_distances)
+        if not found_queries:
+            return [np.empty(0, dtype=int) for _ in range(len(points))]
+        queries = np.concatenate(found_queries)
+        indices = np.concatenate(found_points)
+        order = np.lexsort((np.concatenate(found_distances), queries))
+        counts = np.bincount(queries, minlength=len(points))
+        return np.split(indices[order], np.cumsum(counts)[:-1])
+
+    def _radius(self, node: int, queries: np.ndarray, points: np.ndarray, radius: float, found_queries, found_points, found_distances) -> None:
+        if not self._count[node]:
+            return
+        queries = queries[self._box_distance(node, points[queries]) <= radius]
+        if not len(queries):
+            return
+        children = self._children[node]
+        if children is None:
+            start, end = self._start[node], self._end[node]
+            offset = points[queries, None, :] - self.sorted_xyz[None, start:end, :]
+            d = np.sqrt(np.einsum("qnk,qnk->qn", offset, offset))
+            q, n = np.nonzero((d <= radius) & self._active[start:end])
+            found_queries.append(queries[q])
+            found_points.append(self.order[start + n])
+            found_distances.append(d[q, n])
+            return
+        self._radius(children[0], queries, points, radius, found_queries, found_points, found_distances)
+        self._radius(children[1], queries, points, radius, found_queries, found_points, found_distances)
+
+
+def correspond(nominals: PointSet, actuals: PointSet, max_distance: float = np.inf, tree: KDTree = None) -> dict:
+    """Pair every actual point with its nearest nominal point.
+
+    A nominal is paired with one actual only: the closest one, the other actuals near it are unmatched. Returns a
+    dict with 'pairs': (actual name, nominal name, distance) tuples, 'unmatched': (actual name, reason, distance)
+    tuples and 'unmatched_nominals': the names of the nominals without actual. 'tree' is a prebuilt KDTree of the
+    nominal coordinates.
+    """
+    tree = KDTree(nominals.xyz) if tree is None else tree
+    valid = ~np.isnan(actuals.xyz).any(axis=1)
+    distance = np.full(len(actuals), np.inf)
+    index = np.full(len(actuals), -1)
+    distance[valid], index[valid] = tree.query(actuals.xyz[valid], max_distance)
+
+    # the closest actual wins a nominal that is nearest to several actuals
+    order = np.argsort(distance, kind="stable")
+    taken = np.zeros(len(nominals), dtype=bool)
+    actual_names = actuals.names.tolist()
+    nominal_names = nominals.names.tolist()
+    pairs = []
+    unmatched = []
+    for i in order.tolist():
+        if not valid[i]:
+            unmatched.append((actual_names[i], "invalid coordinate", float("nan")))
+        elif index[i] < 0:
+            unmatched.append((actual_names[i], "no nominal within the maximum distance", float("inf")))
+        elif taken[index[i]]:
+            unmatched.append((actual_names[i], f"nominal '{nominal_names[index[i]]}' is paired with a closer point", float(distance[i])))
+        else:
+            taken[index[i]] = True
+            pairs.append((actual_names[i], nominal_names[index[i]], float(distance[i])))
+    return {
+        "pairs": pairs,
+        "unmatched": unmatched,
+        "unmatched_nominals": [name for name, paired in zip(nominal_names, taken.tolist()) if not paired],
+    }
+
+
+def correspond_groups(collection_nom: str, group_nom: str, collection_act: str, group_act: str, max_distance: float = np.inf) -> dict:
+    """Read a nominal and an actual point group from SA and pair them, see correspond()."""
+    nominals = get_group_point_set(collection_nom, group_nom)
+    actuals = get_group_point_set(collection_act, group_act)
+    result = correspond(nominals[~np.isnan(nominals.xyz).any(axis=1)], actuals, max_distance)
+    log.debug(f"Correspondence: {len(result['pairs'])} pairs, {len(result['unmatched'])} unmatched points")
+    return result
+
+
+def _unique_name(name: str, taken: set) -> str:
+    """Get a name like 'name~1' that isn't in 'taken', and add it."""
+    k = 1
+    while f"{name}~{k}" in taken:
+        k += 1
+    taken.add(f"{name}~{k}")
+    return f"{name}~{k}"
+
+
+def rename_to_nominals(collection: str, group: str, correspondence: dict, overwrite: bool = False) -> int:
+    """Give the actual points of a correspondence the names of their nominals, returns the number of renamed points.
+
+    Actuals whose current name is the new name of another actual are first renamed to a temporary name, unique in the
+    group. A new name that is taken by a point that isn't renamed (e.g. an unmatched actual) raises a ValueError
+    before anything is renamed, with 'overwrite' that point is replaced.
+    """
+    pairs = [(actual, nominal) for actual, nominal, _ in correspondence["pairs"] if actual != nominal]
+    if not pairs:
+        return 0
+    existing = {point.name for point in make_a_point_name_ref_list_from_a_group(collection, group)}
+    renamed = {actual for actual, _ in pairs}
+    blocked = sorted({nominal for _, nominal in pairs} & (existing - renamed))
+    if blocked and not overwrite:
+        raise ValueError(f"The points to rename to are taken by points that aren't renamed: {', '.join(blocked)}")
+
+    targets = {nominal for _, nominal in pairs}
+    taken = existing | targets
+    temporary = []
+    renames = []
+    for actual, nominal in pairs:
+        if actual in targets:
+            name = _unique_name(actual, taken)
+            temporary.append((collection, group, actual, collection, group, name))
+            actual = name
+        renames.append((collection, group, actual, collection, group, nominal))
+    if temporary and rename_points(temporary) != len(temporary):
+        raise SystemError(f"Renaming {collection}::{group} to temporary names failed.")
+    return rename_points(renames, overwrite)
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming proximity matching of live observations to nominal points.
+
+The Python side counterpart of auto_correspond_with_proximity_trigger(): every incoming observation is looked up in
+KD-trees of the nominal points (O(log N) per observation) and results in one event:
+- match: the nearest unmeasured nominal is within the proximity, it is measured from now on
+- duplicate: a measured nominal is much closer than the nearest unmeasured one ('duplicate_ratio' times), or no
+  unmeasured nominal is within the proximity but a measured one is (the nearest is reported)
+- out of range: no nominal within the proximity, the event has the nearest unmeasured nominal (the next target)
+Nominals closer together than the proximity are matched in turn: a measured nominal doesn't hide an unmeasured one,
+unless the observation is that much closer to the measured one (a re-shot point isn't assigned to a neighbour).
+The matcher keeps running statistics of the events and of the match distances. The observations come from any
+iterable: points appearing in an SA group (poll_group_feed) or a simulated feed (simulated_feed) for testing.
+"""
+from __future__ import annotations
+
+import threading
+from time import perf_counter, sleep
+from typing import Callable, Iterable, Iterator, Union
+
+import numpy as np
+
+from . import PointSet, get_point_coordinate, log, make_a_point_set_from_a_group
+from .spatial import KDTree
+
+MATCH = "match"
+DUPLICATE = "duplicate"
+OUT_OF_RANGE = "out of range"
+EVENT_KINDS = (MATCH, DUPLICATE, OUT_OF_RANGE)
+
+
+class Observation:
+    """A measured point: its name, (3,) coordinate and perf_counter() timestamp."""
+
+    __slots__ = ("name", "xyz", "timestamp")
+
+    def __init__(self, name: str, xyz, timestamp: float = None) -> None:
+        self.name = name
+        self.xyz = np.asarray(xyz, dtype=np.float64).reshape(3)
+        self.timestamp = perf_counter() if timestamp is None else timestamp
+
+
+class MatchEvent:
+    """The outcome of one observation.
+
+    'nominal' is the matched (or already measured) nominal, for an out of range observation the nearest unmeasured
+    nominal (None when all nominals are measured). 'distance' is the distance from the observation to it.
+    """
+
+    __slots__ = ("kind", "observation", "nominal", "distance")
+
+    def __init__(self, kind: str, observation: Observation, nominal: Union[str, None], distance: float) -> None:
+        self.kind = kind
+        self.observation = observation
+        self.nominal = nominal
+        self.distance = distance
+
+    def __repr__(self) -> str:
+        return f"MatchEvent({self.kind!r}, {self.observation.name!r}, {self.nominal!r}, {self.distance:.4f})"
+
+
+class ProximityMatcher:
+    """Match a stream of observations to the nominal points within 'proximity'.
+
+    An observation more than 'duplicate_ratio' times closer to a measured nominal than to the nearest unmeasured one
+    is a duplicate of the measured nominal (np.inf: only when no unmeasured nominal is within the proximity).
+    'on_event' is called with every MatchEvent. The matcher can be fed from several threads.
+    """
+
+    def __init__(
+        self, nominals: PointSet, proximity: float, on_event: Callable[[MatchEvent], None] = None, duplicate_ratio: float = 3.0
+    ) -> None:
+        if proximity <= 0:
+            raise ValueError("The proximity should be larger than 0.")
+        if duplicate_ratio < 1:
+            raise ValueError("The duplicate ratio should be at least 1.")
+        self.nominals = nominals[~np.isnan(nominals.xyz).any(axis=1)]
+        self.proximity = float(proximity)
+        self.duplicate_ratio = float(duplicate_ratio)
+        self.on_event = on_event
+        self._names = self.nominals.names.tolist()
+        self._all = KDTree(self.nominals.xyz)
+        self._unmeasured = KDTree(self.nominals.xyz)
+        self.measured = np.zeros(len(self.nominals), dtype=bool)
+        self.matches = {}  # nominal name -> matched Observation
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(EVENT_KINDS, 0)
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._max = 0.0
+        self._first = None
+        self._last = None
+
+    @property
+    def remaining(self) -> int:
+        return self._unmeasured.remaining
+
+    @property
+    def complete(self) -> bool:
+        return self._unmeasured.remaining == 0
+
+    def unmeasured(self) -> list[str]:
+        return [name for name, measured in zip(self._names, self.measured.tolist()) if not measured]
+
+    def process(self, observation: Observation) -> MatchEvent:
+        """Match one observation, returns (and reports) its event."""
+        with self._lock:
+            distance, index = self._unmeasured.query(observation.xyz)
+            distance, index = float(distance[0]), int(index[0])
+            if index >= 0 and distance <= self.proximity:
+                # only a measured nominal can be 'duplicate_ratio' times closer than the nearest unmeasured one
+                closer_distance, closer_index = self._all.query(observation.xyz, distance / self.duplicate_ratio)
+                if closer_index[0] >= 0:
+                    # the observation re-measures that nominal, it isn't assigned to a neighbour
+                    event = MatchEvent(DUPLICATE, observation, self._names[int(closer_index[0])], float(closer_distance[0]))
+                else:
+                    self.measured[index] = True
+                    self._unmeasured.remove(index)
+                    self.matches[self._names[index]] = observation
+                    event = MatchEvent(MATCH, observation, self._names[index], distance)
+                    self._add_match_distance(distance)
+            else:
+                measured_distance, measured_index = self._all.query(observation.xyz, self.proximity)
+                if measured_index[0] >= 0:
+                    # the nearest nominal within the proximity is a measured one, no unmeasured one is that close
+                    event = MatchEvent(DUPLICATE, observation, self._names[int(measured_index[0])], float(measured_distance[0]))
+                else:
+                    event = MatchEvent(OUT_OF_RANGE, observation, self._names[index] if index >= 0 else None, distance)
+            self._counts[event.kind] += 1
+            self._first = observation.timestamp if self._first is None else self._first
+            self._last = observation.timestamp
+        log.debug(f"Proximity matcher: {event}")
+        if self.on_event is not None:
+            self.on_event(event)
+        return event
+
+    def _add_match_distance(self, distance: float) -> None:
+        # Welford's running mean and variance
+        self._n += 1
+        delta = distance - self._mean
+        self._mean += delta / self._n
+        self._m2 += delta * (distance - self._mean)
+        self._max = max(self._max, distance)
+
+    def stream(self, feed: Iterable[Observation], until_complete: bool = True) -> Iterator[MatchEvent]:
+        """Match the observations of the feed, yielding every event. Stops when all nominals are measured."""
+        for observation in feed:
+            yield self.process(observation)
+            if until_complete and self.complete:
+                return
+
+    def run(self, feed: Iterable[Observation], until_complete: bool = True) -> dict:
+        """Match all observations of the feed, returns the statistics."""
+        for _ in self.stream(feed, until_complete):
+            pass
+        return self.statistics()
+
+    def statistics(self) -> dict:
+        """The running statistics: the event counts, the match distances and the observation rate (per second)."""
+        with self._lock:
+            observations = sum(self._counts.values())
+            elapsed = (self._last - self._first) if observations > 1 else 0.0
+            return {
+                "observations": observations,
+                "matches": self._counts[MATCH],
+                "duplicates": self._counts[DUPLICATE],
+                "out_of_range": self._counts[OUT_OF_RANGE],
+                "measured": len(self.nominals) - self._unmeasured.remaining,
+                "remaining": self._unmeasured.remaining,
+                "mean_distance": self._mean if self._n else float("nan"),
+                "std_distance": float(np.sqrt(self._m2 / (self._n - 1))) if self._n > 1 else float("nan"),
+                "max_distance": self._max if self._n else float("nan"),
+                "rate": (observations - 1) / elapsed if elapsed > 0 else float("nan"),
+            }
+
+
+def simulated_feed(
+    nominals: PointSet,
+    noise: float = 0.01,
+    duplicate_fraction: float = 0.05,
+    outlier_fraction: float = 0.05,
+    outlier_distance: float = 50.0,
+    rate: float = None,
+    seed=None,
+) -> Iterator[Observation]:
+    """Simulate measuring the nominals in a random order, for testing a matcher without instrument.
+
+    Every nominal is measured with normal 'noise' (standard deviation per axis). A fraction of the observations
+    measures an already measured nominal again, another fraction misses its nominal by 'outlier_distance'. 'rate'
+    limits the observations per second (None: as fast as possible).
+    """
+    rng = np.random.default_rng(seed)
+    xyz = nominals.xyz[~np.isnan(nominals.xyz).any(axis=1)]
+    order = rng.permutation(len(xyz))
+    measured = []
+    count = 0
+    for index in order.tolist():
+        targets = [index]
+        if measured and rng.random() < duplicate_fraction:
+            targets.append(measured[rng.integers(len(measured))])
+        if rng.random() < outlier_fraction:
+            targets.append(-1 - index)
+        for target in targets:
+            if target < 0:
+                direction = rng.normal(size=3)
+                point = xyz[-1 - target] + outlier_distance * direction / np.linalg.norm(direction)
+            else:
+                point = xyz[target] + rng.normal(0.0, noise, 3)
+            if rate:
+                sleep(1.0 / rate)
+            count += 1
+            yield Observation(f"Obs{count}", point)
+        measured.append(index)
+
+
+def poll_group_feed(
+    collection: str, group: str, interval: float = 0.5, stop: threading.Event = None, timeout: float = None
+) -> Iterator[Observation]:
+    """Yield the points that appear in an SA point group (e.g. while measuring into it), polled every 'interval' s.
+
+    The points already in the group aren't yielded. Polls until 'stop' is set or after 'timeout' seconds.
+    """
+    stop = threading.Event() if stop is None else stop
+    end = None if timeout is None else perf_counter() + timeout
+    known = set(make_a_point_set_from_a_group(collection, group).names.tolist())
+    while not stop.is_set() and (end is None or perf_counter() < end):
+        for name in make_a_point_set_from_a_group(collection, group).names.tolist():
+            if name not in known:
+                known.add(name)
+                point = get_point_coordinate(collection, group, name)
+                yield Observation(name, (point.X, point.Y, point.Z))
+        stop.wait(interval if end is None else max(min(interval, end - perf_counter()), 0.0))
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+The tests run the wrappers against the stub SDK of the benchmarks, no SA (or .NET) installation is needed.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "lib"), os.path.join(ROOT, "benchmarks")]
+
+import SAPyLib as sa  # noqa: E402
+from stub_sdk import FakeJobSdk, FakeNrkSdk, FakeTools  # noqa: E402
+
+
+@pytest.fixture
+def points():
+    """The job points {(collection, group, name): (x, y, z)} of the stub SDK, a test module overrides it to get a
+    FakeJobSdk with these points."""
+    return None
+
+
+@pytest.fixture
+def sdk(points):
+    """The stub SDK: a FakeJobSdk with the 'points', without points a FakeNrkSdk. Override it for another stub."""
+    return FakeNrkSdk() if points is None else FakeJobSdk(points)
+
+
+@pytest.fixture
+def use_stub():
+    """Activate a session on a stub SDK (and SA Python Tools object): use_stub(sdk, tools=FakeTools()).
+
+    The library state is reset afterwards.
+    """
+    sessions = []
+
+    def activate(sdk, tools=FakeTools()) -> sa.Session:
+        sessions.append(sa.use_session(sa.Session(sdk=sdk, tools=tools)))
+        return sessions[-1]
+
+    yield activate
+    for session in sessions:
+        session.stop_executor()
+    sa.disable_query_cache()
+    sa.use_session(sa.Session())
+
+
+@pytest.fixture
+def session(sdk, use_stub):
+    """An active session on the stub SDK, the library state is reset afterwards."""
+    return use_stub(sdk)
+
+
+DOTNET_NAMES = ("clr", "System", "Array", "Double", "String", "List", "Int32", "GCHandle", "GCHandleType", "COMException")
+
+
+@pytest.fixture
+def dotnet(monkeypatch):
+    """Load the .NET runtime for one test (skipped without pythonnet), the stub state of the library is restored."""
+    pytest.importorskip("clr")
+    for name in DOTNET_NAMES:
+        monkeypatch.setattr(sa, name, getattr(sa, name))
+    sa._load_clr()
+    return sa
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+import time
+
+import pytest
+
+import SAPyLib as sa
+from SAPyLib import aio
+from stub_sdk import FakeNrkSdk
+
+
+@pytest.fixture
+def sdk():
+    return FakeNrkSdk(latency=0.02, group_size=3)
+
+
+def test_wrappers_and_composites_are_coroutine_functions():
+    for name in ("get_point_coordinate", "configure_and_measure", "construct_points", "get_group_coordinates", "select_objects"):
+        assert asyncio.iscoroutinefunction(getattr(aio, name)) and name in aio.__all__
+    for name in ("PointSet", "enable_query_cache", "numpy_to_csharp_array"):
+        assert not hasattr(aio, name)
+
+
+def test_calls_run_on_the_sdk_thread(session, sdk):
+    assert session.executor is None
+    point = asyncio.run(aio.get_point_coordinate("Col", "Grp", "P1"))
+    assert (point.X, point.Y, point.Z) == (1.0, 2.0, 3.0)
+    thread_id = asyncio.run(aio.run(threading.get_ident))
+    assert thread_id == session.executor.thread_id != threading.get_ident()
+
+
+def test_event_loop_keeps_running(session, sdk):
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        task = asyncio.create_task(ticker())
+        points = await aio.make_a_point_name_ref_list_from_a_group("Col", "Grp")
+        await asyncio.gather(*(aio.get_point_coordinate(p.collection, p.group, p.name) for p in points))
+        task.cancel()
+        return ticks
+
+    # 4 steps of 20 ms, while the loop runs the ticker
+    assert asyncio.run(main()) > 10
+    assert sdk.steps == 4
+
+
+def test_timeout_removes_a_queued_call(session, sdk):
+    release = threading.Event()
+    session.start_executor()
+
+    async def main():
+        blocking = asyncio.ensure_future(aio.run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await aio.run(sa.get_point_coordinate, "Col", "Grp", "P1", _timeout=0.01)
+        release.set()
+        await blocking
+        await aio.run(lambda: None)
+
+    asyncio.run(main())
+    assert sdk.steps == 0
+
+
+def test_timeout_lets_a_running_call_complete(session, sdk):
+    done = []
+
+    def slow():
+        time.sleep(0.05)
+        done.append(sa.get_point_coordinate("Col", "Grp", "P1").X)
+
+    async def main():
+        await aio.run(lambda: None)
+        with pytest.raises(asyncio.TimeoutError):
+            await aio.run(slow, _timeout=0.01)
+        await aio.run(lambda: None)
+
+    asyncio.run(main())
+    assert done == [1.0]
+
+
+def test_default_timeout(session, sdk, monkeypatch):
+    monkeypatch.setattr(aio, "default_timeout", 0.001)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(aio.get_point_coordinate("Col", "Grp", "P1"))
+
+
+def test_keyword_arguments_are_passed_unchanged(session, sdk):
+    def notify(txt, timeout=0):
+        return txt, timeout
+
+    assert asyncio.run(aio._make_async(notify)("hi", timeout=5)) == ("hi", 5)
+    assert asyncio.run(aio.run(notify, "hi", timeout=5, _timeout=1.0)) == ("hi", 5)
+
+
+def test_executor_is_started_outside_the_event_loop(session, sdk, monkeypatch):
+    threads = []
+    start_executor = session.start_executor
+
+    def recording_start():
+        threads.append(threading.get_ident())
+        return start_executor()
+
+    monkeypatch.setattr(session, "start_executor", recording_start)
+
+    async def main():
+        await aio.get_point_coordinate("Col", "Grp", "P1")
+        await aio.get_point_coordinate("Col", "Grp", "P2")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+    assert len(threads) == 1 and threads[0] != loop_thread
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+import numpy as np
+import pytest
+
+import SAPyLib as sa
+import bench_robust
+import bench_wrappers
+
+
+@pytest.fixture
+def results():
+    try:
+        yield bench_wrappers.run(latency=0.0, repeat=1)[1]
+    finally:
+        sa.use_session(sa.Session())
+
+
+def test_sdk_steps_match_the_baselines(results):
+    """The number of SDK steps per call doesn't depend on the machine, it should match exactly."""
+    with open(os.path.join(os.path.dirname(bench_wrappers.__file__), "baselines.json")) as f:
+        baselines = json.load(f)
+    assert {name: result["steps_per_call"] for name, result in results.items()} == {
+        name: baselines[name]["steps_per_call"] for name in results
+    }
+
+
+def test_compare_relative_overhead():
+    baselines = {"a": {"relative": 10.0, "steps_per_call": 1.0}, "b": {"relative": 10.0, "steps_per_call": 1.0}}
+    results = {
+        "a": {"relative": 12.0, "steps_per_call": 1.0},
+        "b": {"relative": 14.0, "steps_per_call": 1.0},
+        "new": {"relative": 100.0, "steps_per_call": 5.0},
+    }
+    assert [name for name, _ in bench_wrappers.compare(results, baselines, margin=0.5)] == []
+    assert [name for name, _ in bench_wrappers.compare(results, baselines, margin=0.3)] == ["b"]
+
+
+def test_compare_more_sdk_steps():
+    baselines = {"a": {"relative": 10.0, "steps_per_call": 1.0}}
+    assert [name for name, _ in bench_wrappers.compare({"a": {"relative": 1.0, "steps_per_call": 2.0}}, baselines, margin=0.5)] == ["a"]
+
+
+def test_robust_benchmark_scores_like_the_sequential_search():
+    xyz = bench_robust.sphere_groups(1, 300)[0]
+    hypotheses = bench_robust._hypotheses("Sphere", xyz, iterations=50, seed=3)
+    np.testing.assert_array_equal(
+        bench_robust.score_vectorized("Sphere", xyz, hypotheses, 0.1), bench_robust.score_sequentially("Sphere", xyz, hypotheses, 0.1)
+    )
+    assert set(bench_robust.run(groups=2, points=100, workers=2, repeat=1)) == {"sequential scoring", "vectorized scoring", "1 thread", "2 threads"}
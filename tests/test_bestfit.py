@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+import SAPyLib as sa
+from SAPyLib.bestfit import _euler_angles, _rotation, best_fit, best_fit_subsets
+
+RNG = np.random.default_rng(18)
+CORRESPONDING = RNG.uniform(-500.0, 500.0, (12, 3)) + [1e4, -2e4, 3e3]
+ANGLES = np.array([0.1, -0.2, 0.3])
+ROTATION = _rotation(ANGLES)[0]
+TRANSLATION = np.array([10.0, -5.0, 2.0])
+
+
+def _reference(scale: float = 1.0, noise: float = 0.0) -> np.ndarray:
+    return scale * CORRESPONDING @ ROTATION.T + TRANSLATION + RNG.normal(0.0, noise, CORRESPONDING.shape)
+
+
+@pytest.fixture
+def points():
+    points = {("Col", "Ref", f"P{i}"): xyz for i, xyz in enumerate(_reference().tolist())}
+    points.update({("Col", "Meas", f"P{i}"): xyz for i, xyz in reversed([*enumerate(CORRESPONDING.tolist())])})
+    points[("Col", "Meas", "Extra")] = (0.0, 0.0, 0.0)
+    return points
+
+
+def test_rigid_fit_recovers_the_transform():
+    fit = best_fit(_reference(), CORRESPONDING)
+    np.testing.assert_allclose(np.array(fit["trans_in_world"])[:3, :3], ROTATION, atol=1e-12)
+    np.testing.assert_allclose(np.array(fit["trans_in_world"])[:3, 3], TRANSLATION, atol=1e-7)
+    assert fit["scale"] == 1.0 and fit["rms"] < 1e-8 and fit["max_abs_dev"] < 1e-8
+    assert (fit["n_unknown"], fit["n_equations"]) == (6, 36)
+    assert fit["trans_in_work"] == fit["trans_in_world"] and np.isnan(fit["robustness"])
+
+
+def test_similarity_fit():
+    fit = best_fit(_reference(scale=1.001), CORRESPONDING, allow_scale=True)
+    assert fit["scale"] == pytest.approx(1.001, abs=1e-12) and fit["rms"] < 1e-8 and fit["n_unknown"] == 7
+
+
+def test_noisy_fit_is_a_proper_rotation():
+    fit = best_fit(_reference(noise=0.01), CORRESPONDING)
+    rotation = np.array(fit["trans_in_world"])[:3, :3]
+    assert np.linalg.det(rotation) == pytest.approx(1.0)
+    assert 0.005 < fit["rms"] < 0.03
+    np.testing.assert_allclose(fit["deviations"], np.linalg.norm(CORRESPONDING @ rotation.T + np.array(fit["trans_in_world"])[:3, 3] - _reference(), axis=1), atol=0.05)
+
+
+def test_mirrored_points_give_a_rotation():
+    mirrored = CORRESPONDING * [1.0, 1.0, -1.0]
+    fit = best_fit(mirrored, CORRESPONDING)
+    assert np.linalg.det(np.array(fit["trans_in_world"])[:3, :3]) == pytest.approx(1.0)
+
+
+def test_locked_degrees_of_freedom():
+    # translation only
+    shifted = CORRESPONDING + TRANSLATION
+    fit = best_fit(shifted, CORRESPONDING, allow_rx=False, allow_ry=False, allow_rz=False)
+    np.testing.assert_allclose(np.array(fit["trans_in_world"]), np.block([[np.eye(3), TRANSLATION[:, None]], [np.zeros((1, 3)), 1.0]]), atol=1e-9)
+    assert fit["n_unknown"] == 3
+
+    # a rotation about Z only, with the X and Y rotations locked the fit finds it back
+    about_z = _rotation(np.array([0.0, 0.0, 0.3]))[0]
+    fit = best_fit(CORRESPONDING @ about_z.T + TRANSLATION, CORRESPONDING, allow_rx=False, allow_ry=False)
+    np.testing.assert_allclose(_euler_angles(np.array(fit["trans_in_world"])[:3, :3]), [0.0, 0.0, 0.3], atol=1e-12)
+    assert fit["rms"] < 1e-8
+
+    # the locked angles stay zero, also when the data has them
+    fit = best_fit(_reference(), CORRESPONDING, allow_rx=False, allow_z=False)
+    angles = _euler_angles(np.array(fit["trans_in_world"])[:3, :3])
+    assert angles[0] == 0.0 and np.array(fit["trans_in_world"])[2, 3] == 0.0 and fit["rms"] > 1.0
+
+
+def test_weights_and_working_frame():
+    reference = _reference()
+    reference[0] += 100.0
+    weights = np.ones(len(reference))
+    weights[0] = 0.0
+    working = np.eye(4)
+    working[:3, 3] = [1.0, 2.0, 3.0]
+    fit = best_fit(reference, CORRESPONDING, weights=weights, working_transform=working)
+    assert fit["rms"] < 1e-8 and fit["max_abs_dev"] < 1e-8 and fit["deviations"][0] > 100.0
+    assert fit["n_equations"] == 33
+    np.testing.assert_allclose(fit["trans_in_work"], np.linalg.inv(working) @ np.array(fit["trans_in_world"]) @ working)
+
+
+def test_subsets_match_the_single_fits():
+    reference = _reference(noise=0.02)
+    subsets = RNG.random((600, len(reference))) < 0.6
+    subsets[:, :3] = True
+    fits = best_fit_subsets(reference, CORRESPONDING, subsets)
+    assert fits["trans_in_world"].shape == (600, 4, 4) and fits["n_points"].tolist() == subsets.sum(axis=1).tolist()
+    for k in (0, 299, 599):
+        single = best_fit(reference[subsets[k]], CORRESPONDING[subsets[k]])
+        np.testing.assert_allclose(fits["trans_in_world"][k], single["trans_in_world"], atol=1e-7)
+        assert fits["rms"][k] == pytest.approx(single["rms"]) and fits["max_abs_dev"][k] == pytest.approx(single["max_abs_dev"])
+
+
+def test_invalid_input():
+    with pytest.raises(ValueError):
+        best_fit(CORRESPONDING[:, :2], CORRESPONDING[:, :2])
+    with pytest.raises(ValueError):
+        best_fit(CORRESPONDING[:5], CORRESPONDING[:6])
+    with pytest.raises(ValueError):
+        best_fit_subsets(CORRESPONDING, CORRESPONDING, [[True, True] + [False] * 10])
+
+
+def test_best_fit_groups_pairs_by_name(session, sdk):
+    fit = sa.best_fit_groups("Col", "Ref", "Col", "Meas")
+    assert fit["rms"] < 1e-8 and fit["n_equations"] == 36
+    np.testing.assert_allclose(np.array(fit["trans_in_world"])[:3, :3], ROTATION, atol=1e-12)
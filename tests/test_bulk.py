@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import numpy as np
+
+import pytest
+
+import SAPyLib as sa
+from stub_sdk import FakeJobSdk, FakeNrkSdk
+
+
+@pytest.fixture
+def sdk():
+    return FakeNrkSdk(group_size=1200)
+
+
+def test_get_group_coordinates_chunks(session, sdk):
+    calls = []
+    names, xyz = sa.get_group_coordinates("Col", "Grp", chunk_size=500, progress=lambda done, total: calls.append((done, total)))
+    assert len(names) == 1200
+    assert xyz.shape == (1200, 3)
+    assert np.all(xyz == [1.0, 2.0, 3.0])
+    assert calls == [(500, 1200), (1000, 1200), (1200, 1200)]
+
+
+def test_get_group_coordinates_releases_the_sdk_between_chunks(session, sdk):
+    """Another thread gets its transaction in between the chunks."""
+    other = []
+
+    def progress(done, total):
+        if done == 10:
+            thread = threading.Thread(target=lambda: other.append(sa.get_point_coordinate("Col", "Grp", "x")))
+            thread.start()
+            thread.join()
+
+    sa.get_group_coordinates("Col", "Grp", chunk_size=10, progress=progress)
+    assert len(other) == 1
+
+
+def test_construct_points_chunks(session, sdk):
+    calls = []
+    xyz = np.arange(30.0).reshape(10, 3)
+    assert sa.construct_points("Col", "Grp", [f"p{i}" for i in range(10)], xyz, chunk_size=4, progress=lambda d, t: calls.append(d)) == 10
+    assert calls == [4, 8, 10]
+    assert sdk.steps == 10
+
+
+class RefusingSdk(FakeJobSdk):
+    """Stub job SDK that refuses to construct the points named 'Bad...'."""
+
+    def _construct_a_point_in_working_coordinates(self, args):
+        if args["Point Name"][2].startswith("Bad"):
+            return False
+        super()._construct_a_point_in_working_coordinates(args)
+
+
+@pytest.fixture
+def job(use_stub):
+    """A session on a stub job SDK."""
+    sdk = RefusingSdk()
+    use_stub(sdk)
+    return sdk
+
+
+def test_construct_points_coordinates(job):
+    xyz = np.random.default_rng(2).normal(size=(7, 3))
+    names = ["p0", "p1", "Bad2", "p3", "p4", "Bad5", "p6"]
+    assert sa.construct_points("Col", "Grp", names, xyz, chunk_size=3) == 5
+    assert job.points_of("Col", "Grp") == {name: tuple(p) for name, p in zip(names, xyz.tolist()) if not name.startswith("Bad")}
+
+
+def test_construct_points_from_array_views(job):
+    point_set = sa.PointSet("Col", "Grp", np.array(["p0", "p1", "p2"]), np.arange(9.0).reshape(3, 3))
+    assert sa.construct_points("Col", "Grp", point_set.names, point_set.xyz[:, ::-1], chunk_size=2) == 3
+    assert job.points_of("Col", "Grp") == {"p0": (2.0, 1.0, 0.0), "p1": (5.0, 4.0, 3.0), "p2": (8.0, 7.0, 6.0)}
+    assert [step for step, _ in job.executed].count("Construct a Point in Working Coordinates") == 3
+
+
+def test_construct_points_arguments(session, sdk):
+    with pytest.raises(ValueError):
+        sa.construct_points("Col", "Grp", ["p0", "p1"], np.zeros((2, 2)))
+    with pytest.raises(ValueError):
+        sa.construct_points("Col", "Grp", ["p0"], np.zeros((2, 3)))
+    with pytest.raises(ValueError):
+        sa.construct_points("Col", "Grp", ["p0"], np.zeros((1, 3)), chunk_size=0)
+    assert sa.construct_points("Col", "Grp", [], np.zeros((0, 3))) == 0
+    assert sdk.steps == 0
+
+
+class UnreadableSdk(FakeJobSdk):
+    """Stub job SDK that can't read the coordinates of the points named 'Bad...'."""
+
+    def _get_point_coordinate(self, args):
+        if args["Point Name"][2].startswith("Bad"):
+            return False
+        return super()._get_point_coordinate(args)
+
+
+@pytest.fixture
+def unreadable(use_stub):
+    """A session on a stub job SDK with an unreadable point."""
+    points = {("Col", "Grp", f"P{i}"): (float(i), -float(i), 0.5) for i in range(5)}
+    points[("Col", "Grp", "Bad")] = (9.0, 9.0, 9.0)
+    points[("Col", "Other", "P0")] = (7.0, 7.0, 7.0)
+    sdk = UnreadableSdk(points)
+    use_stub(sdk)
+    return sdk
+
+
+def test_get_group_coordinates_reads_every_point(unreadable):
+    names, xyz = sa.get_group_coordinates("Col", "Grp", chunk_size=2)
+    # one step listing the group, then one step per point: SA has no bulk coordinate step
+    assert unreadable.steps == 1 + 6
+    assert names == ["P0", "P1", "P2", "P3", "P4", "Bad"]
+    np.testing.assert_array_equal(xyz[:5], [[i, -i, 0.5] for i in range(5)])
+    assert np.isnan(xyz[5]).all()
+    point_set = sa.get_group_point_set("Col", "Grp")
+    assert point_set.refs() == [f"Col::Grp::{name}" for name in names]
+    names, xyz = sa.get_group_coordinates("Col", "Empty")
+    assert names == [] and xyz.shape == (0, 3)
+    with pytest.raises(ValueError):
+        sa.get_group_coordinates("Col", "Grp", chunk_size=0)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import SAPyLib as sa
+from stub_sdk import FakeJobSdk
+
+
+class FailingSdk(FakeJobSdk):
+    """Stub SDK whose ref list steps fail for the lists with a 'Bad' reference."""
+
+    def _fail_bad(self, args):
+        refs = args.get("Point Names", args.get("Object Names", args.get("Objects To Show", [])))
+        return not any("Bad" in ref for ref in refs)
+
+    _delete_points = _delete_objects = _show_objects = _fail_bad
+
+
+@pytest.fixture
+def sdk():
+    return FailingSdk({("Col", "Grp", f"P{i}"): (0.0, 0.0, float(i)) for i in range(5)})
+
+
+def _ref_lists(sdk, step: str, arg: str) -> list:
+    return [args[arg] for executed, args in sdk.executed if executed == step]
+
+
+def test_delete_point_list_accepts_every_point_type(session, sdk):
+    points = [sa.NamedPoint(["Col", "Grp", "P0"]), ("Col", "Grp", "P1"), "Col::Grp::P2", sa.PointSet("Col", "Grp", ["P3"])[0]]
+    assert sa.delete_point_list(points)
+    assert sa.delete_point_list(sa.PointSet("Col", "Grp", ["P4", "P5"]))
+    assert _ref_lists(sdk, "Delete Points", "Point Names") == [
+        ["Col::Grp::P0", "Col::Grp::P1", "Col::Grp::P2", "Col::Grp::P3"],
+        ["Col::Grp::P4", "Col::Grp::P5"],
+    ]
+
+
+def test_lists_are_chunked(session, sdk):
+    refs = [f"Col::Grp::P{i}" for i in range(2500)]
+    assert sa.delete_point_list(refs)
+    assert [len(chunk) for chunk in _ref_lists(sdk, "Delete Points", "Point Names")] == [1000, 1000, 500]
+    objects = [("Col", f"Pl{i}", "Plane") for i in range(5)]
+    sa.hide_object_list(objects, chunk_size=2)
+    assert _ref_lists(sdk, "Hide Objects", "Objects To Hide") == [["Col::Pl0::Plane", "Col::Pl1::Plane"], ["Col::Pl2::Plane", "Col::Pl3::Plane"], ["Col::Pl4::Plane"]]
+    assert sa.delete_object_list([]) and sdk.steps == 3 + 3
+    with pytest.raises(ValueError):
+        sa.show_object_list(objects, chunk_size=0)
+
+
+def test_failed_chunks_are_reported(session, sdk, caplog):
+    assert not sa.delete_point_list(["Col::Grp::P0", "Col::Grp::Bad", "Col::Grp::P2"], chunk_size=2)
+    assert "Failed to delete 2 of 3 points" in caplog.text
+    # the other chunks are still deleted
+    assert len(_ref_lists(sdk, "Delete Points", "Point Names")) == 2
+    assert not sa.delete_object_list([("Col", "Bad", "Plane"), "Col::Pl1::Plane"])
+    assert sa.delete_object_list(["Col::Pl1::Plane"])
+
+
+def test_show_object_list(session, sdk):
+    sa.show_object_list([("Col", "Pl1", "Plane"), "Col::Cyl1::Cylinder"])
+    assert _ref_lists(sdk, "Show Objects", "Objects To Show") == [["Col::Pl1::Plane", "Col::Cyl1::Cylinder"]]
+
+
+def test_delete_points_matching(session, sdk):
+    assert sa.delete_points_matching("Col", "Grp", "P[13]") == 2
+    assert _ref_lists(sdk, "Delete Points", "Point Names") == [["Col::Grp::P1", "Col::Grp::P3"]]
+    assert sa.delete_points_matching("Col", "Grp", "Q*") == 0
+    assert len(_ref_lists(sdk, "Delete Points", "Point Names")) == 1
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+import pytest
+
+import SAPyLib as sa
+from SAPyLib.spatial import KDTree, correspond
+
+
+@pytest.fixture
+def points():
+    return {("Part", "Meas", name): (float(i), 0.0, 0.0) for i, name in enumerate(["A", "B", "C", "A~", "A~1", "X"])}
+
+
+def _pairs(*pairs) -> dict:
+    return {"pairs": [(actual, nominal, 0.0) for actual, nominal in pairs], "unmatched": [], "unmatched_nominals": []}
+
+
+def test_swapped_names_use_unique_temporary_names(session, sdk):
+    # 'A~' and 'A~1' exist already, A's temporary name must not collide with them
+    assert sa.rename_to_nominals("Part", "Meas", _pairs(("A", "B"), ("B", "A"), ("C", "D"))) == 3
+    assert sdk.points_of("Part", "Meas") == {
+        "B": (0.0, 0.0, 0.0),
+        "A": (1.0, 0.0, 0.0),
+        "D": (2.0, 0.0, 0.0),
+        "A~": (3.0, 0.0, 0.0),
+        "A~1": (4.0, 0.0, 0.0),
+        "X": (5.0, 0.0, 0.0),
+    }
+
+
+def test_name_of_a_point_that_is_not_renamed(session, sdk):
+    # X is an unmatched actual, renaming A to X would replace it
+    with pytest.raises(ValueError, match="X"):
+        sa.rename_to_nominals("Part", "Meas", _pairs(("A", "X"), ("B", "E")))
+    assert set(sdk.points_of("Part", "Meas")) == {"A", "B", "C", "A~", "A~1", "X"}
+
+    assert sa.rename_to_nominals("Part", "Meas", _pairs(("A", "X"), ("B", "E")), overwrite=True) == 2
+    assert sdk.points_of("Part", "Meas")["X"] == (0.0, 0.0, 0.0)
+
+
+def test_kdtree_matches_brute_force():
+    rng = np.random.default_rng(21)
+    xyz = rng.uniform(-50.0, 50.0, (2000, 3))
+    queries = rng.uniform(-60.0, 60.0, (500, 3))
+    distance, index = KDTree(xyz, leaf_size=16).query(queries)
+    brute = np.linalg.norm(queries[:, None, :] - xyz[None, :, :], axis=2)
+    assert np.array_equal(index, brute.argmin(axis=1))
+    assert np.allclose(distance, brute.min(axis=1))
+
+
+def test_correspond_pairs_a_nominal_with_the_closest_actual():
+    nominals = sa.PointSet("Part", "Nom", ["N1", "N2", "N3"], [[0.0, 0.0, 0.0], [10.0, 0.0, 0.0], [20.0, 0.0, 0.0]])
+    actuals = sa.PointSet("Part", "Meas", ["M1", "M2", "M3", "M4"], [[0.1, 0.0, 0.0], [0.3, 0.0, 0.0], [10.2, 0.0, 0.0], [50.0, 0.0, 0.0]])
+    result = correspond(nominals, actuals, max_distance=1.0)
+    assert [(a, n) for a, n, _ in result["pairs"]] == [("M1", "N1"), ("M3", "N2")]
+    assert [a for a, _, _ in result["unmatched"]] == ["M2", "M4"]
+    assert result["unmatched_nominals"] == ["N3"]
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import pytest
+
+import SAPyLib as sa
+
+
+@pytest.fixture
+def points():
+    return {}
+
+
+def _steps(sdk) -> list:
+    return [(step, args.get("Objects To Show", args.get("Objects To Hide"))) for step, args in sdk.executed]
+
+
+def test_batch_executes_the_net_effect(session, sdk):
+    with sa.batch_display() as batch:
+        for i in range(3):
+            sa.hide_objects("Col", f"Pl{i}", "Plane")
+        sa.show_objects("Col", "Pl1", "Plane")
+        sa.show_object_list([("Col", "Cyl1", "Cylinder")])
+        sa.center_graphics_about_objects("Plane")
+        sa.center_graphics_about_objects("Any", "Col")
+        assert sdk.steps == 0 and batch.queued == 7
+    assert _steps(sdk) == [
+        ("Show Objects", ["Col::Pl1::Plane", "Col::Cyl1::Cylinder"]),
+        ("Hide Objects", ["Col::Pl0::Plane", "Col::Pl2::Plane"]),
+        ("Center Graphics About Object(s)", None),
+    ]
+    assert sdk.executed[-1][1]["Collection Wildcard Criteria"] == "Col"
+
+
+def test_type_visibility_replaces_the_object_visibility(session, sdk):
+    with sa.batch_display():
+        sa.hide_objects("Col", "Pl1", "Plane")
+        sa.show_objects("Col", "Cyl1", "Cylinder")
+        sa.show_objects("Other", "Pl1", "Plane")
+        sa.show_hide_by_object_type("Col", "Plane", False)
+        sa.show_hide_by_object_type("Col", "Plane", True)
+    assert _steps(sdk) == [("Show / Hide by Object Type", None), ("Show Objects", ["Col::Cyl1::Cylinder", "Other::Pl1::Plane"])]
+    assert sdk.executed[0][1]["Hide? (Show = FALSE)"] is True
+
+    sdk.executed.clear()
+    with sa.batch_display():
+        sa.show_hide_by_object_type("Col", "Plane", True)
+        sa.hide_objects("Col", "Cyl1", "Cylinder")
+        sa.show_hide_by_object_type("Col", "Any", False)
+    assert [(step, args["Object Type To Show / Hide"]) for step, args in sdk.executed] == [("Show / Hide by Object Type", "Any")]
+
+
+def test_callout_views(session, sdk):
+    with sa.batch_display():
+        sa.show_hide_callout_view("Col", "View1", True)
+        sa.hide_all_callout_views()
+        sa.show_hide_callout_view("Col", "View2", True)
+        sa.show_hide_callout_view("Col", "View2", False)
+    assert [step for step, _ in sdk.executed] == ["Hide All Callout Views", "Show / Hide Callout View"]
+    assert sdk.executed[1][1]["Show Callout View?"] is False
+
+
+def test_nested_batches_join_and_recenter_once(session, sdk):
+    with sa.batch_display() as outer:
+        sa.hide_objects("Col", "Pl1", "Plane")
+        with sa.batch_display(recenter=True) as inner:
+            assert inner is outer
+            sa.hide_objects("Col", "Pl2", "Plane")
+        assert sdk.steps == 0
+    assert [step for step, _ in sdk.executed] == ["Hide Objects", "Center Graphics About Object(s)"]
+
+
+def test_failing_batch_drops_the_queued_commands(session, sdk):
+    with pytest.raises(KeyError):
+        with sa.batch_display():
+            sa.hide_objects("Col", "Pl1", "Plane")
+            raise KeyError("Pl2")
+    assert sdk.steps == 0
+    sa.hide_objects("Col", "Pl1", "Plane")
+    assert sdk.steps == 1
+
+
+def test_batch_is_per_thread(session, sdk):
+    with sa.batch_display():
+        thread = threading.Thread(target=sa.hide_objects, args=("Col", "Pl1", "Plane"))
+        thread.start()
+        thread.join()
+        assert sdk.steps == 1
+        sa.hide_objects("Col", "Pl2", "Plane")
+    assert sdk.steps == 2
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import SAPyLib as sa
+from SAPyLib.executor import SdkExecutor
+from stub_sdk import FakeNrkSdk
+
+
+class ThreadCheckingSdk(FakeNrkSdk):
+    """Stub SDK that logs the thread of every SDK call, per step."""
+
+    def __init__(self) -> None:
+        super().__init__(latency=0.0005, group_size=3)
+        self.threads = []  # (step, thread ids of its calls)
+        self._lock = threading.Lock()
+
+    def _log(self):
+        with self._lock:
+            self.threads[-1][1].add(threading.get_ident())
+
+    def SetStep(self, name):
+        with self._lock:
+            self.threads.append((name, {threading.get_ident()}))
+        super().SetStep(name)
+
+    def ExecuteStep(self):
+        self._log()
+        super().ExecuteStep()
+
+    def GetMPStepResult(self, index):
+        self._log()
+        return super().GetMPStepResult(index)
+
+    def GetVectorArg(self, name, x, y, z):
+        self._log()
+        return super().GetVectorArg(name, x, y, z)
+
+
+@pytest.fixture
+def sdk():
+    return ThreadCheckingSdk()
+
+
+def _read_points(count: int) -> list:
+    return [sa.get_point_coordinate("Col", "Grp", f"P{i}").X for i in range(count)]
+
+
+def test_transactions_are_atomic_across_threads(session, sdk):
+    with ThreadPoolExecutor(4) as pool:
+        assert [*pool.map(_read_points, [20] * 4)] == [[1.0] * 20] * 4
+    assert len(sdk.threads) == 80
+    assert all(len(threads) == 1 for _, threads in sdk.threads)
+    assert len(set().union(*(threads for _, threads in sdk.threads))) > 1
+
+
+def test_executor_runs_every_transaction_on_the_sdk_thread(session, sdk):
+    executor = session.start_executor()
+    try:
+        with ThreadPoolExecutor(4) as pool:
+            assert [*pool.map(_read_points, [10] * 4)] == [[1.0] * 10] * 4
+    finally:
+        session.stop_executor()
+    assert {thread for _, threads in sdk.threads for thread in threads} == {executor.thread_id}
+    # afterwards the transactions run on the calling thread again
+    _read_points(1)
+    assert sdk.threads[-1][1] == {threading.get_ident()}
+
+
+def test_nested_transactions_and_errors_on_the_sdk_thread(session, sdk):
+    @sa.sdk_transaction
+    def outer():
+        return (threading.get_ident(), sa.get_point_coordinate("Col", "Grp", "P1").X)
+
+    @sa.sdk_transaction
+    def failing():
+        raise KeyError("P1")
+
+    executor = session.start_executor()
+    try:
+        assert outer() == (executor.thread_id, 1.0)
+        with pytest.raises(KeyError):
+            failing()
+        assert outer()[1] == 1.0
+    finally:
+        session.stop_executor()
+    assert session.executor is None and sa._executor is None
+
+
+def test_start_executor_is_idempotent(session, sdk):
+    try:
+        assert session.start_executor() is session.start_executor()
+    finally:
+        session.stop_executor()
+    session.stop_executor()
+
+
+def test_executor_order_and_shutdown():
+    executor = SdkExecutor()
+    assert not executor.is_executor_thread()
+    assert executor.call(executor.is_executor_thread)
+    started = threading.Event()
+    release = threading.Event()
+    order = []
+
+    def blocking():
+        started.set()
+        release.wait()
+        order.append("blocking")
+
+    executor.submit(blocking)
+    futures = [executor.submit(order.append, i) for i in range(3)]
+    started.wait()
+    release.set()
+    executor.shutdown(wait=True)
+    assert order == ["blocking", 0, 1, 2] and all(future.done() for future in futures)
+    with pytest.raises(RuntimeError):
+        executor.submit(order.append, 3)
+
+
+def test_executor_cancels_pending_transactions():
+    executor = SdkExecutor()
+    release = threading.Event()
+    executor.submit(release.wait)
+    pending = executor.submit(lambda: None)
+    executor.shutdown(wait=False, cancel_pending=True)
+    release.set()
+    assert pending.cancelled()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+import pytest
+
+from SAPyLib import fitting
+
+
+def _cylinder(rng, radius: float, length: float, n: int, noise: float) -> tuple:
+    """Random points on a randomly placed cylinder, with its axis direction."""
+    axis = rng.normal(size=3)
+    axis /= np.linalg.norm(axis)
+    u = np.cross(axis, [1.0, 0.0, 0.0])
+    u /= np.linalg.norm(u)
+    v = np.cross(axis, u)
+    angle = rng.uniform(0.0, 2.0 * np.pi, n)
+    along = rng.uniform(-length / 2.0, length / 2.0, n)
+    xyz = rng.uniform(-100.0, 100.0, 3) + radius * (np.cos(angle)[:, None] * u + np.sin(angle)[:, None] * v) + along[:, None] * axis
+    return xyz + rng.normal(0.0, noise, xyz.shape), axis
+
+
+@pytest.mark.parametrize(
+    "radius, length",
+    [
+        ((5.0, 50.0), (0.05, 0.5)),  # short: length a fraction of the radius (x radius below)
+        ((20.0, 200.0), (1.0, 10.0)),  # wide
+        ((3.0, 8.0), (1.6, 2.4)),  # about as long as wide (x radius below), the principal axes are ambiguous
+        ((1.0, 10.0), (10.0, 100.0)),  # long
+    ],
+    ids=["short", "wide", "square", "long"],
+)
+def test_cylinders(radius, length):
+    rng = np.random.default_rng(19)
+    groups, axes, radii = [], [], []
+    for _ in range(100):
+        r = rng.uniform(*radius)
+        scale = r if length[0] < 5.0 else 1.0
+        xyz, axis = _cylinder(rng, r, scale * rng.uniform(*length), int(rng.integers(20, 200)), 0.01)
+        groups.append(xyz)
+        axes.append(axis)
+        radii.append(r)
+
+    fits = fitting.fit_geometries("Cylinder", groups)
+    assert all(fit["converged"] for fit in fits)
+    assert max(fit["rms"] for fit in fits) < 0.015
+    assert np.allclose([abs(fit["direction"] @ axis) for fit, axis in zip(fits, axes)], 1.0, atol=1e-3)
+    assert np.allclose([fit["radius"] for fit in fits], radii, atol=0.05)
+
+
+def test_sphere_and_circle():
+    rng = np.random.default_rng(3)
+    direction = rng.normal(size=(500, 3))
+    direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+    sphere = fitting.fit_geometry("Sphere", [1.0, 2.0, 3.0] + 10.0 * direction)
+    assert sphere["converged"]
+    assert np.allclose(sphere["center"], [1.0, 2.0, 3.0]) and np.isclose(sphere["radius"], 10.0)
+
+    angle = rng.uniform(0.0, 2.0 * np.pi, 50)
+    circle = fitting.fit_geometry("Circle", np.column_stack((5.0 * np.cos(angle), 5.0 * np.sin(angle), np.full(50, 7.0))))
+    assert circle["converged"]
+    assert np.allclose(circle["center"], [0.0, 0.0, 7.0]) and np.isclose(circle["radius"], 5.0)
+
+
+def test_plane_is_converged():
+    xyz = np.random.default_rng(0).uniform(-1.0, 1.0, (20, 3)) * [1.0, 1.0, 0.0]
+    assert fitting.fit_geometry("Plane", xyz)["converged"]
+
+
+def test_not_converged_is_reported():
+    rng = np.random.default_rng(1)
+    groups = fitting._Groups([_cylinder(rng, 10.0, 5.0, 50, 0.01)[0]])
+    centroid = groups.mean(groups.points)
+    local = groups.points - centroid
+
+    def residual(p):
+        return np.linalg.norm(local - p[:, :3], axis=1) - p[:, 3]
+
+    # a sphere fit to a cylinder, started far off, can't converge in 2 iterations
+    _, converged = fitting._gauss_newton(groups, residual, np.array([[50.0, 0.0, 0.0, 1.0]]), iterations=2)
+    assert not converged[0]
+
+
+def test_line_and_plane():
+    rng = np.random.default_rng(4)
+    direction = np.array([1.0, 2.0, 2.0]) / 3.0
+    xyz = [1.0, 1.0, 1.0] + rng.uniform(-10.0, 10.0, (30, 1)) * direction
+    line = fitting.fit_geometry("Line", xyz)
+    assert abs(line["direction"] @ direction) == pytest.approx(1.0) and line["rms"] < 1e-12
+    assert np.linalg.norm(np.cross(line["point"] - [1.0, 1.0, 1.0], direction)) < 1e-12
+
+    xyz = rng.uniform(-10.0, 10.0, (30, 3)) * [1.0, 1.0, 0.0] + [0.0, 0.0, 4.0] + rng.normal(0.0, 0.01, (30, 3)) * [0.0, 0.0, 1.0]
+    plane = fitting.fit_geometry("Plane", xyz)
+    assert abs(plane["normal"][2]) == pytest.approx(1.0, abs=1e-4) and plane["point"][2] == pytest.approx(4.0, abs=0.01)
+    np.testing.assert_allclose(plane["deviations"], fitting.deviations_to_geometry("Plane", xyz, plane))
+    assert plane["n_points"] == plane["n_used"] == 30 and not plane["out_of_tol"].any()
+
+
+def test_out_of_tolerance_points_are_refitted_without():
+    rng = np.random.default_rng(5)
+    direction = rng.normal(size=(60, 3))
+    xyz = 10.0 * direction / np.linalg.norm(direction, axis=1, keepdims=True) + rng.normal(0.0, 0.005, (60, 3))
+    xyz[:4] *= 1.1  # 1 mm outside
+    sphere = fitting.fit_geometry("Sphere", xyz, fit_tol=0.1, out_tol=True)
+    assert sphere["n_used"] == 56 and sphere["out_of_tol"][:4].all() and not sphere["out_of_tol"][4:].any()
+    assert sphere["radius"] == pytest.approx(10.0, abs=0.005) and sphere["rms"] < 0.01
+    # without out_tol the outliers are only reported
+    sphere = fitting.fit_geometry("Sphere", xyz, fit_tol=0.1)
+    assert sphere["n_used"] == 60 and sphere["rms"] > 0.1
+
+
+def test_batch_equals_single_fits():
+    rng = np.random.default_rng(6)
+    groups = [_cylinder(rng, 2.0, 20.0, n, 0.01)[0] for n in (20, 75, 300)]
+    batch = fitting.fit_geometries("Cylinder", groups)
+    for fit, xyz in zip(batch, groups):
+        single = fitting.fit_geometry("Cylinder", xyz)
+        assert fit["radius"] == pytest.approx(single["radius"]) and fit["n_points"] == len(xyz)
+        np.testing.assert_allclose(fit["deviations"], single["deviations"], atol=1e-9)
+    assert fitting.fit_geometries("Sphere", []) == []
+
+
+def test_invalid_fits():
+    with pytest.raises(ValueError):
+        fitting.fit_geometry("Torus", np.zeros((10, 3)))
+    with pytest.raises(ValueError):
+        fitting.fit_geometry("Sphere", np.zeros((3, 3)))
+    with pytest.raises(ValueError):
+        fitting.deviations_to_geometry("Torus", np.zeros((1, 3)), {})
+
+
+@pytest.fixture
+def points():
+    xyz = [0.0, 0.0, 2.0] + np.random.default_rng(7).uniform(-5.0, 5.0, (10, 3)) * [1.0, 1.0, 0.0]
+    return {("Col", "Grp", f"P{i}"): p for i, p in enumerate(xyz.tolist())}
+
+
+def test_fit_a_group_from_sa(session, sdk):
+    plane = fitting.fit_geometry_to_group("Plane", "Col", "Grp")
+    assert plane["names"] == [f"P{i}" for i in range(10)] and plane["rms"] < 1e-12
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+import SAPyLib as sa
+from stub_sdk import FakeNrkSdk, FakeTools
+
+@pytest.fixture
+def points():
+    return {}
+
+
+class CountingTools(FakeTools):
+    """Stub SA Python Tools object that creates a new wrapper per call."""
+
+    def __init__(self) -> None:
+        self.wrappers = []
+
+    def GetListWrapper(self, values):
+        self.wrappers.append([*values])
+        return self.wrappers[-1]
+
+
+@pytest.fixture
+def tools(use_stub):
+    tools = CountingTools()
+    use_stub(FakeNrkSdk(), tools)
+    return tools
+
+
+TRANSFORM = np.arange(16.0).reshape(4, 4)
+
+
+def test_arrays_without_dotnet():
+    values = np.arange(12).reshape(4, 3)
+    array = sa.numpy_to_csharp_array(values)
+    assert array.dtype == np.float64 and array.flags.c_contiguous
+    np.testing.assert_array_equal(array, values)
+    assert not np.shares_memory(array, values)
+    np.testing.assert_array_equal(sa.csharp_array_to_numpy(array), values)
+    assert sa.csharp_array_to_python_2D_list(sa.python_list_to_csharp_2D_array(TRANSFORM.ravel().tolist())) == TRANSFORM.tolist()
+    # only the first rows and columns are kept, no trailing empty row
+    assert sa.csharp_array_to_python_2D_list(TRANSFORM, (3, 2)) == TRANSFORM[:3, :2].tolist()
+
+
+@pytest.mark.parametrize("transform", [TRANSFORM, TRANSFORM.tolist(), TRANSFORM.ravel()])
+def test_transforms_accept_numpy_and_lists(session, sdk, transform):
+    sa.transform_object_by_delta_world_transform_operator([("Part", "Grp")], transform)
+    matrix, scale = sdk.executed[-1][1]["Delta Transform"]
+    np.testing.assert_array_equal(matrix, TRANSFORM)
+    sa.transform_objects_by_delta_about_working_frame([(("Part", "Grp"),)], transform)
+    np.testing.assert_array_equal(sdk.executed[-1][1]["Delta Transform"], TRANSFORM)
+
+
+@pytest.mark.parametrize("shape", [(5,), (4, 4), (2, 3, 4), (0, 3)])
+def test_dotnet_round_trip(dotnet, shape):
+    values = np.random.default_rng(1).normal(size=shape)
+    array = sa.numpy_to_csharp_array(values)
+    assert array.Rank == len(shape) and [array.GetLength(d) for d in range(len(shape))] == [*shape]
+    if values.size:
+        assert array[(0,) * len(shape)] == values[(0,) * len(shape)]
+    np.testing.assert_array_equal(sa.csharp_array_to_numpy(array), values)
+
+
+def test_dotnet_non_contiguous_input(dotnet):
+    values = np.arange(32.0).reshape(4, 8)[:, ::2]
+    np.testing.assert_array_equal(sa.csharp_array_to_numpy(sa.numpy_to_csharp_array(values)), values)
+
+
+def test_dotnet_boxed_array(dotnet):
+    # COM returns VARIANT arrays as System.Object arrays
+    boxed = sa.Array.CreateInstance(sa.System.Object, 2, 2)
+    for (i, j), value in np.ndenumerate(np.array([[1.0, 2.0], [3.0, 4.0]])):
+        boxed[i, j] = sa.System.Double(value)
+    np.testing.assert_array_equal(sa.csharp_array_to_numpy(boxed), [[1.0, 2.0], [3.0, 4.0]])
+
+
+def test_empty_list_wrapper_is_shared(tools):
+    assert sa.find_files_in_directory("C:/", "*.xit") == []
+    sa.create_relationship_callout("Part", "View", "Part", "Rel")
+    assert sa.empty_list_wrapper() is sa.empty_list_wrapper()
+    assert tools.wrappers == [[]]
+
+
+def test_empty_list_wrapper_per_session(tools, use_stub):
+    first = sa.empty_list_wrapper()
+    other = CountingTools()
+    use_stub(FakeNrkSdk(), other)
+    assert sa.empty_list_wrapper() is not first and other.wrappers == [[]]
+
+
+def test_list_from_iterable():
+    assert sa.csharp_list_from_iterable(name for name in ("A", "B")) == ["A", "B"]
+    assert sa.python_list_to_csharp_list([]) == []
+
+
+def test_dotnet_list_from_iterable(dotnet):
+    values = sa.csharp_list_from_iterable(f"P{i}" for i in range(1000))
+    assert isinstance(values, sa.List[sa.String]) and values.Count == 1000 and values[999] == "P999"
+    assert sa.csharp_list_from_iterable(()).Count == 0
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import SAPyLib as sa
+from SAPyLib.orchestrator import Orchestrator
+from stub_sdk import FakeJobSdk
+
+
+class MeasuringSdk(FakeJobSdk):
+    """Stub SDK with instruments that measure a target in the background.
+
+    A started measurement is observed after 'polls[name]' checks of its observation (never when None).
+    Pointing at an 'unreachable' target and starting a 'refused' measurement fail. The measurement of an 'aborted'
+    target is never observed, its instrument loses the target.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.polls = {}
+        self.unreachable = set()
+        self.refused = set()
+        self.aborted = set()
+        self.measuring = {}  # (collection, group, name) -> remaining checks
+        self.targets = {}  # instrument -> the target it measures
+        self.locked = True
+
+    def _point_at_target(self, args):
+        return args["Target ID"][2] not in self.unreachable
+
+    def _configure_and_measure(self, args):
+        target = args["Target Name"]
+        if target[2] in self.refused:
+            return False
+        assert args["Wait for Completion"] is False
+        self.measuring[target] = None if target[2] in self.aborted else self.polls.get(target[2], 0)
+        self.targets[args["Instrument's ID"]] = target
+
+    def _get_observation_info(self, args):
+        target = args["Point Name"]
+        if target not in self.measuring or target in self.points:
+            return target in self.measuring
+        remaining = self.measuring[target]
+        if remaining is None or remaining > 0:
+            self.measuring[target] = None if remaining is None else remaining - 1
+            return False
+        self.points[target] = (0.0, 0.0, 0.0)
+        self.output = (0.0, 0.0, 0.0)
+
+    def _get_instrument_target_status(self, args):
+        self.locked = self.targets[args["Instrument's ID"]][2] not in self.aborted
+
+    def GetBoolArg(self, name, default):
+        return (True, self.locked) if name == "Is Locked?" else super().GetBoolArg(name, default)
+
+    def transactions(self) -> list[tuple[str, str]]:
+        """The (step, measured group) of the measurement starts and observation checks, in order."""
+        keys = {"Configure and Measure": "Target Name", "Get Observation Info": "Point Name"}
+        return [(step, args[keys[step]][1]) for step, args in self.executed if step in keys]
+
+
+@pytest.fixture
+def sdk():
+    return MeasuringSdk()
+
+
+STRATEGY = sa.WaitStrategy(poll_interval=0.001, backoff=1.0, max_interval=0.001, deadline=5.0)
+
+
+def _targets(*names) -> list:
+    return [sa.NamedPoint(["Part", "Nom", name]) for name in names]
+
+
+def _orchestrator(**kwargs) -> Orchestrator:
+    orchestrator = Orchestrator(STRATEGY, **kwargs)
+    orchestrator.add_instrument("Inst", 0, _targets("A1", "A2", "A3"), "Part", "Meas 0", "Fast")
+    orchestrator.add_instrument("Inst", 1, _targets("B1", "B2"), "Part", "Meas 1", "Fast")
+    return orchestrator
+
+
+def test_round_robin_overlaps_the_measurements(session, sdk):
+    sdk.polls = {"A1": 3, "A2": 3, "A3": 3, "B1": 4, "B2": 4}
+    records = _orchestrator().run()
+
+    assert [[r.name for r in records["Inst", i]] for i in (0, 1)] == [["A1", "A2", "A3"], ["B1", "B2"]]
+    assert all(r.ok and r.error is None and r.data["observation"] for rs in records.values() for r in rs)
+    transactions = sdk.transactions()
+    # both measure at once: B1 is started before A1 is observed, and the instruments alternate while both measure
+    assert transactions[:3] == [("Configure and Measure", "Meas 0"), ("Configure and Measure", "Meas 1"), ("Get Observation Info", "Meas 0")]
+    last_b = max(i for i, (_, group) in enumerate(transactions) if group == "Meas 1")
+    groups = [group for _, group in transactions[: last_b + 1]]
+    assert all(a != b for a, b in zip(groups, groups[1:]))
+    # every measurement is observed once after its polls, a finished instrument takes no more steps
+    assert transactions.count(("Get Observation Info", "Meas 0")) == 3 * 4
+    assert transactions.count(("Get Observation Info", "Meas 1")) == 2 * 5
+
+
+def test_statistics(session):
+    orchestrator = _orchestrator()
+    orchestrator.run()
+    statistics = orchestrator.statistics
+    assert (statistics["instruments"], statistics["measured"], statistics["failed"]) == (2, 5, 0)
+    assert statistics["sdk_steps"] == 2 * 5
+    assert set(statistics["busy"]) == {("Inst", 0), ("Inst", 1)}
+
+
+def test_failures_are_recorded_and_the_instrument_goes_on(session, sdk):
+    sdk.unreachable, sdk.refused = {"A1"}, {"B1"}
+    orchestrator = _orchestrator()
+    records = orchestrator.run()
+
+    a1, b1 = records["Inst", 0][0], records["Inst", 1][0]
+    assert isinstance(a1.error, SystemError) and not a1.ok
+    assert isinstance(b1.error, SystemError) and "could not be started" in str(b1.error)
+    assert all(r.ok for r in records["Inst", 0][1:] + records["Inst", 1][1:])
+    assert (orchestrator.statistics["measured"], orchestrator.statistics["failed"]) == (3, 2)
+
+
+def test_deadline_times_out_a_measurement(session, sdk):
+    sdk.polls = {"A2": None}
+    orchestrator = _orchestrator()
+    orchestrator.strategy = sa.WaitStrategy(poll_interval=0.001, backoff=1.0, max_interval=0.001, deadline=0.05)
+    records = orchestrator.run()
+
+    a2 = records["Inst", 0][1]
+    assert isinstance(a2.error, TimeoutError) and not a2.ok and "observation" not in a2.data
+    assert records["Inst", 0][2].ok
+    assert (orchestrator.statistics["measured"], orchestrator.statistics["failed"]) == (4, 1)
+
+
+def test_aborted_measurement_fails_right_away(session, sdk):
+    sdk.aborted = {"A2"}
+    orchestrator = _orchestrator()
+    orchestrator.strategy = sa.WaitStrategy(poll_interval=0.001, backoff=1.0, max_interval=0.001, deadline=60.0)
+    records = orchestrator.run()
+
+    a2 = records["Inst", 0][1]
+    assert isinstance(a2.error, SystemError) and "lost the target" in str(a2.error) and not a2.ok
+    assert sdk.transactions().count(("Get Observation Info", "Meas 0")) == 3
+    assert records["Inst", 0][2].ok
+    assert orchestrator.statistics["elapsed"] < 1.0
+    assert (orchestrator.statistics["measured"], orchestrator.statistics["failed"]) == (4, 1)
+
+
+def test_aborted_measurement_without_status_check_times_out(session, sdk):
+    sdk.aborted = {"B1"}
+    orchestrator = Orchestrator(sa.WaitStrategy(poll_interval=0.001, backoff=1.0, max_interval=0.001, deadline=0.05))
+    orchestrator.add_instrument("Inst", 1, _targets("B1", "B2"), "Part", "Meas 1", "Fast", check_status=False)
+    records = orchestrator.run()
+
+    assert isinstance(records["Inst", 1][0].error, TimeoutError) and records["Inst", 1][1].ok
+    assert "Get Instrument Target Status" not in [step for step, _ in sdk.executed]
+
+
+def test_failing_status_check_fails_the_measurement(session, sdk, monkeypatch):
+    def fail(args):
+        raise SystemError("Execution raised: SDKERROR!")
+
+    sdk.polls = {"A1": 1}
+    monkeypatch.setattr(sdk, "_get_instrument_target_status", fail)
+    orchestrator = _orchestrator()
+    records = orchestrator.run()
+    assert isinstance(records["Inst", 0][0].error, SystemError)
+    assert all(r.ok for r in records["Inst", 0][1:] + records["Inst", 1])
+
+
+def test_run_finishes_every_job_on_the_sdk_thread(session, sdk):
+    sdk.polls = {"A1": 2, "B2": 5}
+    measured = []
+    orchestrator = _orchestrator(on_measured=measured.append)
+    session.start_executor()
+    try:
+        records = orchestrator.run()
+    finally:
+        session.stop_executor()
+
+    assert all(job.done and job.current is None for job in orchestrator.jobs)
+    assert sorted(r.name for r in measured) == ["A1", "A2", "A3", "B1", "B2"]
+    assert all(r.acquired is not None for rs in records.values() for r in rs)
+
+
+def test_duplicate_instrument():
+    orchestrator = _orchestrator()
+    with pytest.raises(ValueError):
+        orchestrator.add_instrument("Inst", 1, _targets("C1"), "Part", "Meas 2", "Fast")
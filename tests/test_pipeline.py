@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import SAPyLib as sa
+from SAPyLib.pipeline import JsonLinesLog, MeasurePipeline, fetch_coordinate, tolerance_check
+from stub_sdk import FakeJobSdk
+
+NOMINALS = sa.PointSet("Part", "Nom", ["P0", "P1", "P2", "P3", "P4", "P5"], np.arange(18.0).reshape(6, 3))
+
+
+class MeasuringSdk(FakeJobSdk):
+    """Stub SDK whose instrument measures a target at its nominal plus 'offsets[name]', 'refused' targets fail."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.offsets = {}
+        self.refused = set()
+
+    def _configure_and_measure(self, args):
+        collection, group, name = args["Target Name"]
+        if name in self.refused:
+            return False
+        self.points[collection, group, name] = tuple(NOMINALS.xyz[NOMINALS.index(name)] + self.offsets.get(name, 0.0))
+
+
+@pytest.fixture
+def sdk():
+    return MeasuringSdk()
+
+
+def _pipeline(stages, **kwargs) -> MeasurePipeline:
+    return MeasurePipeline("Inst", 0, "Part", "Meas", "Fast", stages, **kwargs)
+
+
+def test_measure_and_process(session, sdk):
+    sdk.offsets = {"P2": 0.5}
+    records = _pipeline([fetch_coordinate, tolerance_check(NOMINALS, 0.1)]).run(NOMINALS)
+
+    assert [r.name for r in records] == NOMINALS.names.tolist()
+    assert all(r.ok and r.error is None and r.processed is not None for r in records)
+    assert [r.data["in_tolerance"] for r in records] == [True, True, False, True, True, True]
+    assert records[2].data["deviation"] == pytest.approx(np.sqrt(3 * 0.25))
+    # the point-at and the measurement of a target are one transaction, no fetch of the workers comes in between
+    steps = [step for step, _ in sdk.executed]
+    for i, step in enumerate(steps):
+        if step == "Point At Target":
+            assert steps[i + 1] == "Configure and Measure"
+    assert steps.count("Get Point Coordinate") == len(NOMINALS)
+
+
+def test_failing_stage_and_target(session, sdk):
+    sdk.refused = {"P1"}
+
+    def stage(record):
+        if record.name == "P3":
+            raise KeyError("P3")
+        record.data["seen"] = True
+
+    pipeline = _pipeline([stage])
+    records = pipeline.run(NOMINALS)
+    assert not records[1].ok and records[1].processed is None and "seen" not in records[1].data
+    assert isinstance(records[1].error, SystemError)
+    assert isinstance(records[3].error, KeyError) and records[3].ok and records[3].processed is not None
+    assert all(r.data["seen"] for r in records if r.name not in ("P1", "P3"))
+    statistics = pipeline.statistics
+    assert (statistics["targets"], statistics["measured"]) == (6, 5)
+    assert (statistics["acquisition_failed"], statistics["processing_failed"]) == (1, 1)
+
+
+def test_stop_on_error(session, sdk):
+    sdk.refused = {"P2"}
+    records = _pipeline([fetch_coordinate]).run(NOMINALS, stop_on_error=True)
+    assert [r.name for r in records] == ["P0", "P1", "P2"]
+    assert [r.ok for r in records] == [True, True, False]
+    assert all("xyz" in r.data for r in records[:2])
+
+
+def test_bounded_queue_holds_back_the_acquisition(session, sdk):
+    def slow(record):
+        time.sleep(0.01)
+
+    pipeline = _pipeline([slow], workers=1, queue_size=2)
+    records = pipeline.run(NOMINALS)
+    assert all(r.processed is not None for r in records)
+    assert 0 < pipeline.statistics["max_backlog"] <= 2
+    # the last records are processed after the acquisition finished
+    assert pipeline.statistics["processing_tail"] > 0.0
+
+
+def test_shutdown_stops_the_workers_and_its_own_sdk_thread(session, sdk):
+    threads = threading.active_count()
+    _pipeline([fetch_coordinate], workers=3).run(NOMINALS)
+    assert session.executor is None
+    assert threading.active_count() == threads
+
+    executor = session.start_executor()
+    _pipeline([fetch_coordinate]).run(NOMINALS)
+    assert session.executor is executor
+
+
+def test_shutdown_after_a_failing_acquisition(session, sdk, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("Connection lost")
+
+    monkeypatch.setattr(sa.pipeline, "_acquire", fail)
+    threads = threading.active_count()
+    pipeline = _pipeline([fetch_coordinate])
+    records = pipeline.run(NOMINALS, stop_on_error=True)
+    assert [type(r.error) for r in records] == [RuntimeError]
+    assert (pipeline.statistics["acquisition_failed"], pipeline.statistics["processing_failed"]) == (1, 0)
+    assert session.executor is None
+    assert threading.active_count() == threads
+
+
+def test_json_lines_log(session, sdk, tmp_path):
+    path = str(tmp_path / "measured.jsonl")
+    with JsonLinesLog(path) as log:
+        _pipeline([fetch_coordinate, log], workers=2).run(NOMINALS[:3])
+    lines = sorted((json.loads(line) for line in open(path, encoding="utf-8")), key=lambda line: line["index"])
+    assert [line["point"] for line in lines] == ["Part::Meas::P0", "Part::Meas::P1", "Part::Meas::P2"]
+    assert lines[1]["nominal"] == "Part::Nom::P1" and lines[1]["xyz"] == [3.0, 4.0, 5.0]
+
+
+def test_invalid_pipeline():
+    with pytest.raises(ValueError):
+        _pipeline([], workers=0)
+    with pytest.raises(ValueError):
+        _pipeline([], queue_size=0)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+import SAPyLib as sa
+
+
+def _points() -> sa.PointSet:
+    return sa.PointSet("Col", ["G1", "G1", "G2"], ["P1", "P2", "P1"], [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [2.0, 0.0, 0.0]])
+
+
+@pytest.fixture
+def points():
+    return {("Col", "Grp", f"P{i}"): (float(i), 0.0, 0.0) for i in range(3)}
+
+
+def test_columns_and_coordinates():
+    points = _points()
+    assert len(points) == 3 and points.xyz.dtype == np.float64
+    assert points.collections.tolist() == ["Col"] * 3 and points.groups.tolist() == ["G1", "G1", "G2"]
+    # the few distinct collection and group strings are stored once
+    assert points.collections[0] is points.collections[2] and points.groups[0] is points.groups[1]
+    assert np.isnan(sa.PointSet("Col", "Grp", ["A", "B"]).xyz).all()
+    with pytest.raises(ValueError):
+        sa.PointSet("Col", "Grp", ["A", "B"], np.zeros((3, 3)))
+    with pytest.raises(ValueError):
+        sa.PointSet("Col", ["G1"], ["A", "B"])
+
+
+def test_views_read_and_write_their_row():
+    points = _points()
+    view = points[-1]
+    assert (view.collection, view.group, view.name, view.X, view.ref) == ("Col", "G2", "P1", 2.0, "Col::G2::P1")
+    view.Z = 5.0
+    assert points.xyz[2, 2] == 5.0
+    assert [p.name for p in points] == ["P1", "P2", "P1"]
+    with pytest.raises(IndexError):
+        points[3]
+
+
+def test_slices_share_and_masks_copy():
+    points = _points()
+    first = points[:2]
+    first.xyz[0, 1] = 7.0
+    assert points.xyz[0, 1] == 7.0
+    selected = points[points.xyz[:, 0] > 0.5]
+    selected.xyz[:] = 0.0
+    assert selected.names.tolist() == ["P2", "P1"] and points.xyz[1, 0] == 1.0
+    assert points[np.array([2, 0])].refs() == ["Col::G2::P1", "Col::G1::P1"]
+
+
+def test_index():
+    points = _points()
+    assert points.index("P1") == 0 and points.index("P1", "Col", "G2") == 2
+    assert points.index("P3") is None and points.index("P2", "Col", "G2") is None
+    assert "P2" in points and "P3" not in points
+
+
+def test_from_refs_and_points():
+    points = sa.PointSet.from_refs(["Col::G1::P1", "Col::G2::P2"], [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])
+    assert points.refs() == ["Col::G1::P1", "Col::G2::P2"] and points[1].Y == 5.0
+    assert len(sa.PointSet.from_refs([])) == 0
+    with pytest.raises(ValueError):
+        sa.PointSet.from_refs(["Col::P1"])
+    named = sa.PointSet.from_points([sa.NamedPoint(["Col", "G1", "P1"]), sa.NamedPoint3D(["Col", "G1", "P2"], [1.0, 2.0, 3.0])])
+    assert named.refs() == ["Col::G1::P1", "Col::G1::P2"]
+    assert np.isnan(named.xyz[0]).all() and named.xyz[1].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_point_sets_of_a_group(session, sdk):
+    names = sa.make_a_point_set_from_a_group("Col", "Grp")
+    assert names.names.tolist() == ["P0", "P1", "P2"] and np.isnan(names.xyz).all()
+    points = sa.get_group_point_set("Col", "Grp")
+    assert points.refs() == names.refs()
+    np.testing.assert_array_equal(points.xyz[:, 0], [0.0, 1.0, 2.0])
+    assert len(sa.make_a_point_set_from_a_group("Col", "Empty")) == 0
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+import SAPyLib as sa
+from SAPyLib.profiler import StepProfiler
+from stub_sdk import FakeNrkSdk, FakeTools
+
+LATENCY = 0.002
+
+
+@pytest.fixture
+def sdk():
+    return FakeNrkSdk(latency=LATENCY, group_size=3)
+
+
+def test_steps_are_recorded_per_mp_command(session, sdk):
+    with sa.profiling() as profiler:
+        sa.get_point_coordinate("Col", "Grp", "P1")
+        sa.get_point_coordinate("Col", "Grp", "P2")
+        sa.make_a_point_name_ref_list_from_a_group("Col", "Grp")
+
+    assert [step.command for step in profiler.steps] == ["Get Point Coordinate"] * 2 + ["Make a Point Name Ref List From a Group"]
+    step = profiler.steps[0]
+    assert [method for method, _, _, _ in step.calls] == ["SetStep", "SetPointNameArg", "ExecuteStep", "GetMPStepResult", "GetVectorArg"]
+    assert [phase for _, phase, _, _ in step.calls] == ["marshal", "marshal", "execute", "fetch", "fetch"]
+    assert step.execute >= LATENCY and step.execute < step.wall
+    assert step.wall == pytest.approx(step.marshal + step.execute + step.fetch + step.python)
+    # the SA Python Tools calls are argument marshalling
+    assert "GetListWrapper" in [method for method, phase, _, _ in profiler.steps[2].calls if phase == "marshal"]
+
+
+def test_no_instrumentation_when_off(session, sdk):
+    with sa.profiling():
+        assert sa.NrkSdk is not sdk
+    assert sa.NrkSdk is sdk and isinstance(sa.sa_py_tools, FakeTools)
+    assert session.profiler is None
+
+
+def test_nested_profiling_restores_the_outer_profiler(session, sdk):
+    with sa.profiling() as outer:
+        with sa.profiling() as inner:
+            sa.get_point_coordinate("Col", "Grp", "P1")
+        assert session.profiler is outer
+        sa.get_point_coordinate("Col", "Grp", "P1")
+    assert (len(inner.steps), len(outer.steps)) == (1, 1)
+
+
+def test_summary(session, sdk):
+    with sa.profiling() as profiler:
+        for _ in range(3):
+            sa.get_point_coordinate("Col", "Grp", "P1")
+        sa.make_a_point_name_ref_list_from_a_group("Col", "Grp")
+
+    summary = profiler.summary()
+    assert [(entry["command"], entry["count"]) for entry in summary] == [("Get Point Coordinate", 3), ("Make a Point Name Ref List From a Group", 1)]
+    assert summary[0]["mean"] == pytest.approx(summary[0]["wall"] / 3)
+    assert summary[0]["max"] <= summary[0]["wall"]
+    assert len(profiler.summary(top=1)) == 1
+    table = profiler.summary_table().splitlines()
+    assert table[0].split()[:2] == ["MP", "command"] and table[2].startswith("Get Point Coordinate")
+    profiler.clear()
+    assert profiler.steps == [] and profiler.summary() == []
+
+
+def test_chrome_trace(session, sdk, tmp_path):
+    with sa.profiling() as profiler:
+        sa.get_point_coordinate("Col", "Grp", "P1")
+    path = tmp_path / "trace.json"
+    profiler.export_chrome_trace(str(path))
+    trace = json.loads(path.read_text())
+    events = trace["traceEvents"]
+    assert [(event["name"], event["cat"]) for event in events[:3]] == [("Get Point Coordinate", "step"), ("SetStep", "marshal"), ("SetPointNameArg", "marshal")]
+    assert all(event["ph"] == "X" and event["dur"] >= 0.0 for event in events)
+    step = events[0]
+    assert all(step["ts"] <= event["ts"] and event["ts"] + event["dur"] <= step["ts"] + step["dur"] + 1e-3 for event in events[1:])
+
+
+def test_calls_outside_a_step():
+    profiler = StepProfiler()
+    sdk = profiler.wrap(FakeNrkSdk())
+    assert sdk.ConnectEx("127.0.0.1", 0) == (True, 0)
+    assert [step.command for step in profiler.steps] == ["<ConnectEx>"]
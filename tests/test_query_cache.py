@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+import time
+
+import pytest
+
+import SAPyLib as sa
+from SAPyLib.cache import QueryCache
+from SAPyLib.snapshot import snapshot_job
+
+# every kind of job change, made in collection "Col" (or in any collection)
+CHANGES = {
+    "construct point": lambda: sa.construct_a_point_in_working_coordinates("Col", "Grp", "P", 0.0, 0.0, 0.0),
+    "construct points": lambda: sa.construct_points("Col", "Grp", ["P1", "P2"], [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]]),
+    "construct plane": lambda: sa.construct_plane("Col", "Pl"),
+    "construct line": lambda: sa.construct_line_2_points("Col", "Ln", "Col", "Grp", "P1", "Col", "Grp", "P2"),
+    "construct intersection": lambda: sa.construct_point_at_intersection_of_plane_and_line("Col", "Pl", "Col", "Ln", "Col", "Grp", "X"),
+    "construct frame": lambda: sa.construct_frame_known_origin_object_direction_object_direction(
+        "Col", "Grp", "P1", 0.0, 0.0, 0.0, "Col", "Ln", "+X Axis", "Col", "Pl", "+Z Axis", "Col", "Frame"
+    ),
+    "construct from surface faces": lambda: sa.construct_objects_from_surface_faces_runtime_select("Plane"),
+    "fit geometry": lambda: sa.fit_geometry_to_point_group("Plane", "Col", "Grp", "Col", "Fit", "", False, -1.0, False),
+    "point to point relationship": lambda: sa.make_point_to_point_relationship("Col", "Rel", "Col", "Grp", "P1", "Col", "Grp", "P2"),
+    "group to nominal group relationship": lambda: sa.make_group_to_nominal_group_relationship("Col", "Rel", "Col", "Nom", "Col", "Act"),
+    "geometry fit relationship": lambda: sa.make_geometry_fit_and_compare_to_nominal_relationship(
+        "Col", "Rel", "Col", "Pl", [("Col", "Grp")], "Col", "Fit"
+    ),
+    "relationship callout": lambda: sa.create_relationship_callout("Col", "View", "Col", "Rel"),
+    "text callout": lambda: sa.create_text_callout("Col", "View", "Text"),
+    "delete callout view": lambda: sa.delete_callout_view("Col", "View"),
+    "add instrument": lambda: sa.add_new_instrument("Leica AT960/930"),
+    "configure and measure": lambda: sa.configure_and_measure("Col", 0, "Col", "Grp", "P", "Default", True, True, 0),
+    "measure": lambda: sa.measure("Col", 0),
+    "measure single point here": lambda: sa.measure_single_point_here("Col", 0, "Col", "Grp", "P"),
+    "auto measure points": lambda: sa.auto_measure_points("Col", 0, "Col", "Nom", "Col", "Act"),
+    "auto correspond closest point": lambda: sa.auto_correspond_closest_point("Col", 0, "Col", "Nom", "Col", "Act"),
+    "auto correspond with proximity trigger": lambda: sa.auto_correspond_with_proximity_trigger("Col", 0, "Col", "Nom", "Col", "Act", 1.0),
+    "move observation": lambda: sa.move_measurement_observation("Col", "Grp", "P1", 0, "Col", "Grp", "P2"),
+    "rename point": lambda: sa.rename_point("Col", "Grp", "P1", "Col", "Grp", "Q1"),
+    "rename points": lambda: sa.rename_points([("Col", "Grp", "P1", "Col", "Grp", "Q1")]),
+    "rename object": lambda: sa.rename_object("Col", "Pl", "Col", "Plane"),
+    "rename collection": lambda: sa.rename_collection("Col", "Other"),
+    "delete points": lambda: sa.delete_points("Col", "Grp", "P1"),
+    "delete point list": lambda: sa.delete_point_list([sa.NamedPoint(["Col", "Grp", "P1"])]),
+    "delete objects": lambda: sa.delete_objects("Col", "Pl", "Plane"),
+    "delete object list": lambda: sa.delete_object_list([("Col", "Pl", "Plane")]),
+    "delete items": lambda: sa.delete_items(),
+    "delete relationship": lambda: sa.delete_relationship("Col", "Rel"),
+    "delete collection": lambda: sa.delete_collection("Col"),
+    "delete folder": lambda: sa.delete_folder("Folder"),
+}
+
+QUERIES = {
+    "group points": lambda: sa.make_a_point_name_ref_list_from_a_group("Col", "Grp"),
+    "wildcard objects": lambda: sa.make_a_collection_object_name_ref_list_wildcard_selection("*", "*", "Plane"),
+    "job snapshot": lambda: snapshot_job(),
+}
+
+
+@pytest.fixture
+def cache(session):
+    return sa.enable_query_cache()
+
+
+@pytest.mark.parametrize("query", QUERIES.values(), ids=QUERIES.keys())
+def test_query_is_cached(cache, sdk, query):
+    query()
+    steps = sdk.steps
+    query()
+    assert sdk.steps == steps
+
+
+@pytest.mark.parametrize("query", QUERIES.values(), ids=QUERIES.keys())
+@pytest.mark.parametrize("change", CHANGES.values(), ids=CHANGES.keys())
+def test_change_invalidates_query(cache, sdk, change, query):
+    query()
+    change()
+    steps = sdk.steps
+    query()
+    assert sdk.steps > steps
+
+
+def test_step_handle_invalidates_when_finished(cache, sdk):
+    """The measured point appears when the step is finished, after the wrapper returned."""
+    handle = sa.measure("Col", 0, handle=True)
+    cache.put("objects of Col", [], frozenset({"objects:Col"}))
+    handle.wait()
+    assert cache.get("objects of Col") == (False, None)
+
+
+def test_change_keeps_the_queries_of_other_collections(cache, sdk):
+    sa.make_a_point_name_ref_list_from_a_group("Other", "Grp")
+    sa.make_a_point_name_ref_list_from_a_group("Col", "Grp")
+    sa.rename_point("Col", "Grp", "P1", "Col", "Grp", "Q1")
+    steps = sdk.steps
+    sa.make_a_point_name_ref_list_from_a_group("Other", "Grp")
+    assert sdk.steps == steps
+    sa.make_a_point_name_ref_list_from_a_group("Col", "Grp")
+    assert sdk.steps == steps + 1
+
+
+def test_result_fetched_during_an_invalidation_is_not_cached(cache, sdk):
+    fetches = []
+
+    @sa.cached_query("objects:{collection}")
+    def query(collection):
+        fetches.append(collection)
+        if len(fetches) == 1:
+            # another thread changes the collection while the query is fetched
+            sa.rename_point("Col", "Grp", "P1", "Col", "Grp", "Q1")
+        return ["before" if len(fetches) == 1 else "after"]
+
+    assert query("Col") == ["before"]
+    assert query("Col") == ["after"]
+    assert query("Col") == ["after"]
+    assert fetches == ["Col", "Col"]
+
+
+def test_cached_results_can_not_be_modified(cache, sdk):
+    points = sa.make_a_point_name_ref_list_from_a_group("Col", "Grp")
+    points[0].name = "Changed"
+    points.pop()
+    objects = sa.make_a_collection_object_name_ref_list_wildcard_selection("*", "*", "Plane")
+    objects[0][1] = "Changed"
+    steps = sdk.steps
+    assert [p.name for p in sa.make_a_point_name_ref_list_from_a_group("Col", "Grp")][:2] == ["P0", "P1"]
+    assert len(sa.make_a_point_name_ref_list_from_a_group("Col", "Grp")) == len(sdk.group)
+    assert sa.make_a_collection_object_name_ref_list_wildcard_selection("*", "*", "Plane")[0][1] == "Grp"
+    assert sdk.steps == steps
+
+
+def test_put_after_an_invalidation_is_dropped():
+    cache = QueryCache()
+    generation = cache.generation
+    cache.invalidate({"objects:Col"})
+    assert not cache.put("a", 1, frozenset({"objects:Other"}), generation)
+    assert cache.get("a") == (False, None)
+    assert cache.put("a", 1, frozenset(), cache.generation)
+    assert cache.get("a") == (True, 1)
+
+
+def test_lru_eviction():
+    cache = QueryCache(maxsize=2)
+    cache.put("a", 1, frozenset())
+    cache.put("b", 2, frozenset())
+    assert cache.get("a") == (True, 1)
+    cache.put("c", 3, frozenset())
+    assert (cache.get("b"), cache.get("a"), cache.get("c")) == ((False, None), (True, 1), (True, 3))
+    assert (len(cache), cache.hits, cache.misses) == (2, 3, 1)
+    with pytest.raises(ValueError):
+        QueryCache(maxsize=0)
+
+
+def test_ttl_expiry():
+    cache = QueryCache(ttl=0.01)
+    cache.put("a", 1, frozenset())
+    assert cache.get("a") == (True, 1)
+    time.sleep(0.02)
+    assert cache.get("a") == (False, None) and len(cache) == 0
+
+
+def test_tag_invalidation():
+    cache = QueryCache()
+    cache.put("col", 1, frozenset({"objects", "objects:Col"}))
+    cache.put("other", 2, frozenset({"objects:Other"}))
+    cache.put("collections", 3, frozenset({"collections"}))
+    assert cache.invalidate({"objects:Col"}) == 1
+    assert cache.invalidate({"objects:*"}) == 1
+    assert (cache.get("other"), cache.get("collections")) == ((False, None), (True, 3))
+    cache.clear()
+    assert len(cache) == 0
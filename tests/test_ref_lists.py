@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import SAPyLib as sa
+
+REFS = ["Col::Grp::P1", "Col::Grp::P2", "Other::Grp::P1"]
+
+
+def test_ref_list_columns():
+    collections, groups, names = sa.ref_list_columns(REFS)
+    assert (collections, groups, names) == (["Col", "Col", "Other"], ["Grp"] * 3, ["P1", "P2", "P1"])
+    # the collections and groups are interned, few distinct strings
+    assert collections[0] is collections[1] and groups[0] is groups[2]
+    assert sa.ref_list_columns([]) == ([], [], [])
+    assert sa.ref_list_columns(["Col::Pl1", "Col::Pl2"], 2) == (["Col", "Col"], ["Pl1", "Pl2"])
+
+
+def test_names_containing_the_separator():
+    assert sa.ref_list_columns(["Col::Grp::a::b", "Col::Grp::P2"]) == (["Col", "Col"], ["Grp", "Grp"], ["a::b", "P2"])
+    with pytest.raises(ValueError):
+        sa.ref_list_columns(["Col::Grp::P1", "Col::P2"])
+
+
+def test_point_set_from_ref_list():
+    points = sa.point_set_from_ref_list(REFS)
+    assert points.refs() == REFS and len(points) == 3
+    assert sa.split_ref_list(["Col::Pl1::Plane"]) == [["Col", "Pl1", "Plane"]]
+    assert sa.csharp_string_array_to_list(("A", "B")) == ["A", "B"]
+
+
+def test_dotnet_ref_lists(dotnet):
+    refs = sa.Array[sa.String](REFS)
+    assert sa.ref_list_columns(refs) == (["Col", "Col", "Other"], ["Grp"] * 3, ["P1", "P2", "P1"])
+    assert sa.csharp_string_array_to_list(refs) == REFS
+    assert sa.csharp_string_array_to_list(sa.Array[sa.String]([])) == []
+    # strings containing the separators fall back to one indexer call per entry
+    odd = sa.Array[sa.String](["Col::Grp::a::b", "x\x1fy"])
+    assert sa.csharp_string_array_to_list(odd) == ["Col::Grp::a::b", "x\x1fy"]
+    assert sa.ref_list_columns(sa.Array[sa.String](["Col::Grp::a::b"])) == (["Col"], ["Grp"], ["a::b"])
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+import pytest
+
+import SAPyLib as sa
+from SAPyLib.fitting import deviations_to_geometries, deviations_to_geometry
+from SAPyLib.robust import REJECT_CONSENSUS, REJECT_INVALID, REJECT_TRIMMED
+
+
+def _sphere_points(count: int, outliers: int) -> dict:
+    rng = np.random.default_rng(20)
+    direction = rng.normal(size=(count, 3))
+    direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+    xyz = [10.0, 0.0, 0.0] + 5.0 * direction + rng.normal(0.0, 0.005, (count, 3))
+    xyz[:outliers] += 2.0 * direction[:outliers]
+    return {("Scan", "SMR", f"P{i}"): p for i, p in enumerate(xyz.tolist())}
+
+
+def _plane_points(count: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.uniform(-10.0, 10.0, (count, 2)), rng.normal(0.0, 0.01, count)])
+
+
+def test_ransac_rejects_the_outliers_outside_the_consensus():
+    xyz = _plane_points(50, 1)
+    xyz[[3, 17, 30], 2] += [1.0, -2.0, 5.0]
+    result = sa.robust_fit("Plane", xyz, threshold=0.1, seed=0)
+    rejected = [(index, reason) for index, _, reason, _ in result["rejected"]]
+    assert rejected == [(3, REJECT_CONSENSUS), (17, REJECT_CONSENSUS), (30, REJECT_CONSENSUS)]
+    assert np.count_nonzero(result["inliers"]) == 47
+    assert abs(result["fit"]["normal"][2]) == pytest.approx(1.0, abs=1e-3)
+    assert result["rejected"][1][3] == pytest.approx(-2.0, abs=0.05)
+
+
+def test_trimming_rejects_the_outliers_within_the_threshold():
+    xyz = _plane_points(100, 2)
+    xyz[5, 2] += 0.2
+    result = sa.robust_fit("Plane", xyz, threshold=0.5, seed=0)
+    assert (5, "5", REJECT_TRIMMED) in [tuple(rejected[:3]) for rejected in result["rejected"]]
+    assert not result["inliers"][5]
+    assert result["fit"]["deviations"][5] == pytest.approx(0.2, abs=0.05)
+
+
+def test_invalid_coordinates_are_rejected_by_name():
+    xyz = _plane_points(20, 3)
+    xyz[4] = np.nan
+    names = [f"P{i}" for i in range(20)]
+    result = sa.robust_fit("Plane", xyz, threshold=0.1, names=names, seed=0)
+    assert (4, "P4", REJECT_INVALID) in [tuple(rejected[:3]) for rejected in result["rejected"]]
+    assert np.isnan(result["fit"]["deviations"][4])
+    assert not result["inliers"][4]
+
+
+def test_invalid_robust_fits():
+    with pytest.raises(ValueError):
+        sa.robust_fit("Cone", _plane_points(20, 4), threshold=0.1)
+    with pytest.raises(ValueError):
+        sa.robust_fit("Plane", _plane_points(2, 4), threshold=0.1)
+
+
+def test_robust_fit_many_equals_the_single_fits():
+    groups = [_plane_points(30, seed) for seed in range(5)]
+    for xyz in groups:
+        xyz[0, 2] += 3.0
+    names = [[f"G{g}P{i}" for i in range(30)] for g in range(5)]
+    results = sa.robust_fit_many("Plane", groups, 0.1, max_workers=3, names=names, seed=7)
+    for xyz, group_names, result in zip(groups, names, results):
+        single = sa.robust_fit("Plane", xyz, 0.1, names=group_names, seed=7)
+        assert result["rejected"] == single["rejected"]
+        assert result["rejected"][0][1] == group_names[0]
+        np.testing.assert_array_equal(result["inliers"], single["inliers"])
+        np.testing.assert_allclose(result["fit"]["normal"], single["fit"]["normal"])
+
+
+@pytest.fixture
+def points():
+    return _sphere_points(40, 3)
+
+
+def test_filtered_group_is_constructed_fitted_and_deleted(session, sdk):
+    reports = sa.robust_fit_to_point_groups("Sphere", "Scan", ["SMR"], threshold=0.1)
+    assert sorted(name for _, name, _, _ in reports["SMR"]["rejected"]) == ["P0", "P1", "P2"]
+    steps = [step for step, _ in sdk.executed]
+    assert steps.count("Construct a Point in Working Coordinates") == 37
+    fit = next(args for step, args in sdk.executed if step == "Fit Geometry to Point Group")
+    assert fit["Group To Fit"] == ("Scan", "SMR robust")
+    assert steps[-1] == "Delete Objects"
+    assert sdk.points_of("Scan", "SMR robust") == {}
+    assert len(sdk.points_of("Scan", "SMR")) == 40
+
+
+def test_keep_filtered_group(session, sdk):
+    sa.robust_fit_to_point_groups("Sphere", "Scan", ["SMR"], threshold=0.1, keep_filtered=True)
+    assert "Delete Objects" not in [step for step, _ in sdk.executed]
+    assert len(sdk.points_of("Scan", "SMR robust")) == 37
+
+
+def test_existing_filtered_group_is_not_touched(session, sdk):
+    sdk.points[("Scan", "SMR robust", "Mine")] = (0.0, 0.0, 0.0)
+    with pytest.raises(ValueError):
+        sa.robust_fit_to_point_groups("Sphere", "Scan", ["SMR"], threshold=0.1)
+    assert sdk.points_of("Scan", "SMR robust") == {"Mine": (0.0, 0.0, 0.0)}
+
+
+def test_filtered_group_is_deleted_when_the_fit_fails(session, sdk, monkeypatch):
+    def fail(*args):
+        raise SystemError("Execution raised: SDKERROR!")
+
+    monkeypatch.setattr(sdk, "_fit_geometry_to_point_group", fail, raising=False)
+    with pytest.raises(SystemError):
+        sa.robust_fit_to_point_groups("Sphere", "Scan", ["SMR"], threshold=0.1)
+    assert sdk.points_of("Scan", "SMR robust") == {}
+
+
+@pytest.mark.parametrize("geomType", ["Line", "Plane", "Circle", "Sphere", "Cylinder"])
+def test_vectorized_scoring_deviations(geomType):
+    rng = np.random.default_rng(5)
+    xyz = 5000.0 + 10.0 * rng.normal(size=(200, 3))
+    fits = sa.fit_geometries(geomType, [5000.0 + 10.0 * rng.normal(size=(12, 3)) for _ in range(7)])
+    expected = [deviations_to_geometry(geomType, xyz, fit) for fit in fits]
+    np.testing.assert_allclose(deviations_to_geometries(geomType, xyz, fits), expected, atol=1e-9)
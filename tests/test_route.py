@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+from itertools import permutations
+
+import numpy as np
+import pytest
+
+import SAPyLib as sa
+from SAPyLib.route import _directions, optimize_route, travel_times
+
+
+def _targets(count: int, seed: int) -> sa.PointSet:
+    rng = np.random.default_rng(seed)
+    xyz = rng.uniform([-5.0, -5.0, -1.0], [5.0, 5.0, 3.0], (count, 3))
+    return sa.PointSet("Part", "Nom", [f"P{i}" for i in range(count)], xyz)
+
+
+def _brute_force(points: sa.PointSet, start=None) -> float:
+    directions = _directions(points.xyz, [0.0, 0.0, 0.0])
+    speed = sa.route.DEFAULT_ANGULAR_SPEED
+    first = np.zeros(len(points)) if start is None else travel_times(_directions(np.reshape(start, (1, 3)), [0.0, 0.0, 0.0]), directions, speed, speed)
+    costs = travel_times(directions[:, None, :], directions[None, :, :], speed, speed)
+    return min(first[p[0]] + costs[p[:-1], p[1:]].sum() for p in map(np.array, permutations(range(len(points)))))
+
+
+SA_POINTS = _targets(4, 7)
+
+
+@pytest.fixture
+def points():
+    return {("Part", "Nom", name): xyz for name, xyz in zip(SA_POINTS.names.tolist(), SA_POINTS.xyz.tolist())}
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_route_is_close_to_the_optimum(seed):
+    # 2-opt is a heuristic: within 25% of the brute force optimum
+    points = _targets(7, seed)
+    route = optimize_route(points, [0.0, 0.0, 0.0])
+    assert sorted(route["order"].tolist()) == [*range(7)]
+    assert route["points"].names.tolist() == points.names[route["order"]].tolist()
+    assert route["time"] <= route["original_time"]
+    assert route["time_saved"] == pytest.approx(route["original_time"] - route["time"])
+    assert route["time"] <= 1.25 * _brute_force(points) + 1e-9
+
+
+def test_route_from_the_current_direction():
+    points = _targets(6, 10)
+    start = [-3.0, 4.0, 0.0]
+    route = optimize_route(points, [0.0, 0.0, 0.0], start=start)
+    assert route["time"] <= 1.25 * _brute_force(points, start) + 1e-9
+
+
+def test_azimuth_wraps_around():
+    a = np.array([np.radians(179.0), 0.0])
+    b = np.array([np.radians(-179.0), 0.0])
+    assert travel_times(a, b, 1.0, 1.0) == pytest.approx(np.radians(2.0))
+    # both axes slew at the same time, the slowest one counts
+    assert travel_times(np.zeros(2), np.array([0.2, 0.1]), 1.0, 0.05) == pytest.approx(2.0)
+
+
+def test_instrument_transform():
+    points = _targets(5, 3)
+    base = np.eye(4)
+    base[:3, 3] = [1.0, 2.0, 0.0]
+    np.testing.assert_allclose(_directions(points.xyz, base), _directions(points.xyz, [1.0, 2.0, 0.0]))
+    with pytest.raises(ValueError):
+        optimize_route(points, [1.0, 2.0])
+
+
+def test_named_points_are_read_from_sa(session, sdk):
+    named = [sa.NamedPoint(["Part", "Nom", name]) for name in SA_POINTS.names.tolist()]
+    route = optimize_route(named, [0.0, 0.0, 0.0])
+    assert [p.name for p in route["points"]] == SA_POINTS.names[route["order"]].tolist()
+    assert route["time"] == pytest.approx(optimize_route(SA_POINTS, [0.0, 0.0, 0.0])["time"])
+    assert [step for step, _ in sdk.executed] == ["Get Point Coordinate"] * 4
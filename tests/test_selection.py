@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import SAPyLib as sa
+from SAPyLib.snapshot import JobSnapshot
+from stub_sdk import FakeJobSdk, FakeNrkSdk
+
+
+@pytest.fixture
+def sdk():
+    return FakeNrkSdk(group_size=3)
+
+
+def test_select_objects_of_one_type_takes_one_step(session, sdk):
+    assert sa.select_objects("C*", "G*", "Plane") == [("Col", "Grp", "Plane")] * 3
+    assert sdk.steps == 1
+
+
+def test_select_any_object_takes_one_step_per_type(session, sdk):
+    assert len(sa.select_objects()) == 3 * len(sa.OBJECT_TYPES)
+    assert sdk.steps == len(sa.OBJECT_TYPES)
+
+
+def test_repeated_selections_use_the_query_cache(session, sdk):
+    sa.enable_query_cache()
+    sa.select_objects()
+    steps = sdk.steps
+    sa.select_objects("Col", ["Grp", "Other"], "Any")
+    sa.select_objects("X*", regex=False)
+    sa.select_points("Col", "Grp", "P[12]")
+    assert sdk.steps == steps + 1  # only the point list of the group
+
+
+def test_select_from_snapshot_takes_no_steps(session, sdk):
+    snapshot = JobSnapshot({}, {"Nominals": {"Plane": ["Pl1", "Pl2"], "Cylinder": ["Cyl1"]}, "Scan": {"Plane": ["Pl1"]}})
+    assert sa.select_objects("Nom*", "Pl?", snapshot=snapshot) == [("Nominals", "Pl1", "Plane"), ("Nominals", "Pl2", "Plane")]
+    assert sa.select_objects(r"(Nominals|Scan)", r"\w+1", "Plane", regex=True, snapshot=snapshot) == [
+        ("Nominals", "Pl1", "Plane"),
+        ("Scan", "Pl1", "Plane"),
+    ]
+    assert sdk.steps == 0
+
+
+class RelationshipSdk(FakeJobSdk):
+    """Job stub with relationships besides the points."""
+
+    RELATIONSHIPS = ["Nominals::Dist1", "Nominals::Dist2", "Nominals::Plane Fit", "Scan::Dist1"]
+
+    def _make_a_relationship_reference_list_wildcard_selection(self, args):
+        self.output = self.RELATIONSHIPS
+
+
+@pytest.fixture
+def job(use_stub):
+    """A session on a stub job SDK with point groups and relationships."""
+    sdk = RelationshipSdk({
+        ("Scan", "G1", "P1"): (0.0, 0.0, 0.0),
+        ("Scan", "G2", "P1"): (1.0, 0.0, 0.0),
+        ("Scan", "H1", "P2"): (2.0, 0.0, 0.0),
+        ("Nominals", "G1", "P1"): (0.0, 0.0, 0.0),
+    })
+    use_stub(sdk)
+    return sdk
+
+
+def test_select_relationships(job):
+    assert sa.select_relationships("Nominals", "Dist?") == [("Nominals", "Dist1"), ("Nominals", "Dist2")]
+    assert sa.select_relationships(name=["Dist1", "Plane*"]) == [("Nominals", "Dist1"), ("Nominals", "Plane Fit"), ("Scan", "Dist1")]
+    assert sa.select_relationships(r"S\w+", r"Dist\d", regex=True) == [("Scan", "Dist1")]
+
+
+def test_select_points_of_several_patterns(job):
+    points = sa.select_points("Scan", ["G*", "H1"], "P?")
+    assert sorted((p.group, p.name) for p in points) == [("G1", "P1"), ("G2", "P1"), ("H1", "P2")]
+    assert [p.collection for p in sa.select_points(r"Nom.*", r"G\d", regex=True)] == ["Nominals"]
+
+
+def test_delete_objects_matching_takes_one_delete_step(job):
+    assert sa.delete_objects_matching("Scan", "G*", "Point Group") == 2
+    deletes = [args for step, args in job.executed if step == "Delete Objects"]
+    assert deletes == [{"Object Names": ["Scan::G1::Point Group", "Scan::G2::Point Group"]}]
+    assert sorted({key[:2] for key in job.points}) == [("Nominals", "G1"), ("Scan", "H1")]
+
+
+def test_delete_objects_matching_nothing(job):
+    assert sa.delete_objects_matching("Other", objtype="Point Group") == 0
+    assert "Delete Objects" not in [step for step, _ in job.executed]
+
+
+def test_failing_delete_objects_matching(job, monkeypatch):
+    monkeypatch.setattr(job, "_delete_objects", lambda args: False, raising=False)
+    assert sa.delete_objects_matching("Scan", "G*", "Point Group") == 0
+    assert len(job.points) == 4
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import os
+import subprocess
+import sys
+
+import pytest
+
+import SAPyLib as sa
+from stub_sdk import FakeNrkSdk, FakeTools
+
+
+@pytest.fixture
+def bare_session(use_stub):
+    """A stub session without SA Python Tools object."""
+    return use_stub(FakeNrkSdk(), tools=None)
+
+
+def test_session_is_lazy():
+    session = sa.Session()
+    assert not session.connected
+    assert session._sdk is None and session._tools is None
+
+
+def test_import_loads_no_runtime_or_analysis_modules():
+    code = "import sys, SAPyLib; print(' '.join(sorted(sys.modules)))"
+    lib = os.path.dirname(os.path.dirname(sa.__file__))
+    modules = subprocess.run([sys.executable, "-c", code], env={**os.environ, "PYTHONPATH": lib}, capture_output=True, text=True, check=True).stdout.split()
+    assert "clr" not in modules and "pythonnet" not in modules
+    assert not {f"SAPyLib.{module}" for module in sa._LAZY_MODULES} & set(modules)
+
+
+def test_analysis_names_are_loaded_on_first_use():
+    assert set(sa._LAZY_NAMES) <= set(sa.__all__) and set(sa._LAZY_NAMES) <= set(dir(sa))
+    assert sa.best_fit is sa.bestfit.best_fit
+    assert "best_fit" in vars(sa)
+    assert sa.route.optimize_route is sa.optimize_route
+    with pytest.raises(AttributeError):
+        sa.no_such_function
+
+
+def test_stub_session_connects_without_tools(bare_session):
+    assert bare_session.connect() is bare_session
+    assert bare_session.connected
+    assert bare_session._tools is None
+
+
+def test_stub_session_runs_wrappers_without_tools(bare_session):
+    point = sa.get_point_coordinate("Col", "Grp", "p1")
+    assert (point.X, point.Y, point.Z) == (1.0, 2.0, 3.0)
+    assert bare_session.sdk.steps == 1
+    assert bare_session._tools is None
+
+
+def test_tools_are_bound_on_injection(session):
+    assert session.tools is not None
+    assert isinstance(sa.sa_py_tools, FakeTools)
+    assert isinstance(sa.NrkSdk, FakeNrkSdk)
+
+
+def test_activate_switches_sdk(session):
+    other = sa.use_session(sa.Session(sdk=FakeNrkSdk(), tools=FakeTools()))
+    sa.get_point_coordinate("Col", "Grp", "p1")
+    assert other.sdk.steps == 1
+    assert session.sdk.steps == 0
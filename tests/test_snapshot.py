@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import SAPyLib as sa
+from SAPyLib.snapshot import JobSnapshot, snapshot_job
+from stub_sdk import FakeArray, FakeNrkSdk
+
+FOLDERS = {"Cell 1": ["Nominals"], "Cell 1/Scans": ["Scan"]}
+OBJECTS = {
+    "Nominals": {"Plane": ["Pl2", "Pl1"], "Cylinder": ["Cyl1"]},
+    "Scan": {"Point Group": ["SMR"]},
+    "Loose": {},
+}
+
+
+class JobSdk(FakeNrkSdk):
+    """Stub SDK with the folders, collections and objects of a job."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.args = {}
+        self.executed = []
+
+    def SetStep(self, name):
+        super().SetStep(name)
+        self.args = {}
+
+    def _set_arg(self, name, *values):
+        self.args[name] = values[0]
+        return True
+
+    def ExecuteStep(self):
+        super().ExecuteStep()
+        self.executed.append(self.step)
+
+    def GetIntegerArg(self, name, default):
+        return (True, len(OBJECTS))
+
+    def GetCollectionNameArg(self, name, default):
+        return (True, [*OBJECTS][self.args["Collection Index"]])
+
+    def GetStringRefListArg(self, name, values):
+        if self.step == "Get Folders by Wildcard":
+            return (True, FakeArray([*FOLDERS]))
+        return (True, FakeArray(FOLDERS.get(self.args["Folder Path"], [])))
+
+    def GetCollectionObjectNameRefListArg(self, name, values):
+        objtype = self.args["Object Type"]
+        return (True, FakeArray([f"{c}::{n}::{objtype}" for c, types in OBJECTS.items() for n in types.get(objtype, [])]))
+
+
+@pytest.fixture
+def sdk():
+    return JobSdk()
+
+
+def test_snapshot_job(session, sdk):
+    snap = snapshot_job()
+    assert snap.folders == FOLDERS
+    assert snap.collections == {"Nominals": {"Plane": ["Pl1", "Pl2"], "Cylinder": ["Cyl1"]}, "Scan": {"Point Group": ["SMR"]}, "Loose": {}}
+    assert snap.folder_of("Scan") == "Cell 1/Scans" and snap.folder_of("Loose") == ""
+    assert snap.objects("Nominals", "Plane") == ["Pl1", "Pl2"] and snap.objects("Loose", "Plane") == []
+    assert snap.index() == {"Cell 1": {"Nominals": snap.collections["Nominals"]}, "Cell 1/Scans": {"Scan": {"Point Group": ["SMR"]}}, "": {"Loose": {}}}
+    # folders, collections per folder, the number of collections, their names and one wildcard list per type
+    assert sdk.steps == 1 + 2 + 1 + 3 + len(sa.OBJECT_TYPES)
+    assert sdk.executed.count("Make a Collection Object Name Ref List - WildCard Selection") == len(sa.OBJECT_TYPES)
+
+
+def test_snapshot_of_selected_object_types(session, sdk):
+    snap = snapshot_job(("Plane",))
+    assert snap.object_keys() == {("Nominals", "Plane", "Pl1"), ("Nominals", "Plane", "Pl2")}
+    assert sdk.steps == 1 + 2 + 1 + 3 + 1
+
+
+def test_snapshot_is_cached_until_the_job_changes(session, sdk):
+    sa.enable_query_cache()
+    snap = snapshot_job()
+    steps = sdk.steps
+    assert snapshot_job() is snap and sdk.steps == steps
+    sa.delete_collection("Loose")
+    assert snapshot_job() is not snap and sdk.steps > steps + 1
+
+
+def test_save_load_and_diff(tmp_path):
+    previous = JobSnapshot({"A": ["Nominals", "Scan"]}, {"Nominals": {"Plane": ["Pl1"]}, "Scan": {"Point Group": ["SMR"]}, "Old": {}}, created=1.0)
+    path = str(tmp_path / "job.json")
+    previous.save(path)
+    loaded = JobSnapshot.load(path)
+    assert (loaded.folders, loaded.collections, loaded.created) == (previous.folders, previous.collections, 1.0)
+
+    current = JobSnapshot({"A": ["Nominals"], "B": ["Scan"]}, {"Nominals": {"Plane": ["Pl1", "Pl2"]}, "Scan": {}, "New": {"Frame": ["F"]}})
+    assert current.diff(loaded) == {
+        "added_collections": ["New"],
+        "removed_collections": ["Old"],
+        "added_objects": [("New", "Frame", "F"), ("Nominals", "Plane", "Pl2")],
+        "removed_objects": [("Scan", "Point Group", "SMR")],
+        "moved_collections": [("Scan", "A", "B")],
+    }
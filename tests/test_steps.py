@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import numpy as np
+
+import pytest
+
+import SAPyLib as sa
+from stub_sdk import FakeNrkSdk
+
+
+class InProgressSdk(FakeNrkSdk):
+    """Every executed step is still in progress for the first 'polls' result checks."""
+
+    def __init__(self, polls: int = 2, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.polls = polls
+        self.pending = 0
+        self.checks = 0
+
+    def ExecuteStep(self):
+        super().ExecuteStep()
+        self.pending = self.polls
+
+    def GetMPStepResult(self, index):
+        self.checks += 1
+        if self.pending:
+            self.pending -= 1
+            return (True, 1)
+        return (True, 2)
+
+
+@pytest.fixture
+def sdk(monkeypatch):
+    monkeypatch.setattr(sa, "default_wait_strategy", sa.WaitStrategy(poll_interval=0.0, max_interval=0.0))
+    return InProgressSdk(group_size=20)
+
+
+@pytest.mark.parametrize(
+    "bulk",
+    [
+        lambda: sa.construct_points("Col", "Grp", [f"P{i}" for i in range(20)], np.zeros((20, 3))),
+        lambda: sa.rename_points([("Col", "Grp", f"P{i}", "Col", "Grp", f"Q{i}") for i in range(20)]),
+        lambda: sa.get_group_coordinates("Col", "Grp"),
+    ],
+    ids=["construct_points", "rename_points", "get_group_coordinates"],
+)
+def test_bulk_steps_wait_while_in_progress(session, sdk, bulk):
+    sdk.reset()
+    bulk()
+    # every step is checked until it isn't in progress anymore
+    assert sdk.checks - sdk.steps * (sdk.polls + 1) in (0, 1)
+    assert sdk.pending == 0
+
+
+def test_step_handle(session, sdk):
+    handle = sa.measure("Col", 0, handle=True)
+    assert handle.poll() is None
+    assert handle.poll() is None
+    assert handle.poll() == 2
+    assert handle.done()
+    assert handle.wait()
+
+
+def test_step_handle_wait(session, sdk):
+    handle = sa.configure_and_measure("Col", 0, "Col", "Grp", "P1", "Default", True, False, 0, handle=True)
+    assert handle.wait()
+
+
+def test_step_handle_detects_another_step(session, sdk):
+    handle = sa.measure("Col", 0, handle=True)
+    assert handle.poll() is None
+    sa.get_point_coordinate("Col", "Grp", "P1")
+    with pytest.raises(SystemError):
+        handle.poll()
+    with pytest.raises(SystemError):
+        handle.wait()
+
+
+def test_step_handle_detects_a_step_of_another_thread(session, sdk):
+    session.start_executor()
+    handle = sa.measure("Col", 0, handle=True)
+    thread = threading.Thread(target=sa.get_point_coordinate, args=("Col", "Grp", "P1"))
+    thread.start()
+    thread.join()
+    with pytest.raises(SystemError):
+        handle.wait()
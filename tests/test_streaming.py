@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+import SAPyLib as sa
+from SAPyLib.streaming import DUPLICATE, MATCH, OUT_OF_RANGE, Observation, ProximityMatcher, simulated_feed
+
+
+def _grid(spacing: float, n: int = 10) -> sa.PointSet:
+    xyz = np.stack(np.meshgrid(np.arange(n), np.arange(n), [0.0], indexing="ij"), axis=-1).reshape(-1, 3) * spacing
+    return sa.PointSet("Part", "Nom", [f"N{i}" for i in range(len(xyz))], xyz)
+
+
+def test_measured_nominal_does_not_hide_a_close_unmeasured_one():
+    # the nominals are 0.5 apart within a proximity of 1.0
+    matcher = ProximityMatcher(sa.PointSet("Part", "Nom", ["A", "B"], [[0.0, 0.0, 0.0], [0.5, 0.0, 0.0]]), 1.0)
+    assert (matcher.process(Observation("M1", [0.0, 0.0, 0.0])).kind, matcher.unmeasured()) == (MATCH, ["B"])
+    event = matcher.process(Observation("M2", [0.2, 0.0, 0.0]))
+    assert (event.kind, event.nominal) == (MATCH, "B")
+    event = matcher.process(Observation("M3", [0.1, 0.0, 0.0]))
+    assert (event.kind, event.nominal) == (DUPLICATE, "A")
+    assert matcher.process(Observation("M4", [5.0, 0.0, 0.0])).kind == OUT_OF_RANGE
+
+
+def test_reshot_point_is_a_duplicate_not_a_match_of_a_neighbour():
+    nominals = sa.PointSet("Part", "Nom", ["A", "B"], [[0.0, 0.0, 0.0], [0.5, 0.0, 0.0]])
+    matcher = ProximityMatcher(nominals, 1.0)
+    matcher.process(Observation("M1", [0.0, 0.0, 0.0]))
+    event = matcher.process(Observation("M2", [0.01, 0.0, 0.0]))
+    assert (event.kind, event.nominal, event.distance) == (DUPLICATE, "A", 0.01)
+    assert matcher.unmeasured() == ["B"] and "B" not in matcher.matches
+    # about as close to both: the unmeasured nominal is matched
+    assert matcher.process(Observation("M3", [0.2, 0.0, 0.0])).nominal == "B"
+
+    # without the ratio the re-shot point matches the neighbour
+    matcher = ProximityMatcher(nominals, 1.0, duplicate_ratio=np.inf)
+    matcher.process(Observation("M1", [0.0, 0.0, 0.0]))
+    assert (matcher.process(Observation("M2", [0.01, 0.0, 0.0])).kind, matcher.unmeasured()) == (MATCH, [])
+    with pytest.raises(ValueError):
+        ProximityMatcher(nominals, 1.0, duplicate_ratio=0.5)
+
+
+def test_out_of_range_reports_the_next_target():
+    matcher = ProximityMatcher(sa.PointSet("Part", "Nom", ["A", "B"], [[0.0, 0.0, 0.0], [10.0, 0.0, 0.0]]), 1.0)
+    matcher.process(Observation("M1", [0.0, 0.0, 0.0]))
+    event = matcher.process(Observation("M2", [2.0, 0.0, 0.0]))
+    assert (event.kind, event.nominal, event.distance) == (OUT_OF_RANGE, "B", 8.0)
+
+
+def test_simulated_stream_of_closely_spaced_nominals():
+    # every nominal has neighbours within the proximity, its observations must still match it
+    nominals = _grid(spacing=0.5)
+    events = []
+    matcher = ProximityMatcher(nominals, 0.6, on_event=events.append)
+    statistics = matcher.run(simulated_feed(nominals, noise=0.01, duplicate_fraction=0.2, outlier_fraction=0.1, seed=1))
+
+    assert matcher.complete and statistics["matches"] == statistics["measured"] == len(nominals)
+    assert statistics["observations"] == len(events) == statistics["matches"] + statistics["duplicates"] + statistics["out_of_range"]
+    assert statistics["duplicates"] > 0 and statistics["out_of_range"] > 0
+    assert statistics["max_distance"] <= matcher.proximity
+    for event in events:
+        name = event.observation.name
+        if event.kind == MATCH:
+            assert matcher.matches[event.nominal].name == name
+        if event.kind == DUPLICATE:
+            # every nominal that was unmeasured at the time was out of the proximity, or much farther than the
+            # measured one reported
+            index = events.index(event)
+            unmeasured = set(nominals.names.tolist()) - {e.nominal for e in events[:index] if e.kind == MATCH}
+            distances = np.linalg.norm(nominals.xyz - event.observation.xyz, axis=1)
+            limit = min(matcher.proximity, event.distance * matcher.duplicate_ratio)
+            assert all(distances[i] > limit for i, n in enumerate(nominals.names.tolist()) if n in unmeasured)